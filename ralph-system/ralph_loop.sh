@@ -23,6 +23,11 @@ CLAUDE_TIMEOUT_MINUTES=15  # Default: 15 minutes timeout for Claude Code executi
 SLEEP_DURATION=3600     # 1 hour in seconds
 CALL_COUNT_FILE=".call_count"
 TIMESTAMP_FILE=".last_reset"
+# Shared token-bucket limiter (from the memory system); used instead of the
+# hourly counter when installed, so parallel loops share one quota
+RATE_LIMITER="${RATE_LIMITER:-$HOME/.claude-memory/rate_limiter.py}"
+RATE_LIMIT_WAIT=0
+RATE_SLOT_BOOKED=false
 USE_TMUX=false
 
 # Exit detection configuration
@@ -178,6 +183,22 @@ STATUSEOF
 
 # Check if we can make another call
 can_make_call() {
+    if [[ -f "$RATE_LIMITER" ]]; then
+        # A slot booked before wait_for_reset is valid now
+        if [[ "$RATE_SLOT_BOOKED" == "true" ]]; then
+            RATE_SLOT_BOOKED=false
+            return 0
+        fi
+        local wait
+        if wait=$(python3 "$RATE_LIMITER" reserve claude --hour "$MAX_CALLS_PER_HOUR"); then
+            RATE_LIMIT_WAIT=$wait
+            [[ "$wait" == "0.0" ]] && return 0
+            RATE_SLOT_BOOKED=true
+            return 1
+        fi
+        log_status "WARN" "Shared rate limiter failed, using hourly call counter"
+    fi
+
     local calls_made=0
     if [[ -f "$CALL_COUNT_FILE" ]]; then
         calls_made=$(cat "$CALL_COUNT_FILE")
@@ -202,8 +223,32 @@ increment_call_counter() {
     echo "$calls_made"
 }
 
+# Countdown display for a wait of N seconds
+countdown() {
+    local wait_time=$1
+    while [[ $wait_time -gt 0 ]]; do
+        local hours=$((wait_time / 3600))
+        local minutes=$(((wait_time % 3600) / 60))
+        local seconds=$((wait_time % 60))
+        
+        printf "\r${YELLOW}Time until reset: %02d:%02d:%02d${NC}" $hours $minutes $seconds
+        sleep 1
+        ((wait_time--))
+    done
+    printf "\n"
+}
+
 # Wait for rate limit reset with countdown
 wait_for_reset() {
+    if [[ "$RATE_SLOT_BOOKED" == "true" ]]; then
+        # Shared limiter: the slot is booked, wait exactly until it is valid
+        local wait_time=$(( ${RATE_LIMIT_WAIT%.*} + 1 ))
+        log_status "WARN" "Shared rate limit reached (max $MAX_CALLS_PER_HOUR/hour). Next slot in $wait_time seconds..."
+        countdown $wait_time
+        log_status "SUCCESS" "Rate limit slot available."
+        return
+    fi
+
     local calls_made=$(cat "$CALL_COUNT_FILE" 2>/dev/null || echo "0")
     log_status "WARN" "Rate limit reached ($calls_made/$MAX_CALLS_PER_HOUR). Waiting for reset..."
     
@@ -213,18 +258,7 @@ wait_for_reset() {
     local wait_time=$(((60 - current_minute - 1) * 60 + (60 - current_second)))
     
     log_status "INFO" "Sleeping for $wait_time seconds until next hour..."
-    
-    # Countdown display
-    while [[ $wait_time -gt 0 ]]; do
-        local hours=$((wait_time / 3600))
-        local minutes=$(((wait_time % 3600) / 60))
-        local seconds=$((wait_time % 60))
-        
-        printf "\r${YELLOW}Time until reset: %02d:%02d:%02d${NC}" $hours $minutes $seconds
-        sleep 1
-        ((wait_time--))
-    done
-    printf "\n"
+    countdown $wait_time
     
     # Reset counter
     echo "0" > "$CALL_COUNT_FILE"
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Budget-aware Context Builder
+
+Assembles agent context from prioritized sections (summary, knowledge,
+recent events). Each section gets a share of the token budget; items are
+kept or dropped whole, lowest-value first, instead of cutting characters.
+Budget a section does not use is handed to the next sections.
+
+Token estimators are pluggable and offline (MEMORY_TOKENIZER):
+    heuristic  Word/punctuation based, aware of non-ASCII text (default)
+    chars4     Legacy estimate: 4 characters per token
+    tiktoken   cl100k_base via the optional tiktoken package (falls back to heuristic)
+
+Per-item token counts are memoized, so repeated builds (e.g. in the
+memory server) do not recount unchanged items.
+"""
+
+import hashlib
+import math
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+# Words, runs of CJK characters, or single punctuation/symbol characters
+_TOKEN_PIECES = re.compile(r"[A-Za-z0-9_]+|[^\W\d_]+|\d+|[^\w\s]", re.UNICODE)
+_CJK = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯]")
+
+MEMO_SIZE = 10_000
+SEPARATOR_TOKENS = 1   # "\n\n" between parts
+
+
+def heuristic_tokens(text: str) -> int:
+    """Offline BPE-like estimate.
+
+    ASCII words cost ~1 token per 4 characters, words with umlauts or other
+    non-ASCII letters are split more aggressively by real tokenizers
+    (~1 per 2 characters), CJK costs ~1 per character, punctuation 1 each.
+    """
+    tokens = 0
+    for piece in _TOKEN_PIECES.findall(text):
+        if piece.isascii():
+            tokens += 1 if not piece[0].isalnum() else math.ceil(len(piece) / 4)
+        else:
+            cjk = len(_CJK.findall(piece))
+            tokens += cjk + math.ceil((len(piece) - cjk) / 2)
+    return tokens
+
+
+def chars4_tokens(text: str) -> int:
+    return math.ceil(len(text) / 4)
+
+
+def _tiktoken_counter() -> Optional[Callable[[str], int]]:
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+class TokenEstimator:
+    """Memoizing wrapper around a token counting function."""
+
+    def __init__(self, count: Callable[[str], int], name: str):
+        self._count = count
+        self.name = name
+        self._memo: Dict[bytes, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def count(self, text: str) -> int:
+        key = hashlib.blake2b(text.encode('utf-8'), digest_size=12).digest()
+        cached = self._memo.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        if len(self._memo) >= MEMO_SIZE:
+            self._memo.clear()
+        tokens = self._memo[key] = self._count(text)
+        return tokens
+
+
+_estimators: Dict[str, TokenEstimator] = {}
+
+
+def get_estimator(name: Optional[str] = None) -> TokenEstimator:
+    """Shared (memoized) estimator selected by name or MEMORY_TOKENIZER."""
+    name = (name or os.getenv("MEMORY_TOKENIZER", "heuristic")).lower()
+    if name not in _estimators:
+        count = {"heuristic": heuristic_tokens, "chars4": chars4_tokens}.get(name)
+        if name == "tiktoken":
+            count = _tiktoken_counter()
+        _estimators[name] = TokenEstimator(count or heuristic_tokens, name if count else "heuristic")
+    return _estimators[name]
+
+
+@dataclass
+class Section:
+    """A titled block of items.
+
+    items are in display order. newest_first marks sections (events)
+    where the last items are the most valuable; such sections are kept
+    contiguous, so the newest items survive and older ones are dropped.
+    """
+    title: str
+    items: List[str]
+    share: float
+    newest_first: bool = False
+    kept: List[int] = field(default_factory=list)
+
+    def priority_order(self) -> List[int]:
+        indexes = list(range(len(self.items)))
+        return indexes[::-1] if self.newest_first else indexes
+
+
+def _omitted_marker(section: Section, omitted: int) -> str:
+    what = "older items" if section.newest_first else "items"
+    return f"- ... ({what} omitted to fit the token budget: {omitted})"
+
+
+def _fill(section: Section, budget: int, costs: List[int], header: int) -> int:
+    """Add items to `section.kept` within `budget`; returns tokens used."""
+    used = 0
+    for i in section.priority_order():
+        if i in section.kept:
+            continue
+        cost = costs[i] + SEPARATOR_TOKENS + (header if not section.kept else 0)
+        if cost > budget - used:
+            if section.newest_first:
+                break  # keep events contiguous
+            continue
+        section.kept.append(i)
+        used += cost
+    return used
+
+
+def build_context(sections: List[Section], max_tokens: int,
+                  estimator: Optional[TokenEstimator] = None) -> str:
+    """Fit sections into `max_tokens`, dropping whole items lowest-value first."""
+    estimator = estimator or get_estimator()
+    sections = [s for s in sections if s.items]
+    for section in sections:
+        section.kept = []
+    # Room for an "omitted" marker per section
+    reserve = sum(
+        estimator.count(_omitted_marker(s, len(s.items))) + SEPARATOR_TOKENS for s in sections
+    )
+    budget = max(0, max_tokens - reserve)
+
+    costs = [[estimator.count(item) for item in s.items] for s in sections]
+    headers = [estimator.count(s.title) + SEPARATOR_TOKENS for s in sections]
+
+    # Pass 1: every section within its own share
+    used = 0
+    for section, section_costs, header in zip(sections, costs, headers):
+        used += _fill(section, int(budget * section.share), section_costs, header)
+
+    # Pass 2: hand the leftover to the sections in priority order
+    for section, section_costs, header in zip(sections, costs, headers):
+        used += _fill(section, budget - used, section_costs, header)
+
+    parts = []
+    for section in sections:
+        if not section.kept:
+            continue
+        parts.append(section.title)
+        items = [section.items[i] for i in sorted(section.kept)]
+        omitted = len(section.items) - len(section.kept)
+        if omitted:
+            marker = _omitted_marker(section, omitted)
+            items = [marker] + items if section.newest_first else items + [marker]
+        parts.extend(items)
+    return "\n\n".join(parts)
@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+"""
+Event Log Storage for the Shared Memory
+
+Segmented, append-only JSONL event log. New events go to the active
+segment `events.jsonl`; it is rolled over by size or by day into a
+gzip-compressed cold segment under `segments/`. Every event has a global
+sequence number (0-based position in the whole log).
+
+Files next to events.jsonl:
+    events.meta            Sidecar index of the active segment (O(1) appends)
+                           {"count": 412345, "bytes": 9876543, "base": 400000,
+                            "first_ts": "...", "last_ts": "...", "consolidated": 412340}
+                           count = total events, base = seq of first active line
+    events.manifest.json   Closed segments with seq range, line count and time range
+    events.lock            flock target serializing writers and rotation
+    segments/              events-<first_seq>-<last_seq>.jsonl.gz
+
+Environment:
+    MEMORY_SEGMENT_MAX_MB        Roll over when the active segment exceeds this (default 64)
+    MEMORY_SEGMENT_ROTATE_DAILY  Roll over when the day changes (default 1)
+    MEMORY_SEGMENT_RETAIN        Keep at most N closed segments, 0 = keep all (default 0);
+                                 segments with unconsolidated events are never dropped
+"""
+
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+SCAN_BLOCK_SIZE = 1024 * 1024
+TAIL_BLOCK_SIZE = 64 * 1024
+
+SEGMENT_MAX_BYTES = int(os.getenv("MEMORY_SEGMENT_MAX_MB", "64")) * 1024 * 1024
+SEGMENT_ROTATE_DAILY = os.getenv("MEMORY_SEGMENT_ROTATE_DAILY", "1") == "1"
+SEGMENT_RETAIN = int(os.getenv("MEMORY_SEGMENT_RETAIN", "0"))
+
+
+def meta_path(events_file: Path) -> Path:
+    """Sidecar index path for an event log (events.jsonl -> events.meta)."""
+    return events_file.with_suffix(".meta")
+
+
+def manifest_path(events_file: Path) -> Path:
+    return events_file.with_suffix(".manifest.json")
+
+
+def segments_dir(events_file: Path) -> Path:
+    return events_file.parent / "segments"
+
+
+@contextmanager
+def _locked(events_file: Path, exclusive: bool = True):
+    """Hold the log lock. The lock file is never rotated, unlike the data."""
+    events_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(events_file.with_suffix(".lock"), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _save_atomic(path: Path, data: Any) -> None:
+    """Write JSON atomically (temp file + rename)."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'w') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _count_newlines(f, start: int) -> int:
+    """Count newlines from byte offset `start` to EOF."""
+    f.seek(start)
+    count = 0
+    while True:
+        block = f.read(SCAN_BLOCK_SIZE)
+        if not block:
+            break
+        count += block.count(b"\n")
+    return count
+
+
+def _load_meta(events_file: Path) -> Optional[Dict[str, Any]]:
+    path = meta_path(events_file)
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r') as f:
+            meta = json.load(f)
+        if isinstance(meta.get("count"), int) and isinstance(meta.get("bytes"), int):
+            return meta
+    except (OSError, json.JSONDecodeError):
+        pass
+    return None
+
+
+def _save_meta(events_file: Path, meta: Dict[str, Any]) -> None:
+    _save_atomic(meta_path(events_file), meta)
+
+
+def load_manifest(events_file: Path) -> Dict[str, Any]:
+    """Closed segments, oldest first."""
+    path = manifest_path(events_file)
+    if path.exists():
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            pass
+    return {"segments": []}
+
+
+def _next_seq(manifest: Dict[str, Any]) -> int:
+    segments = manifest["segments"]
+    return segments[-1]["last_seq"] + 1 if segments else 0
+
+
+def _reconcile(events_file: Path, f, meta: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Bring the sidecar in line with the active segment behind `f`.
+
+    If the log grew behind our back (crash between append and sidecar
+    update), only the unindexed tail is scanned. If it shrank or the
+    sidecar is missing, the segment is rescanned and the base sequence
+    number is taken from the manifest.
+    """
+    size = os.fstat(f.fileno()).st_size
+    meta = dict(meta) if meta else {}
+    if not meta or meta["bytes"] > size:
+        meta["base"] = _next_seq(load_manifest(events_file))
+        meta["count"] = meta["base"] + _count_newlines(f, 0)
+        meta["first_ts"] = meta["last_ts"] = None
+    elif meta["bytes"] < size:
+        meta["count"] += _count_newlines(f, meta["bytes"])
+    meta.setdefault("base", 0)
+    meta["bytes"] = size
+    return meta
+
+
+def _first_timestamp(f) -> Optional[str]:
+    f.seek(0)
+    try:
+        return json.loads(f.readline()).get("timestamp")
+    except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+        return None
+
+
+def _should_rotate(f, meta: Dict[str, Any]) -> bool:
+    if meta["bytes"] == 0:
+        return False
+    if meta["bytes"] >= SEGMENT_MAX_BYTES:
+        return True
+    if SEGMENT_ROTATE_DAILY:
+        if not meta.get("first_ts"):
+            meta["first_ts"] = _first_timestamp(f)
+        first_day = (meta.get("first_ts") or "")[:10]
+        return bool(first_day) and first_day != datetime.now().strftime("%Y-%m-%d")
+    return False
+
+
+def _rotate(events_file: Path, f, meta: Dict[str, Any]) -> Dict[str, Any]:
+    """Compress the active segment into segments/ and start a new one."""
+    first_seq, last_seq = meta["base"], meta["count"] - 1
+    seg_dir = segments_dir(events_file)
+    seg_dir.mkdir(parents=True, exist_ok=True)
+    name = f"events-{first_seq:012d}-{last_seq:012d}.jsonl.gz"
+
+    tmp = seg_dir / f".{name}.tmp"
+    f.seek(0)
+    with gzip.open(tmp, 'wb') as gz:
+        shutil.copyfileobj(f, gz, SCAN_BLOCK_SIZE)
+    os.replace(tmp, seg_dir / name)
+
+    manifest = load_manifest(events_file)
+    # Idempotent if a previous rotation crashed before truncating
+    segments = [s for s in manifest["segments"] if s["first_seq"] < first_seq]
+    segments.append({
+        "file": name,
+        "first_seq": first_seq,
+        "last_seq": last_seq,
+        "lines": last_seq - first_seq + 1,
+        "start": meta.get("first_ts"),
+        "end": meta.get("last_ts"),
+        "bytes": meta["bytes"],
+        "compressed_bytes": (seg_dir / name).stat().st_size
+    })
+    # Only fully consolidated segments are dropped ("consolidated" counts events, seq is 0-based)
+    consolidated = meta.get("consolidated") or 0
+    while SEGMENT_RETAIN and len(segments) > SEGMENT_RETAIN:
+        if segments[0]["last_seq"] >= consolidated:
+            print(f"Keeping {len(segments) - SEGMENT_RETAIN} segment(s) beyond MEMORY_SEGMENT_RETAIN: "
+                  f"events from seq {segments[0]['first_seq']} are not consolidated yet", file=sys.stderr)
+            break
+        (seg_dir / segments.pop(0)["file"]).unlink(missing_ok=True)
+    manifest["segments"] = segments
+    _save_atomic(manifest_path(events_file), manifest)
+
+    f.truncate(0)
+    meta = dict(meta, base=meta["count"], bytes=0, first_ts=None, last_ts=None)
+    _save_meta(events_file, meta)
+    return meta
+
+
+def append_events(events_file: Path, events: List[Dict[str, Any]],
+                  fsync: bool = False) -> Dict[str, Any]:
+    """Append events to the active segment and update the sidecar under one lock.
+
+    All events are written with a single buffered write (plus fsync if
+    requested). Rolls the segment over first if it is too large or from
+    a previous day. Returns the updated sidecar (count, bytes, ...).
+    """
+    data = "".join(json.dumps(e, ensure_ascii=False) + '\n' for e in events).encode('utf-8')
+
+    with _locked(events_file):
+        with open(events_file, 'ab+') as f:
+            meta = _reconcile(events_file, f, _load_meta(events_file))
+            if _should_rotate(f, meta):
+                meta = _rotate(events_file, f, meta)
+            f.write(data)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+            meta["count"] += len(events)
+            meta["bytes"] += len(data)
+            if not meta.get("first_ts"):
+                meta["first_ts"] = events[0].get("timestamp")
+            meta["last_ts"] = events[-1].get("timestamp", meta.get("last_ts"))
+            _save_meta(events_file, meta)
+    return meta
+
+
+def _read_segment(events_file: Path, segment: Dict[str, Any]) -> Iterator[bytes]:
+    """Yield the raw lines (with newline) of a closed segment."""
+    path = segments_dir(events_file) / segment["file"]
+    if not path.exists():
+        return
+    with gzip.open(path, 'rb') as gz:
+        yield from gz
+
+
+def _tail_file(path: Path, limit: int) -> List[bytes]:
+    """Last `limit` non-empty lines of a plain file, read backward from EOF."""
+    if not path.exists():
+        return []
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        buf = b""
+        # limit + 1 newlines guarantee `limit` complete lines (or BOF)
+        while pos > 0 and buf.count(b"\n") <= limit:
+            step = min(TAIL_BLOCK_SIZE, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+
+    parts = buf.split(b"\n")
+    if pos > 0:
+        # The first piece may start mid-line; we read enough to drop it
+        parts = parts[1:]
+    return [line for line in parts if line.strip()][-limit:]
+
+
+def tail_lines(events_file: Path, limit: int) -> List[bytes]:
+    """Return the last `limit` raw lines of the log, oldest first.
+
+    Reads fixed-size blocks backward from the end of the active segment,
+    so the cost depends on `limit` and line length, not on the size of
+    the log. Closed segments are only opened (newest first) if the active
+    one holds fewer than `limit` lines; they are streamed, holding at most
+    `limit` lines in memory.
+    """
+    if limit <= 0 or not events_file.parent.exists():
+        return []
+
+    with _locked(events_file, exclusive=False):
+        lines = _tail_file(events_file, limit)
+        if len(lines) < limit:
+            for segment in reversed(load_manifest(events_file)["segments"]):
+                older = deque((line.rstrip(b"\n") for line in _read_segment(events_file, segment)
+                               if line.strip()), maxlen=limit - len(lines))
+                lines = list(older) + lines
+                if len(lines) >= limit:
+                    break
+    return lines
+
+
+def tail_events(events_file: Path, limit: int) -> List[Dict[str, Any]]:
+    """Return the last `limit` events as dicts, oldest first.
+
+    Only the returned lines are JSON-decoded; torn or malformed lines
+    are skipped.
+    """
+    events = []
+    for line in tail_lines(events_file, limit):
+        try:
+            events.append(json.loads(line))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+    return events
+
+
+def iter_lines(events_file: Path) -> Iterator[bytes]:
+    """Yield every raw line of the log, closed segments first (full scan)."""
+    for segment in load_manifest(events_file)["segments"]:
+        yield from _read_segment(events_file, segment)
+    if events_file.exists():
+        with open(events_file, 'rb') as f:
+            yield from f
+
+
+def line_checksum(line: bytes) -> str:
+    """Checksum identifying a consumed log line."""
+    return hashlib.sha1(line).hexdigest()
+
+
+def _line_ending_at(f, offset: int) -> Optional[bytes]:
+    """Return the line terminated by the newline at byte `offset - 1`."""
+    f.seek(offset - 1)
+    if f.read(1) != b"\n":
+        return None
+    pos = offset - 1
+    buf = b""
+    while pos > 0:
+        step = min(TAIL_BLOCK_SIZE, pos)
+        pos -= step
+        f.seek(pos)
+        buf = f.read(step) + buf
+        if b"\n" in buf:
+            break
+    return buf[buf.rfind(b"\n") + 1:]
+
+
+def _cursor_valid(f, cursor: Dict[str, Any], meta: Dict[str, Any]) -> bool:
+    if cursor.get("base", 0) != meta["base"]:
+        return False
+    offset = cursor.get("offset", 0)
+    if offset == 0:
+        return True
+    if offset > meta["bytes"]:
+        return False
+    line = _line_ending_at(f, offset)
+    return line is not None and line_checksum(line) == cursor.get("checksum")
+
+
+def read_since(events_file: Path, cursor: Optional[Dict[str, Any]],
+               keep: int, fallback_count: int = 0,
+               limit: Optional[int] = None) -> Tuple[List[bytes], int, Dict[str, Any]]:
+    """Stream the lines appended after a consolidation cursor.
+
+    Returns (last `keep` new raw lines, number of new lines, new cursor).
+    With `limit`, reading stops after the oldest `limit` new lines and the
+    cursor only advances past them, so the rest is returned next time.
+    The cursor ({"offset", "count", "checksum", "base"}) points just past
+    the last consumed line; `count` is its global sequence number.
+    If the active segment was rotated since, reading resumes at `count`
+    in the closed segments listed in the manifest. If the checksum no
+    longer matches (truncation, rewrite), the log is rescanned from the
+    start and the first `fallback_count` lines are skipped without parsing.
+    """
+    empty = {"offset": 0, "count": 0, "checksum": None, "base": 0}
+    if not events_file.parent.exists():
+        return [], 0, dict(cursor or empty)
+
+    recent = deque(maxlen=keep)
+    new = 0
+    last = cursor.get("checksum") if cursor else None
+
+    def consume(line: bytes) -> None:
+        nonlocal new, last
+        last = line_checksum(line[:-1])
+        if line.strip():
+            recent.append(line[:-1])
+            new += 1
+
+    def full() -> bool:
+        return limit is not None and new >= limit
+
+    with _locked(events_file):
+        with open(events_file, 'ab+') as f:
+            meta = _reconcile(events_file, f, _load_meta(events_file))
+            _save_meta(events_file, meta)
+            base, total = meta["base"], meta["count"]
+
+            if cursor and _cursor_valid(f, cursor, meta):
+                seq, offset = cursor["count"], cursor.get("offset", 0)
+            else:
+                rotated = cursor and cursor.get("base", 0) != base
+                seq = cursor["count"] if rotated else fallback_count
+                if seq > total:
+                    seq = 0
+                offset = None
+
+            # Closed segments still holding unconsumed events
+            if seq < base:
+                for segment in load_manifest(events_file)["segments"]:
+                    if segment["last_seq"] < seq:
+                        continue
+                    skip = max(0, seq - segment["first_seq"])
+                    seq = segment["first_seq"] + skip
+                    for line in _read_segment(events_file, segment):
+                        if skip:
+                            skip -= 1
+                            continue
+                        if full():
+                            break
+                        consume(line if line.endswith(b"\n") else line + b"\n")
+                        seq += 1
+                    if full():
+                        break
+                if full() and seq < base:
+                    # Stopped inside the closed segments; resume there next time
+                    return list(recent), new, {"offset": 0, "count": seq, "checksum": None, "base": base}
+                seq = base
+
+            # Active segment
+            if offset is None:
+                offset, skip, seq = 0, seq - base, base
+            else:
+                skip = 0
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn write at EOF; pick it up next round
+                if not skip and full():
+                    break
+                offset += len(line)
+                seq += 1
+                if skip:
+                    skip -= 1
+                    last = line_checksum(line[:-1])
+                else:
+                    consume(line)
+
+    return list(recent), new, {"offset": offset, "count": seq, "checksum": last, "base": base}
+
+
+def read_meta(events_file: Path) -> Dict[str, Any]:
+    """Return the sidecar, repairing it if it is stale or missing."""
+    if not events_file.exists():
+        return {"count": _next_seq(load_manifest(events_file)), "bytes": 0, "base": 0}
+
+    meta = _load_meta(events_file)
+    if meta and meta["bytes"] == events_file.stat().st_size:
+        return meta
+
+    with _locked(events_file):
+        with open(events_file, 'rb') as f:
+            meta = _reconcile(events_file, f, _load_meta(events_file))
+            _save_meta(events_file, meta)
+    return meta
+
+
+def event_count(events_file: Path) -> int:
+    """Number of events in the log (O(1) via the sidecar)."""
+    return read_meta(events_file)["count"]
+
+
+def mark_consolidated(events_file: Path, count: int) -> None:
+    """Record the event count covered by the latest consolidation."""
+    if not events_file.exists():
+        return
+    with _locked(events_file):
+        with open(events_file, 'rb') as f:
+            meta = _reconcile(events_file, f, _load_meta(events_file))
+            meta["consolidated"] = count
+            _save_meta(events_file, meta)
+
+
+def _rebuild_manifest(events_file: Path) -> Dict[str, Any]:
+    """Recreate the manifest from the segment files on disk."""
+    segments = []
+    for path in sorted(segments_dir(events_file).glob("events-*-*.jsonl.gz")):
+        _, first, last = path.name[:-len(".jsonl.gz")].split("-")
+        lines = list(_read_segment(events_file, {"file": path.name}))
+        timestamps = []
+        for line in (lines[0], lines[-1]) if lines else ():
+            try:
+                timestamps.append(json.loads(line).get("timestamp"))
+            except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+                timestamps.append(None)
+        segments.append({
+            "file": path.name,
+            "first_seq": int(first),
+            "last_seq": int(last),
+            "lines": len(lines),
+            "start": timestamps[0] if timestamps else None,
+            "end": timestamps[-1] if timestamps else None,
+            "bytes": sum(len(line) for line in lines),
+            "compressed_bytes": path.stat().st_size
+        })
+    manifest = {"segments": segments}
+    _save_atomic(manifest_path(events_file), manifest)
+    return manifest
+
+
+def rebuild_index(events_file: Path, consolidated: Optional[int] = None) -> Dict[str, Any]:
+    """Rebuild manifest and sidecar from scratch by scanning segments and the log."""
+    with _locked(events_file):
+        old = _load_meta(events_file) or {}
+        manifest = _rebuild_manifest(events_file)
+        with open(events_file, 'ab+') as f:
+            meta = _reconcile(events_file, f, None)
+            if consolidated is None:
+                consolidated = old.get("consolidated")
+            if consolidated is not None:
+                meta["consolidated"] = consolidated
+            _save_meta(events_file, meta)
+    return dict(meta, segments=len(manifest["segments"]))
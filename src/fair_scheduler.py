@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Fair Scheduler
+
+Bounded asyncio worker pool shared by many owners (e.g. the projects of
+the multi-project watch daemon). Queued jobs are started round-robin over
+owners, and each owner may only have `per_owner` jobs running, so a noisy
+owner cannot starve the others.
+
+    scheduler = FairScheduler(workers=2)
+    scheduler.submit("project-a", lambda: intervene(...))
+    scheduler.cancel("project-a")   # drop queued and cancel running jobs
+
+Jobs are coroutine factories: the coroutine is only created when a slot
+is free. Must be used from within a running event loop.
+"""
+
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Set
+
+Job = Callable[[], Awaitable[Any]]
+
+
+class FairScheduler:
+    """Round-robin over owners, at most `workers` jobs in flight."""
+
+    def __init__(self, workers: int = 2, per_owner: int = 1):
+        self.workers = max(1, workers)
+        self.per_owner = max(1, per_owner)
+        self.queues: Dict[Hashable, Deque[Job]] = {}
+        self.ring: Deque[Hashable] = deque()  # owners with queued jobs, next first
+        self.running: Dict[Hashable, Set[asyncio.Task]] = {}
+
+    def submit(self, owner: Hashable, job: Job) -> None:
+        queue = self.queues.setdefault(owner, deque())
+        queue.append(job)
+        if owner not in self.ring:
+            self.ring.append(owner)
+        self._dispatch()
+
+    def busy(self, owner: Hashable) -> bool:
+        """True while the owner has queued or running jobs."""
+        return bool(self.queues.get(owner)) or bool(self.running.get(owner))
+
+    def cancel(self, owner: Hashable) -> int:
+        """Drop queued jobs and cancel running ones; returns how many were affected."""
+        queued = self.queues.pop(owner, deque())
+        if owner in self.ring:
+            self.ring.remove(owner)
+        tasks = self.running.get(owner, set())
+        for task in tasks:
+            task.cancel()
+        return len(queued) + len(tasks)
+
+    def in_flight(self) -> int:
+        return sum(len(tasks) for tasks in self.running.values())
+
+    def _dispatch(self) -> None:
+        # One pass over the ring per free slot; owners at their limit are skipped
+        skipped = 0
+        while self.ring and self.in_flight() < self.workers and skipped < len(self.ring):
+            owner = self.ring.popleft()
+            if len(self.running.get(owner, ())) >= self.per_owner:
+                self.ring.append(owner)
+                skipped += 1
+                continue
+            skipped = 0
+            queue = self.queues[owner]
+            job = queue.popleft()
+            if queue:
+                self.ring.append(owner)  # back of the line: others go first
+            else:
+                del self.queues[owner]
+            task = asyncio.ensure_future(job())
+            self.running.setdefault(owner, set()).add(task)
+            task.add_done_callback(lambda t, owner=owner: self._finished(owner, t))
+
+    def _finished(self, owner: Hashable, task: asyncio.Task) -> None:
+        tasks = self.running.get(owner)
+        if tasks is not None:
+            tasks.discard(task)
+            if not tasks:
+                del self.running[owner]
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Job for {owner} failed: {task.exception()}")
+        self._dispatch()
+
+    async def close(self) -> None:
+        """Cancel everything and wait for running jobs to finish."""
+        tasks = [task for owner_tasks in self.running.values() for task in owner_tasks]
+        for owner in list(self.queues) + list(self.running):
+            self.cancel(owner)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
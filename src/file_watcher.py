@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+File Watcher
+
+Change notification for the watch daemon without fixed-interval polling:
+
+- InotifyWatcher: Linux inotify through ctypes, integrated into asyncio
+  with loop.add_reader; reacts within milliseconds and sleeps otherwise.
+  Parent directories are watched, so files replaced by rename (editors,
+  atomic writes, event log rotation) are still seen.
+- PollingWatcher: stat()-based fallback (mtime, size, inode) every
+  WATCH_POLL_INTERVAL seconds (default 2) where inotify is unavailable.
+
+    watcher = get_watcher([Path("@fix_plan.md"), EVENTS_FILE])
+    changed = await watcher.wait(timeout=30)   # set of changed paths, empty on timeout
+
+WATCH_BACKEND=poll forces the fallback.
+
+TimerWheel is a hashed timing wheel for deadlines such as stall
+detection: scheduling and cancelling are O(1), and the owner sleeps until
+next_timeout() instead of waking up every tick.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+POLL_INTERVAL = float(os.getenv("WATCH_POLL_INTERVAL", "2"))
+
+# inotify constants (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+
+class InotifyUnavailable(Exception):
+    """inotify cannot be used on this system."""
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        raise InotifyUnavailable(sys.platform)
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    if not hasattr(libc, "inotify_init1"):
+        raise InotifyUnavailable("libc without inotify")
+    return libc
+
+
+class InotifyWatcher:
+    """Watch files through inotify watches on their parent directories."""
+
+    name = "inotify"
+
+    def __init__(self, paths: Iterable[Path]):
+        self.libc = _load_libc()
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise InotifyUnavailable(os.strerror(ctypes.get_errno()))
+
+        self.paths = [Path(p).absolute() for p in paths]
+        self.dirs: Dict[int, Path] = {}
+        for directory in {p.parent for p in self.paths}:
+            if not directory.is_dir():
+                continue
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                self.close()
+                raise InotifyUnavailable(f"{directory}: {os.strerror(ctypes.get_errno())}")
+            self.dirs[wd] = directory
+
+        self.pending: Set[Path] = set()
+        self._ready: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _attach(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._ready = asyncio.Event()
+            self._loop = loop
+            loop.add_reader(self.fd, self._on_readable)
+
+    def _on_readable(self) -> None:
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        for wd, mask, name in _parse_events(data):
+            if mask & IN_Q_OVERFLOW:
+                self.pending.update(self.paths)  # events lost: assume everything changed
+                continue
+            directory = self.dirs.get(wd)
+            if directory is None:
+                continue
+            path = directory / name
+            if path in self.paths:
+                self.pending.add(path)
+        if self.pending:
+            self._ready.set()
+
+    async def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Changed paths since the last call; empty set after `timeout` seconds."""
+        self._attach()
+        if not self.pending:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        changed, self.pending = self.pending, set()
+        self._ready.clear()
+        return changed
+
+    def close(self) -> None:
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.remove_reader(self.fd)
+        self._loop = None
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def _parse_events(data: bytes) -> List[Tuple[int, int, str]]:
+    events = []
+    offset = 0
+    while offset + EVENT_HEADER.size <= len(data):
+        wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+        offset += EVENT_HEADER.size
+        name = data[offset:offset + length].rstrip(b"\0")
+        offset += length
+        events.append((wd, mask, os.fsdecode(name)))
+    return events
+
+
+class PollingWatcher:
+    """stat()-based fallback; cheap enough to poll every few seconds."""
+
+    name = "poll"
+
+    def __init__(self, paths: Iterable[Path], interval: float = POLL_INTERVAL):
+        self.paths = [Path(p).absolute() for p in paths]
+        self.interval = interval
+        self.state = {p: self._stat(p) for p in self.paths}
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    async def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = set()
+            for path in self.paths:
+                current = self._stat(path)
+                if current != self.state[path]:
+                    self.state[path] = current
+                    changed.add(path)
+            if changed:
+                return changed
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return set()
+            await asyncio.sleep(self.interval if remaining is None else min(self.interval, remaining))
+
+    def close(self) -> None:
+        pass
+
+
+def get_watcher(paths: Iterable[Path]):
+    """inotify where available, polling otherwise (or with WATCH_BACKEND=poll)."""
+    paths = list(paths)
+    if os.getenv("WATCH_BACKEND", "auto") != "poll":
+        try:
+            return InotifyWatcher(paths)
+        except (InotifyUnavailable, OSError):
+            pass
+    return PollingWatcher(paths)
+
+
+class Timer:
+    __slots__ = ("tick", "key", "cancelled")
+
+    def __init__(self, tick: int, key: Any):
+        self.tick = tick
+        self.key = key
+        self.cancelled = False
+
+
+class TimerWheel:
+    """Hashed timing wheel with `resolution`-second ticks (monotonic clock)."""
+
+    def __init__(self, resolution: float = 1.0, slots: int = 512):
+        self.resolution = resolution
+        self.slots: List[Set[Timer]] = [set() for _ in range(slots)]
+        self.count = 0
+        self._last_tick = self._tick(time.monotonic())
+
+    def _tick(self, now: float) -> int:
+        return int(now // self.resolution)
+
+    def schedule(self, delay: float, key: Any) -> Timer:
+        """Fire `key` after `delay` seconds (rounded up to the next tick)."""
+        tick = self._tick(time.monotonic() + delay) + 1
+        timer = Timer(tick, key)
+        self.slots[tick % len(self.slots)].add(timer)
+        self.count += 1
+        return timer
+
+    def cancel(self, timer: Optional[Timer]) -> None:
+        if timer is None or timer.cancelled:
+            return
+        timer.cancelled = True
+        slot = self.slots[timer.tick % len(self.slots)]
+        if timer in slot:
+            slot.discard(timer)
+            self.count -= 1
+
+    def expire(self, now: Optional[float] = None) -> List[Any]:
+        """Keys of all timers that are due, in deadline order."""
+        current = self._tick(time.monotonic() if now is None else now)
+        due: List[Timer] = []
+        # Visit every slot passed since the last call (at most one rotation)
+        first = max(self._last_tick + 1, current - len(self.slots) + 1)
+        for tick in range(first, current + 1):
+            slot = self.slots[tick % len(self.slots)]
+            expired = [t for t in slot if t.tick <= current]
+            slot.difference_update(expired)
+            due.extend(expired)
+        self._last_tick = max(self._last_tick, current)
+        self.count -= len(due)
+        for timer in due:
+            timer.cancelled = True  # fired; cancel() becomes a no-op
+        return [t.key for t in sorted(due, key=lambda t: t.tick)]
+
+    def next_timeout(self, now: Optional[float] = None) -> Optional[float]:
+        """Seconds until the next timer is due (None if none is scheduled)."""
+        if not self.count:
+            return None
+        now = time.monotonic() if now is None else now
+        start = min(self._last_tick + 1, self._tick(now))  # slots not yet expired
+        for offset in range(len(self.slots)):
+            tick = start + offset
+            if any(t.tick <= tick for t in self.slots[tick % len(self.slots)]):
+                return max(0.0, tick * self.resolution - now)
+        # Only timers more than one rotation ahead
+        tick = min(t.tick for slot in self.slots for t in slot)
+        return max(0.0, tick * self.resolution - now)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Fix Plan Parser
+
+Single-pass parser for @fix_plan.md producing a compact task model:
+
+    plan = fix_plan.load(Path("@fix_plan.md"))
+    plan.completed, plan.pending            # checkbox counts
+    plan.open_tasks()                       # [Task(id, phase, text, done, priority, ...)]
+    changes = fix_plan.diff(old_plan, plan) # added / removed / completed / reopened / changed
+
+Only list items with a checkbox count as tasks ("- [x] ..."), so "[x]" in
+prose or code blocks is ignored. The phase is the nearest heading above a
+task; a "(Priorität: HOCH)" / "(Priority: high)" annotation becomes the
+priority. Task IDs hash the normalized text without checkbox and
+priority, so they survive ticking, re-prioritizing and moving a task to
+another phase; a reworded task shows up as removed + added.
+"""
+
+import hashlib
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+TASK_RE = re.compile(r"^(\s*)[-*+]\s+\[([ xX])\]\s+(.*?)\s*$")
+HEADING_RE = re.compile(r"^#{1,6}\s+(.*?)\s*#*\s*$")
+FENCE_RE = re.compile(r"^\s*(```|~~~)")
+PRIORITY_RE = re.compile(r"\s*\((?:Priorität|Prioritaet|Priority|Prio)\s*:\s*([^)]+)\)", re.IGNORECASE)
+
+PRIORITY_ORDER = {
+    "kritisch": 0, "critical": 0,
+    "hoch": 1, "high": 1,
+    "mittel": 2, "medium": 2,
+    "niedrig": 3, "low": 3,
+}
+
+_cache: Dict[str, Tuple[bytes, "FixPlan"]] = {}
+
+
+@dataclass
+class Task:
+    id: str
+    phase: str
+    text: str
+    done: bool
+    priority: Optional[str] = None
+    depth: int = 0   # nesting level of sub-tasks
+    line: int = 0    # 1-based line number
+
+    @property
+    def rank(self) -> int:
+        """Sort key of the priority (unknown priorities last)."""
+        return PRIORITY_ORDER.get((self.priority or "").lower(), len(PRIORITY_ORDER))
+
+
+@dataclass
+class FixPlan:
+    tasks: List[Task] = field(default_factory=list)
+    phases: List[str] = field(default_factory=list)
+
+    @property
+    def completed(self) -> int:
+        return sum(1 for t in self.tasks if t.done)
+
+    @property
+    def pending(self) -> int:
+        return sum(1 for t in self.tasks if not t.done)
+
+    def by_id(self) -> Dict[str, Task]:
+        return {t.id: t for t in self.tasks}
+
+    def open_tasks(self) -> List[Task]:
+        return [t for t in self.tasks if not t.done]
+
+    def current_phase(self) -> Optional[str]:
+        """Phase of the first open task."""
+        return next((t.phase for t in self.tasks if not t.done), None)
+
+    def to_dict(self) -> Dict:
+        return {"phases": self.phases, "tasks": [asdict(t) for t in self.tasks]}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "FixPlan":
+        return cls([Task(**t) for t in data.get("tasks", [])], data.get("phases", []))
+
+
+def split_priority(text: str) -> Tuple[str, Optional[str]]:
+    """Task text without its "(Priorität: ...)" annotation, and the priority."""
+    priority = PRIORITY_RE.search(text) if "(" in text else None
+    if priority is None:
+        return text, None
+    return (text[:priority.start()] + text[priority.end():]).strip(), priority.group(1).strip()
+
+
+def normalize(label: str) -> str:
+    return " ".join(label.lower().split())
+
+
+def task_id(text: str, occurrence: int = 0) -> str:
+    """ID that parse() assigns to a task line with this text (checkbox removed)."""
+    return _id(normalize(split_priority(text)[0]), occurrence)
+
+
+def _id(normalized: str, occurrence: int) -> str:
+    digest = hashlib.blake2b(normalized.encode('utf-8'), digest_size=4).hexdigest()
+    return digest if not occurrence else f"{digest}-{occurrence + 1}"
+
+
+def parse(text: str) -> FixPlan:
+    """Parse fix plan markdown in one pass."""
+    plan = FixPlan()
+    phase = ""
+    in_fence = False
+    seen: Dict[str, int] = {}
+
+    for number, line in enumerate(text.splitlines(), 1):
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+
+        match = TASK_RE.match(line) if "[" in line else None
+        if match:
+            indent, mark, body = match.groups()
+            label, priority = split_priority(body)
+            normalized = normalize(label)
+            occurrence = seen.get(normalized, 0)
+            seen[normalized] = occurrence + 1
+            plan.tasks.append(Task(
+                id=_id(normalized, occurrence),
+                phase=phase,
+                text=label,
+                done=mark != " ",
+                priority=priority,
+                depth=len(indent.expandtabs(4)) // 2,
+                line=number
+            ))
+            continue
+
+        # "# Task-Liste" is the title, phases start at "##"
+        heading = HEADING_RE.match(line) if line.startswith("##") else None
+        if heading:
+            phase = heading.group(1)
+            plan.phases.append(phase)
+
+    return plan
+
+
+def load(path: Path) -> FixPlan:
+    """Parse a fix plan file; re-parses only when its content changed.
+
+    Keyed by content digest, not mtime: ticking a checkbox keeps the size
+    and may land in the same mtime tick.
+    """
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return FixPlan()
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    key = str(path.absolute())
+    cached = _cache.get(key)
+    if cached and cached[0] == digest:
+        return cached[1]
+    plan = parse(data.decode('utf-8', errors='replace'))
+    _cache[key] = (digest, plan)
+    return plan
+
+
+@dataclass
+class PlanDiff:
+    added: List[Task] = field(default_factory=list)
+    removed: List[Task] = field(default_factory=list)
+    completed: List[Task] = field(default_factory=list)
+    reopened: List[Task] = field(default_factory=list)
+    changed: List[Task] = field(default_factory=list)  # phase or priority changed
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.removed or self.completed or self.reopened or self.changed)
+
+    def summary(self) -> str:
+        parts = [f"{len(tasks)} {name}" for name, tasks in (
+            ("erledigt", self.completed), ("neu", self.added), ("entfernt", self.removed),
+            ("wieder offen", self.reopened), ("geändert", self.changed)
+        ) if tasks]
+        return ", ".join(parts) or "keine Task-Änderungen"
+
+
+def diff(old: FixPlan, new: FixPlan) -> PlanDiff:
+    """Task-level changes from `old` to `new` (wording of non-task lines is ignored)."""
+    result = PlanDiff()
+    old_tasks = old.by_id()
+    new_ids = set()
+    for task in new.tasks:
+        new_ids.add(task.id)
+        before = old_tasks.get(task.id)
+        if before is None:
+            result.added.append(task)
+        elif task.done and not before.done:
+            result.completed.append(task)
+        elif before.done and not task.done:
+            result.reopened.append(task)
+        elif (task.phase, task.priority) != (before.phase, before.priority):
+            result.changed.append(task)
+    result.removed = [t for t in old.tasks if t.id not in new_ids]
+    return result
+
+
+def format_task(task: Task) -> str:
+    priority = f" ({task.priority})" if task.priority else ""
+    return f"{'  ' * task.depth}- [{'x' if task.done else ' '}] {task.text}{priority} #{task.id}"
+
+
+def format_open(plan: FixPlan, limit: int = 15) -> str:
+    """Open tasks for prompts: current phase first, then by priority."""
+    current = plan.current_phase()
+    tasks = sorted(plan.open_tasks(), key=lambda t: (t.phase != current, t.rank, t.line))
+    lines = [format_task(t) for t in tasks[:limit]]
+    if len(tasks) > limit:
+        lines.append(f"... und {len(tasks) - limit} weitere offene Tasks")
+    return "\n".join(lines) or "Keine offenen Tasks"
+
+
+def format_diff(changes: PlanDiff, limit: int = 20) -> str:
+    """Changed tasks for prompts."""
+    lines = []
+    for label, tasks in (("erledigt", changes.completed), ("neu", changes.added),
+                         ("entfernt", changes.removed), ("wieder offen", changes.reopened),
+                         ("geändert", changes.changed)):
+        lines.extend(f"{label}: {format_task(t).lstrip()}" for t in tasks)
+    if len(lines) > limit:
+        lines = lines[:limit] + [f"... und {len(lines) - limit} weitere Änderungen"]
+    return "\n".join(lines) or "Keine Task-Änderungen"
+
+
+def format_plan(plan: FixPlan) -> str:
+    """Whole task model, grouped by phase, without prose."""
+    lines = []
+    phase = None
+    for task in plan.tasks:
+        if task.phase != phase:
+            phase = task.phase
+            lines.append(f"## {phase}" if phase else "## (ohne Phase)")
+        lines.append(format_task(task))
+    return "\n".join(lines) or "Keine Tasks"
+
+
+def load_snapshot(path: Path) -> Optional[FixPlan]:
+    """Task model saved by save_snapshot (None if missing or unreadable)."""
+    try:
+        return FixPlan.from_dict(json.loads(path.read_text()))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def save_snapshot(path: Path, plan: FixPlan) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(plan.to_dict(), ensure_ascii=False))
+    tmp.replace(path)
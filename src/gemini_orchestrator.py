@@ -12,19 +12,44 @@ Usage:
     python3 gemini_orchestrator.py summary                       # Session zusammenfassen
     python3 gemini_orchestrator.py next                          # Nächste strategische Aktion
     python3 gemini_orchestrator.py watch                         # Daemon: Überwacht Ralph, greift bei Stillstand ein
+    python3 gemini_orchestrator.py watch --projects <dir...>     # Ein Daemon für mehrere Ralph-Projekte
     python3 gemini_orchestrator.py watch --stop                  # Watch-Daemon stoppen
+
+Option --no-cache (oder GEMINI_NO_CACHE=1): Antwort-Cache umgehen, Gemini immer aufrufen.
+Option --no-stream (oder ORCHESTRATOR_STREAM=0): Antworten erst nach Abschluss ausgeben
+statt laufend im Terminal bzw. in .orchestrator_hints.md.
 """
 
+import asyncio
 import json
 import os
-import subprocess
 import sys
 import time
 import hashlib
 import signal
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Tuple
+
+import prompt_builder
+import rate_limiter
+import response_parser
+import response_cache
+import sqlite_store
+from event_log import tail_events
+from fair_scheduler import FairScheduler
+from file_watcher import Timer, TimerWheel, get_watcher
+from fix_plan import (
+    FixPlan, PlanDiff, diff as diff_plans, format_diff, format_open,
+    load as load_plan, load_snapshot, save_snapshot
+)
+from json_store import locked_update
+from multi_provider_consolidator import (
+    RATE_LIMIT_MAX_WAIT, RUNNER, consolidate_async, provider_limits, update_provider_status
+)
+from provider_runner import run_sync
+from knowledge_index import rank
 
 MEMORY_DIR = Path.home() / ".claude-memory"
 EVENTS_FILE = MEMORY_DIR / "events.jsonl"
@@ -40,12 +65,16 @@ AGENT_FILE = Path("@AGENT.md")
 # Communication files (in project directory)
 ORCHESTRATOR_HINTS = Path(".orchestrator_hints.md")
 RALPH_STATUS_FILE = Path(".ralph_status.json")
+PLAN_SNAPSHOT_FILE = Path(".orchestrator_plan.json")  # Task model at the last analyze/summary
 WATCH_PID_FILE = MEMORY_DIR / ".orchestrator_watch.pid"
+WATCH_PROJECTS_FILE = MEMORY_DIR / "watch_projects.json"  # Project list for `watch --projects`
 
 # Watch configuration
-WATCH_INTERVAL = 60  # Check every 60 seconds
+WATCH_INTERVAL = 60  # Status line / busy-intervention retry at most every 60 seconds
 STALL_THRESHOLD = 180  # Consider stalled after 3 minutes without change
 MAX_STALL_INTERVENTIONS = 3  # Max interventions before escalating
+WATCH_WORKERS = int(os.getenv("WATCH_WORKERS", "2"))  # Concurrent interventions across projects
+HINT_FLUSH_INTERVAL = 0.5  # Rewrite a streaming hint at most every 0.5 seconds
 
 
 def load_json(path: Path, default=None):
@@ -56,12 +85,39 @@ def load_json(path: Path, default=None):
 
 
 def load_events(limit: int = 100) -> list:
-    """Load recent events."""
-    if not EVENTS_FILE.exists():
-        return []
-    with open(EVENTS_FILE, 'r') as f:
-        lines = f.readlines()
-    return [json.loads(line) for line in lines[-limit:]]
+    """Load recent events (reads only the tail of the log)."""
+    if sqlite_store.enabled():
+        return sqlite_store.tail_events(limit)
+    return tail_events(EVENTS_FILE, limit)
+
+
+def load_knowledge() -> dict:
+    """Load the knowledge store from the active memory backend."""
+    if sqlite_store.enabled():
+        return dict(sqlite_store.knowledge_items())
+    return load_json(KNOWLEDGE_FILE, {})
+
+
+def plan_changes(root: Path = Path(".")) -> Tuple[FixPlan, Optional[PlanDiff]]:
+    """Current task model and its diff to the last snapshot (None on the first run)."""
+    plan = load_plan(root / FIX_PLAN_FILE)
+    previous = load_snapshot(root / PLAN_SNAPSHOT_FILE)
+    return plan, (diff_plans(previous, plan) if previous is not None else None)
+
+
+def plan_section(plan: FixPlan, changes: Optional[PlanDiff], since: str) -> str:
+    """Prompt section with progress, open tasks and changed tasks instead of the raw plan."""
+    changes_text = format_diff(changes) if changes is not None else "Keine Vergleichsbasis (erster Lauf)"
+    return f"""TASK-STATUS:
+- Erledigt: {plan.completed}
+- Offen: {plan.pending}
+- Aktuelle Phase: {plan.current_phase() or '-'}
+
+OFFENE TASKS:
+{format_open(plan)}
+
+TASK-ÄNDERUNGEN SEIT {since}:
+{changes_text}"""
 
 
 def load_file_if_exists(path: Path) -> str:
@@ -71,8 +127,34 @@ def load_file_if_exists(path: Path) -> str:
     return "[Datei existiert nicht]"
 
 
-def call_gemini(prompt: str, model: str = "gemini-2.0-flash") -> Optional[str]:
-    """Call Gemini with a prompt."""
+def streaming_enabled() -> bool:
+    return os.getenv("ORCHESTRATOR_STREAM", "1") != "0"
+
+
+# Result of the last response cache lookup, attached to the decision log
+_cache_state: dict = {}
+
+
+async def call_gemini_async(prompt: str, model: str = "gemini-2.0-flash",
+                            on_chunk: Optional[Callable[[str], None]] = None) -> Optional[str]:
+    """Call Gemini with a prompt (answered from the response cache when possible).
+
+    `on_chunk` receives the answer incrementally while Gemini writes it
+    (a cached answer arrives as one chunk).
+    """
+    global _cache_state
+    use_cache = response_cache.enabled()
+    if use_cache:
+        cached = response_cache.get(model, prompt)
+        _cache_state = dict(response_cache.record(cached is not None),
+                            result="hit" if cached is not None else "miss")
+        if cached is not None:
+            if on_chunk:
+                on_chunk(cached)
+            return cached
+    else:
+        _cache_state = {"result": "bypass"}
+
     if not GEMINI_CLI.exists():
         print("ERROR: Gemini CLI not found", file=sys.stderr)
         return None
@@ -83,30 +165,72 @@ def call_gemini(prompt: str, model: str = "gemini-2.0-flash") -> Optional[str]:
         "yolo": True
     }
 
-    try:
-        result = subprocess.run(
-            ["node", str(GEMINI_CLI)],
-            input=json.dumps(payload),
-            capture_output=True,
-            text=True,
-            timeout=180
-        )
-
-        if result.returncode == 0:
-            response = json.loads(result.stdout)
-            if response.get("success"):
-                return response.get("output")
-
-        print(f"Gemini error: {result.stderr}", file=sys.stderr)
+    # Shared quota with the consolidator and other orchestrator processes
+    if not await rate_limiter.acquire_async("gemini", provider_limits("gemini"), RATE_LIMIT_MAX_WAIT):
+        print(f"Gemini rate limit: no slot within {RATE_LIMIT_MAX_WAIT:.0f}s", file=sys.stderr)
         return None
 
-    except Exception as e:
-        print(f"Gemini call failed: {e}", file=sys.stderr)
+    result = await RUNNER.call("gemini", GEMINI_CLI, payload, on_chunk=on_chunk)
+    update_provider_status("gemini", result.ok, result.error, result.duration, output=result.output)
+    if not result.ok:
+        print(f"Gemini error: {result.error}", file=sys.stderr)
         return None
 
+    if use_cache and result.output:
+        response_cache.put(model, prompt, result.output)
+    return result.output
+
+
+def call_gemini(prompt: str, model: str = "gemini-2.0-flash") -> Optional[str]:
+    """Blocking wrapper around call_gemini_async."""
+    return run_sync(call_gemini_async(prompt, model))
+
+
+def repair_call(prompt: str) -> Optional[str]:
+    """Cheap follow-up call for response_parser (only the broken section is re-sent)."""
+    print("Abschnitt ungültig, frage Gemini nach einer Korrektur...")
+    return call_gemini(prompt)
+
+
+def print_header(title: str):
+    print("\n" + "="*60)
+    print(title)
+    print("="*60)
+
+
+async def call_gemini_echo_async(prompt: str, title: str,
+                                 model: str = "gemini-2.0-flash") -> Optional[str]:
+    """Call Gemini and print the answer under `title` while it arrives."""
+    if not streaming_enabled():
+        response = await call_gemini_async(prompt, model)
+        if response:
+            print_header(title)
+            print(response)
+        return response
+
+    started = False
+
+    def echo(chunk: str):
+        nonlocal started
+        if not started:
+            print_header(title)
+            started = True
+        print(chunk, end="", flush=True)
+
+    response = await call_gemini_async(prompt, model, on_chunk=echo)
+    if started:
+        print()
+    return response
+
 
-def log_decision(action: str, input_summary: str, output_summary: str):
-    """Log orchestrator decisions."""
+def call_gemini_echo(prompt: str, title: str, model: str = "gemini-2.0-flash") -> Optional[str]:
+    """Blocking wrapper around call_gemini_echo_async."""
+    return run_sync(call_gemini_echo_async(prompt, title, model))
+
+
+def log_decision(action: str, input_summary: str, output_summary: str,
+                 prompt_stats: Optional[dict] = None):
+    """Log orchestrator decisions (with prompt token stats from prompt_builder)."""
     MEMORY_DIR.mkdir(parents=True, exist_ok=True)
     decision = {
         "timestamp": datetime.now().isoformat(),
@@ -114,6 +238,10 @@ def log_decision(action: str, input_summary: str, output_summary: str):
         "input": input_summary[:500],
         "output": output_summary[:500]
     }
+    if _cache_state:
+        decision["cache"] = _cache_state
+    if prompt_stats:
+        decision["prompt"] = prompt_stats
     with open(ORCHESTRATOR_LOG, 'a') as f:
         f.write(json.dumps(decision, ensure_ascii=False) + '\n')
 
@@ -159,13 +287,13 @@ du solltest NICHT weitermachen - sondern neu starten mit Ralph.
     print(f"Initialisiere Aufgabe: {user_task[:100]}...")
 
     # Gather context
-    knowledge = load_json(KNOWLEDGE_FILE, {})
+    knowledge = load_knowledge()
     events = load_events(50)
 
     context_summary = ""
     if knowledge:
         context_summary += "## Bekanntes Wissen\n"
-        for k, v in list(knowledge.items())[:10]:
+        for k, v in rank(knowledge, user_task, 10):
             context_summary += f"- {k}: {v.get('value', v)}\n"
 
     if events:
@@ -241,19 +369,17 @@ Sei präzise, priorisiere sinnvoll, und denke an alle notwendigen Schritte!
         print("ERROR: Gemini konnte nicht antworten", file=sys.stderr)
         return
 
-    # Parse response
-    prompt_md = ""
-    fix_plan = ""
-
-    if "---PROMPT_MD_START---" in response and "---PROMPT_MD_END---" in response:
-        start = response.find("---PROMPT_MD_START---") + len("---PROMPT_MD_START---")
-        end = response.find("---PROMPT_MD_END---")
-        prompt_md = response[start:end].strip()
-
-    if "---FIX_PLAN_START---" in response and "---FIX_PLAN_END---" in response:
-        start = response.find("---FIX_PLAN_START---") + len("---FIX_PLAN_START---")
-        end = response.find("---FIX_PLAN_END---")
-        fix_plan = response[start:end].strip()
+    # Parse response; broken sections are repaired by a small follow-up call
+    sections = response_parser.parse_validated(
+        response, ["PROMPT_MD", "FIX_PLAN"], repair_call=repair_call, context=user_task
+    )
+    for section in sections.values():
+        for warning in section.warnings:
+            print(f"⚠ {section.name}: {warning}")
+        if section.repaired:
+            print(f"✓ {section.name} per Reparatur-Aufruf nachgeliefert")
+    prompt_md = sections["PROMPT_MD"].text if sections["PROMPT_MD"].ok else ""
+    fix_plan = sections["FIX_PLAN"].text if sections["FIX_PLAN"].ok else ""
 
     # Write files
     if prompt_md:
@@ -274,14 +400,14 @@ Sei präzise, priorisiere sinnvoll, und denke an alle notwendigen Schritte!
         PROMPT_FILE.write_text(prompt_md)
         print(f"✓ PROMPT.md erstellt ({len(prompt_md)} Zeichen)")
     else:
-        print("⚠ PROMPT.md konnte nicht extrahiert werden")
+        print(f"⚠ PROMPT.md konnte nicht extrahiert werden: {'; '.join(sections['PROMPT_MD'].errors)}")
         print("Raw response (first 500 chars):", response[:500])
 
     if fix_plan:
         FIX_PLAN_FILE.write_text(fix_plan)
         print(f"✓ @fix_plan.md erstellt ({len(fix_plan)} Zeichen)")
     else:
-        print("⚠ @fix_plan.md konnte nicht extrahiert werden")
+        print(f"⚠ @fix_plan.md konnte nicht extrahiert werden: {'; '.join(sections['FIX_PLAN'].errors)}")
 
     log_decision("init", user_task[:200], f"prompt_md:{len(prompt_md)}, fix_plan:{len(fix_plan)}")
 
@@ -290,34 +416,22 @@ Sei präzise, priorisiere sinnvoll, und denke an alle notwendigen Schritte!
     print("🚀 Bereit! Starte mit: ralph --monitor")
 
 
+def print_prompt_stats(stats: dict):
+    if stats["rebased"]:
+        print(f"Prompt: {stats['tokens']:,} Tokens (neuer Snapshot)")
+    else:
+        print(f"Prompt: {stats['new_tokens']:,} neue von {stats['tokens']:,} Tokens "
+              f"(Aufruf {stats['session_call']} der Session, Rest aus dem Snapshot)")
+
+
 def analyze_situation():
     """Analyze current situation and provide insights."""
     print("Analysiere aktuelle Situation...")
 
-    events = load_events(100)
-    knowledge = load_json(KNOWLEDGE_FILE, {})
-    fix_plan = load_file_if_exists(FIX_PLAN_FILE)
+    plan, changes = plan_changes()
+    completed, pending = plan.completed, plan.pending
 
-    # Count completed vs pending tasks
-    completed = fix_plan.count("[x]") + fix_plan.count("[X]")
-    pending = fix_plan.count("[ ]")
-
-    events_text = "\n".join([
-        f"[{e.get('timestamp', '')[:16]}] {json.dumps(e, ensure_ascii=False)[:100]}"
-        for e in events[-30:]
-    ])
-
-    prompt = f"""Du bist der strategische Orchestrator. Analysiere die aktuelle Situation.
-
-AKTUELLER @fix_plan.md:
-{fix_plan[:2000]}
-
-TASK-STATUS:
-- Erledigt: {completed}
-- Offen: {pending}
-
-LETZTE EVENTS:
-{events_text}
+    prompt, stats = prompt_builder.build("""Analysiere die aktuelle Situation.
 
 ANALYSE-AUFGABEN:
 1. Was wurde bisher erreicht?
@@ -325,16 +439,13 @@ ANALYSE-AUFGABEN:
 3. Ist die aktuelle Priorisierung noch sinnvoll?
 4. Welche nächsten Schritte empfiehlst du?
 
-Antworte strukturiert und präzise (max 300 Wörter).
-"""
+Antworte strukturiert und präzise (max 300 Wörter).""", plan, load_events(100), history=changes)
+    print_prompt_stats(stats)
 
-    response = call_gemini(prompt)
+    response = call_gemini_echo(prompt, "GEMINI ANALYSE:")
     if response:
-        print("\n" + "="*60)
-        print("GEMINI ANALYSE:")
-        print("="*60)
-        print(response)
-        log_decision("analyze", f"completed:{completed}, pending:{pending}", response[:200])
+        log_decision("analyze", f"completed:{completed}, pending:{pending}", response[:200], stats)
+        save_snapshot(PLAN_SNAPSHOT_FILE, plan)
     else:
         print("ERROR: Analyse fehlgeschlagen")
 
@@ -343,21 +454,12 @@ def replan():
     """Re-prioritize the fix plan based on current state."""
     print("Re-priorisiere @fix_plan.md...")
 
-    events = load_events(100)
     current_plan = load_file_if_exists(FIX_PLAN_FILE)
+    # The whole file is rewritten, so the model gets it verbatim (notes and prose included)
+    prompt, stats = prompt_builder.build(f"""Die Task-Liste muss überarbeitet werden.
 
-    events_text = "\n".join([
-        f"[{e.get('timestamp', '')[:16]}] {e.get('action', str(e)[:50])}"
-        for e in events[-30:]
-    ])
-
-    prompt = f"""Du bist der strategische Orchestrator. Die aktuelle Task-Liste muss überarbeitet werden.
-
-AKTUELLER @fix_plan.md:
-{current_plan}
-
-LETZTE EVENTS:
-{events_text}
+AKTUELLE @fix_plan.md (vollständig):
+{current_plan or "(leer)"}
 
 AUFGABE:
 1. Analysiere welche Tasks erledigt wurden (markiere mit [x])
@@ -366,18 +468,26 @@ AUFGABE:
 4. Entferne überflüssige oder doppelte Tasks
 
 AUSGABE:
-Gib den KOMPLETTEN neuen @fix_plan.md aus, ready to use.
-Beginne mit "# Task-Liste" und nutze das Checkbox-Format "- [ ]" bzw "- [x]".
-"""
+Gib den KOMPLETTEN neuen @fix_plan.md aus, ready to use. Grundlage ist die aktuelle
+Datei oben; übernimm Abschnitte ohne Tasks (z.B. "## Notes") und erläuternden
+Text unverändert. Beginne mit "# Task-Liste", gliedere mit "## Phase"-Überschriften
+und nutze das Checkbox-Format "- [ ]" bzw "- [x]". Lass die Task-IDs (#...) weg.""",
+        load_plan(FIX_PLAN_FILE), load_events(100))
+    print_prompt_stats(stats)
 
     response = call_gemini(prompt)
     if response:
-        # Extract just the task list part
-        if "# Task-Liste" in response or "# Task" in response:
-            FIX_PLAN_FILE.write_text(response)
-            print(f"✓ @fix_plan.md aktualisiert")
-            log_decision("replan", current_plan[:200], response[:200])
+        # Only a valid task list replaces @fix_plan.md
+        section = response_parser.parse_task_list(response, repair_call=repair_call)
+        for warning in section.warnings:
+            print(f"⚠ {warning}")
+        if section.ok:
+            FIX_PLAN_FILE.write_text(section.text + "\n")
+            prompt_builder.reset()  # the rewritten plan is the next baseline
+            print("✓ @fix_plan.md aktualisiert" + (" (nach Reparatur-Aufruf)" if section.repaired else ""))
+            log_decision("replan", current_plan[:200], section.text[:200], stats)
         else:
+            print(f"⚠ Keine gültige Task-Liste ({'; '.join(section.errors)}), @fix_plan.md unverändert")
             print("Response:")
             print(response)
     else:
@@ -388,41 +498,24 @@ def handle_stuck(error_description: str):
     """Help when stuck on a problem."""
     print(f"Analysiere Blocker: {error_description[:100]}...")
 
-    events = load_events(50)
-    current_plan = load_file_if_exists(FIX_PLAN_FILE)
-
-    events_text = "\n".join([
-        f"[{e.get('timestamp', '')[:16]}] {json.dumps(e, ensure_ascii=False)[:100]}"
-        for e in events[-20:]
-    ])
-
-    prompt = f"""Du bist der strategische Orchestrator. Ein Claude-Agent ist blockiert.
+    plan, changes = plan_changes()
+    prompt, stats = prompt_builder.build(f"""Ein Claude-Agent ist blockiert.
 
 PROBLEM:
 {error_description}
 
-AKTUELLER @fix_plan.md:
-{current_plan[:1500]}
-
-LETZTE EVENTS:
-{events_text}
-
 HILFE BENÖTIGT:
 1. Was ist die wahrscheinliche Ursache?
 2. Welche alternativen Ansätze gibt es?
 3. Sollte die Task-Reihenfolge geändert werden?
 4. Gibt es fehlende Voraussetzungen?
 
-Gib konkrete, umsetzbare Empfehlungen!
-"""
+Gib konkrete, umsetzbare Empfehlungen!""", plan, load_events(100), history=changes)
+    print_prompt_stats(stats)
 
-    response = call_gemini(prompt)
+    response = call_gemini_echo(prompt, "GEMINI HILFE:")
     if response:
-        print("\n" + "="*60)
-        print("GEMINI HILFE:")
-        print("="*60)
-        print(response)
-        log_decision("stuck", error_description[:200], response[:200])
+        log_decision("stuck", error_description[:200], response[:200], stats)
     else:
         print("ERROR: Stuck-Analyse fehlgeschlagen")
 
@@ -432,12 +525,11 @@ def generate_summary():
     print("Erstelle Session-Zusammenfassung...")
 
     events = load_events(200)
-    knowledge = load_json(KNOWLEDGE_FILE, {})
-    current_plan = load_file_if_exists(FIX_PLAN_FILE)
+    knowledge = load_knowledge()
+    plan, changes = plan_changes()
 
     # Calculate stats
-    completed = current_plan.count("[x]") + current_plan.count("[X]")
-    pending = current_plan.count("[ ]")
+    completed, pending = plan.completed, plan.pending
 
     events_text = "\n".join([
         f"[{e.get('timestamp', '')[:16]}] {e.get('action', str(e)[:50])}"
@@ -454,8 +546,7 @@ STATISTIKEN:
 ALLE EVENTS DIESER SESSION:
 {events_text[:3000]}
 
-AKTUELLER PLAN:
-{current_plan[:1500]}
+{plan_section(plan, changes, "DER LETZTEN ANALYSE/ZUSAMMENFASSUNG")}
 
 ERSTELLE:
 1. **Was wurde erreicht** (Bullet Points)
@@ -466,29 +557,45 @@ ERSTELLE:
 Format: Markdown, präzise, max 400 Wörter.
 """
 
-    response = call_gemini(prompt)
-    if response:
-        print("\n" + "="*60)
-        print("SESSION ZUSAMMENFASSUNG:")
-        print("="*60)
-        print(response)
+    def save_summary(response: str) -> None:
+        def add_session_summary(summaries: dict) -> None:
+            summaries.setdefault("session_summaries", [])
+            summaries["session_summaries"].append({
+                "timestamp": datetime.now().isoformat(),
+                "summary": response,
+                "stats": {"completed": completed, "pending": pending, "events": len(events)}
+            })
+            summaries["session_summaries"] = summaries["session_summaries"][-20:]
+
+        if sqlite_store.enabled():
+            sqlite_store.update_summaries(add_session_summary)
+        else:
+            with locked_update(MEMORY_DIR / "summaries.json", {}) as summaries:
+                add_session_summary(summaries)
 
-        # Save to summaries
-        summaries_file = MEMORY_DIR / "summaries.json"
-        summaries = load_json(summaries_file, {"session_summaries": []})
-        summaries["session_summaries"].append({
-            "timestamp": datetime.now().isoformat(),
-            "summary": response,
-            "stats": {"completed": completed, "pending": pending, "events": len(events)}
-        })
-        summaries["session_summaries"] = summaries["session_summaries"][-20:]
+        log_decision("summary", f"completed:{completed}, pending:{pending}", response[:200])
+        save_snapshot(PLAN_SNAPSHOT_FILE, plan)
+
+    # Consolidate pending memory events while Gemini writes the summary;
+    # the summary is saved as soon as it is there, a long or failing
+    # consolidation can't lose it
+    async def summary_and_consolidation():
+        consolidation = asyncio.ensure_future(consolidate_async())
+        response = await call_gemini_echo_async(prompt, "SESSION ZUSAMMENFASSUNG:")
+        if response:
+            save_summary(response)
+        else:
+            print("ERROR: Summary fehlgeschlagen")
 
-        with open(summaries_file, 'w') as f:
-            json.dump(summaries, f, indent=2, ensure_ascii=False)
+        try:
+            consolidated, consolidation_msg = await consolidation
+        except Exception as e:
+            print(f"Memory-Konsolidierung fehlgeschlagen: {e}")
+        else:
+            if consolidated:
+                print(f"Memory: {consolidation_msg}")
 
-        log_decision("summary", f"completed:{completed}, pending:{pending}", response[:200])
-    else:
-        print("ERROR: Summary fehlgeschlagen")
+    run_sync(summary_and_consolidation())
 
 
 def get_file_hash(path: Path) -> str:
@@ -498,57 +605,139 @@ def get_file_hash(path: Path) -> str:
     return hashlib.md5(path.read_bytes()).hexdigest()
 
 
-def write_hint(hint: str, priority: str = "INFO"):
-    """Write a hint for Ralph to read."""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
+def _write_hint_file(hint: str, priority: str, timestamp: str, complete: bool = True,
+                     root: Path = Path(".")):
+    """Replace the hint file atomically, so Ralph never reads half a file."""
+    status = "" if complete else "**Status:** wird noch geschrieben ...\n"
     hint_content = f"""# Orchestrator Hint
 **Zeit:** {timestamp}
 **Priorität:** {priority}
-
+{status}
 {hint}
 
 ---
 *Diese Datei wird automatisch vom Orchestrator generiert.*
 *Ralph sollte diese Hinweise berücksichtigen.*
 """
-    ORCHESTRATOR_HINTS.write_text(hint_content)
-    print(f"[{timestamp}] Hint geschrieben: {hint[:50]}...")
+    hints_file = root / ORCHESTRATOR_HINTS
+    tmp = hints_file.with_name(hints_file.name + ".tmp")
+    tmp.write_text(hint_content)
+    os.replace(tmp, hints_file)
+
+
+def write_hint(hint: str, priority: str = "INFO", root: Path = Path(".")):
+    """Write a hint for Ralph to read."""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    _write_hint_file(hint, priority, timestamp, root=root)
+    print(f"[{timestamp}] Hint geschrieben{project_label(root)}: {hint[:50]}...")
+
 
+class HintStream:
+    """on_chunk target that writes a hint progressively while Gemini answers.
 
-def clear_hint():
+    Ralph sees the first actionable lines seconds after the call starts;
+    write_hint() replaces the partial hint with the complete one.
+    """
+
+    def __init__(self, priority: str, root: Path = Path(".")):
+        self.priority = priority
+        self.root = root
+        self.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.text = ""
+        self.last_flush = 0.0
+
+    def __call__(self, chunk: str):
+        self.text += chunk
+        now = time.monotonic()
+        if now - self.last_flush >= HINT_FLUSH_INTERVAL:
+            _write_hint_file(self.text, self.priority, self.timestamp, complete=False, root=self.root)
+            self.last_flush = now
+
+
+def hint_stream(priority: str, root: Path = Path(".")) -> Optional[HintStream]:
+    return HintStream(priority, root) if streaming_enabled() else None
+
+
+def clear_hint(root: Path = Path(".")):
     """Remove hint file after it's been processed."""
-    if ORCHESTRATOR_HINTS.exists():
-        ORCHESTRATOR_HINTS.unlink()
+    (root / ORCHESTRATOR_HINTS).unlink(missing_ok=True)
 
 
-def read_ralph_status() -> dict:
+def read_ralph_status(root: Path = Path(".")) -> dict:
     """Read Ralph's status file."""
-    if RALPH_STATUS_FILE.exists():
+    status_file = root / RALPH_STATUS_FILE
+    if status_file.exists():
         try:
-            return json.loads(RALPH_STATUS_FILE.read_text())
+            return json.loads(status_file.read_text())
         except:
             pass
     return {}
 
 
-def watch_daemon():
-    """Watch daemon - monitors Ralph and intervenes on stalls."""
+def project_label(root: Path) -> str:
+    """' (<project>)' for workspaces other than the CWD, for log lines."""
+    return "" if root == Path(".") else f" ({root.name})"
+
+
+@dataclass(eq=False)
+class WatchedProject:
+    """Per-workspace state of the watch daemon (hashable by identity)."""
+    root: Path
+    last_hash: str = ""
+    last_change_time: float = 0.0
+    plan: FixPlan = field(default_factory=FixPlan)
+    last_changes: Optional[PlanDiff] = None  # task changes of the last progress
+    stall_interventions: int = 0
+    stall_timer: Optional[Timer] = None
+    last_report: float = 0.0
+
+    @property
+    def fix_plan(self) -> Path:
+        return self.root / FIX_PLAN_FILE
+
+    def log(self, message: str):
+        print(f"[{datetime.now().strftime('%H:%M:%S')}]{project_label(self.root)} {message}")
+
+
+def load_watch_projects(dirs: List[str]) -> List[Path]:
+    """Project directories from the command line, else from WATCH_PROJECTS_FILE."""
+    if not dirs:
+        dirs = load_json(WATCH_PROJECTS_FILE, [])
+    projects = []
+    for d in dirs:
+        root = Path(d).expanduser().resolve()
+        if not (root / FIX_PLAN_FILE).exists():
+            print(f"Übersprungen (kein @fix_plan.md): {root}")
+        elif root not in projects:
+            projects.append(root)
+    return projects
+
+
+def watch_daemon(roots: Optional[List[Path]] = None):
+    """Watch daemon - monitors Ralph and intervenes on stalls.
+
+    Without `roots` the CWD is watched; otherwise one process supervises
+    all given Ralph workspaces.
+    """
+    roots = roots or [Path(".")]
     print("="*60)
     print("ORCHESTRATOR WATCH DAEMON")
     print("="*60)
-    print(f"Überwache: {FIX_PLAN_FILE.absolute()}")
-    print(f"Check-Intervall: {WATCH_INTERVAL}s")
+    for root in roots:
+        print(f"Überwache: {(root / FIX_PLAN_FILE).absolute()}")
+    print(f"Status-Intervall: {WATCH_INTERVAL}s")
     print(f"Stillstand-Schwelle: {STALL_THRESHOLD}s")
+    if len(roots) > 1:
+        print(f"Parallele Interventionen: {WATCH_WORKERS}")
     print("="*60)
 
     # Save PID for stop command
     WATCH_PID_FILE.write_text(str(os.getpid()))
 
     # State tracking
-    last_hash = get_file_hash(FIX_PLAN_FILE)
-    last_change_time = time.time()
-    stall_interventions = 0
+    now = time.time()
+    projects = [WatchedProject(root, get_file_hash(root / FIX_PLAN_FILE), now, load_plan(root / FIX_PLAN_FILE))
+                for root in roots]
 
     def signal_handler(sig, frame):
         print("\nWatch Daemon beendet.")
@@ -558,106 +747,168 @@ def watch_daemon():
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
-    while True:
-        try:
-            time.sleep(WATCH_INTERVAL)
-
-            current_hash = get_file_hash(FIX_PLAN_FILE)
-            current_time = time.time()
-
-            # Check for changes
-            if current_hash != last_hash:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] Änderung erkannt in @fix_plan.md")
-                last_hash = current_hash
-                last_change_time = current_time
-                stall_interventions = 0
-                clear_hint()  # Clear any previous hints
-                continue
-
-            # Check for stall
-            time_since_change = current_time - last_change_time
-
-            if time_since_change > STALL_THRESHOLD:
-                stall_interventions += 1
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠ Stillstand erkannt ({int(time_since_change)}s)")
-
-                if stall_interventions >= MAX_STALL_INTERVENTIONS:
-                    # Escalate - full replan
-                    print("  → Eskalation: Führe vollständige Neuplanung durch...")
-                    intervene_escalate()
-                    last_change_time = current_time  # Reset timer
-                else:
-                    # Normal intervention - give hint
-                    print(f"  → Intervention {stall_interventions}/{MAX_STALL_INTERVENTIONS}")
-                    intervene_stall(time_since_change)
-                    last_change_time = current_time  # Reset timer
-            else:
-                # Status update
-                ralph_status = read_ralph_status()
-                if ralph_status:
-                    status_str = ralph_status.get("status", "unknown")
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Ralph: {status_str}, letzte Änderung vor {int(time_since_change)}s")
-                else:
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Überwache... (keine Änderung seit {int(time_since_change)}s)")
+    run_sync(watch_loop(projects))
 
-        except Exception as e:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] Fehler: {e}")
 
+async def run_intervention(intervention) -> None:
+    """Run an intervention coroutine in the background, reporting errors."""
+    try:
+        await intervention
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] Intervention fehlgeschlagen: {e}")
 
-def intervene_stall(stall_duration: float):
-    """Intervene when Ralph appears stalled."""
-    events = load_events(20)
-    current_plan = load_file_if_exists(FIX_PLAN_FILE)
 
-    # Get recent events for context
-    events_text = "\n".join([
-        f"- {e.get('action', str(e)[:50])}"
-        for e in events[-5:]
-    ]) if events else "Keine Events"
+async def watch_loop(projects: List[WatchedProject]):
+    """Event-driven monitoring loop; Gemini interventions run in the background meanwhile.
+
+    File changes arrive through inotify (polling fallback), stall detection
+    runs on a timer wheel: the loop sleeps until a file changes or a timer
+    is due. Interventions of all projects share one bounded pool that
+    serves projects round-robin.
+    """
+    by_path: Dict[Path, WatchedProject] = {}
+    for project in projects:
+        by_path[project.fix_plan.absolute()] = project
+        by_path[(project.root / RALPH_STATUS_FILE).absolute()] = project
+    watcher = get_watcher(list(by_path) + [EVENTS_FILE])
+    print(f"Backend: {watcher.name}")
+
+    wheel = TimerWheel()
+    scheduler = FairScheduler(WATCH_WORKERS)
+    for project in projects:
+        project.stall_timer = wheel.schedule(STALL_THRESHOLD, project)
+
+    try:
+        while True:
+            changed = await watcher.wait(wheel.next_timeout())
+            try:
+                current_time = time.time()
+
+                # Check for changes
+                active = set()
+                for path in changed:
+                    project = by_path.get(path)
+                    if project is None:
+                        active.update(projects)  # shared events.jsonl
+                    elif path == project.fix_plan.absolute():
+                        check_fix_plan(project, wheel, scheduler, current_time)
+                    else:
+                        active.add(project)
+
+                # Ralph status / new events: status update (at most every WATCH_INTERVAL)
+                for project in active:
+                    if current_time - project.last_report >= WATCH_INTERVAL:
+                        project.last_report = current_time
+                        report_status(project, current_time)
+
+                # Check for stall
+                for project in wheel.expire():
+                    handle_stall(project, wheel, scheduler, current_time)
+
+            except Exception as e:
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] Fehler: {e}")
+    finally:
+        watcher.close()
+        await scheduler.close()
+
+
+def check_fix_plan(project: WatchedProject, wheel: TimerWheel, scheduler: FairScheduler,
+                   current_time: float):
+    """React to a change event of a project's @fix_plan.md.
+
+    Only task-level changes (ticked, added, removed, re-prioritized tasks)
+    count as progress; edits of prose or comments do not reset the stall timer.
+    """
+    current_hash = get_file_hash(project.fix_plan)
+    if current_hash == project.last_hash:
+        return
+    project.last_hash = current_hash
+    plan = load_plan(project.fix_plan)
+    changes = diff_plans(project.plan, plan)
+    project.plan = plan
+    if changes.empty:
+        project.log("@fix_plan.md geändert, aber kein Task-Fortschritt")
+        return
+    project.log(f"Fortschritt in @fix_plan.md: {changes.summary()}")
+    project.last_changes = changes
+    project.last_change_time = current_time
+    project.stall_interventions = 0
+    wheel.cancel(project.stall_timer)
+    project.stall_timer = wheel.schedule(STALL_THRESHOLD, project)
+    if scheduler.cancel(project):
+        # Ralph made progress; a hint for the old state would be stale
+        print("  → Laufende Intervention abgebrochen")
+    clear_hint(project.root)  # Clear any previous hints
+
+
+def report_status(project: WatchedProject, current_time: float):
+    time_since_change = current_time - project.last_change_time
+    ralph_status = read_ralph_status(project.root)
+    if ralph_status:
+        status_str = ralph_status.get("status", "unknown")
+        project.log(f"Ralph: {status_str}, letzte Änderung vor {int(time_since_change)}s")
+    else:
+        project.log(f"Überwache... (keine Änderung seit {int(time_since_change)}s)")
+
+
+def handle_stall(project: WatchedProject, wheel: TimerWheel, scheduler: FairScheduler,
+                 current_time: float):
+    """Stall timer fired: queue an intervention (or escalation) for the project."""
+    time_since_change = current_time - project.last_change_time
+    if scheduler.busy(project):
+        project.log("Intervention läuft noch...")
+        project.stall_timer = wheel.schedule(WATCH_INTERVAL, project)
+        return
+
+    project.stall_interventions += 1
+    project.log(f"⚠ Stillstand erkannt ({int(time_since_change)}s)")
+
+    if project.stall_interventions >= MAX_STALL_INTERVENTIONS:
+        # Escalate - full replan
+        print("  → Eskalation: Führe vollständige Neuplanung durch...")
+        scheduler.submit(project, lambda: run_intervention(intervene_escalate(project.root)))
+    else:
+        # Normal intervention - give hint
+        print(f"  → Intervention {project.stall_interventions}/{MAX_STALL_INTERVENTIONS}")
+        scheduler.submit(project, lambda: run_intervention(
+            intervene_stall(time_since_change, project.root, project.last_changes)
+        ))
+    project.last_change_time = current_time  # Reset timer
+    project.stall_timer = wheel.schedule(STALL_THRESHOLD, project)
 
-    prompt = f"""Du bist der Orchestrator. Ralph (Claude) scheint seit {int(stall_duration)} Sekunden festzustecken.
 
-AKTUELLER @fix_plan.md:
-{current_plan[:1500]}
+async def intervene_stall(stall_duration: float, root: Path = Path("."),
+                          changes: Optional[PlanDiff] = None):
+    """Intervene when Ralph appears stalled (`changes`: the last task progress)."""
+    progress = format_diff(changes) if changes is not None else "Noch kein Fortschritt beobachtet"
+    prompt, stats = prompt_builder.build(f"""Ralph (Claude) scheint seit {int(stall_duration)} Sekunden festzustecken.
 
-LETZTE EVENTS:
-{events_text}
+LETZTER FORTSCHRITT:
+{progress}
 
 AUFGABE:
 Gib einen KURZEN, KONKRETEN Hinweis (max 100 Wörter):
 1. Was könnte das Problem sein?
 2. Welcher konkrete nächste Schritt hilft?
 
-Sei direkt und praktisch!
-"""
+Sei direkt und praktisch!""", load_plan(root / FIX_PLAN_FILE), load_events(100), root)
 
-    response = call_gemini(prompt, "gemini-2.0-flash")
+    response = await call_gemini_async(prompt, "gemini-2.0-flash", on_chunk=hint_stream("WARNUNG", root))
     if response:
-        write_hint(response, "WARNUNG")
-        log_decision("watch_intervene", f"stall:{int(stall_duration)}s", response[:200])
+        write_hint(response, "WARNUNG", root)
+        log_decision("watch_intervene", f"stall:{int(stall_duration)}s", response[:200], stats)
     else:
-        write_hint("Orchestrator konnte keine Analyse durchführen. Bitte manuell mit 'orchestrate stuck' prüfen.", "FEHLER")
+        write_hint("Orchestrator konnte keine Analyse durchführen. Bitte manuell mit 'orchestrate stuck' prüfen.",
+                   "FEHLER", root)
 
 
-def intervene_escalate():
+async def intervene_escalate(root: Path = Path(".")):
     """Escalated intervention - full replan."""
-    print("  → Rufe Gemini für Neuplanung...")
-
-    events = load_events(50)
-    current_plan = load_file_if_exists(FIX_PLAN_FILE)
-
-    events_text = "\n".join([
-        f"[{e.get('timestamp', '')[:16]}] {e.get('action', str(e)[:50])}"
-        for e in events[-20:]
-    ])
-
-    prompt = f"""Du bist der Orchestrator. Ralph (Claude) ist MEHRFACH festgesteckt. Zeit für eine Neuplanung.
+    print(f"  → Rufe Gemini für Neuplanung{project_label(root)}...")
 
-AKTUELLER @fix_plan.md:
-{current_plan}
-
-LETZTE EVENTS:
-{events_text}
+    prompt, stats = prompt_builder.build("""Ralph (Claude) ist MEHRFACH festgesteckt. Zeit für eine Neuplanung.
 
 ANALYSE & NEUPLANUNG:
 1. Identifiziere das Kernproblem (warum steckt er fest?)
@@ -669,17 +920,20 @@ Gib aus:
 2. KONKRETER NEXT STEP (1 Zeile)
 3. Optional: Neue Task-Priorisierung
 
-Sei pragmatisch - manchmal ist 'überspringen' die richtige Lösung!
-"""
+Sei pragmatisch - manchmal ist 'überspringen' die richtige Lösung!""",
+        load_plan(root / FIX_PLAN_FILE), load_events(100), root)
 
-    response = call_gemini(prompt, "gemini-2.0-flash")
+    response = await call_gemini_async(prompt, "gemini-2.0-flash", on_chunk=hint_stream("ESKALATION", root))
     if response:
-        write_hint(response, "ESKALATION")
-        log_decision("watch_escalate", "multiple_stalls", response[:300])
+        write_hint(response, "ESKALATION", root)
+        log_decision("watch_escalate", "multiple_stalls", response[:300], stats)
 
         # Also update @fix_plan.md if there's a clear new priority
         if "ÜBERSPRINGE" in response.upper() or "SKIP" in response.upper():
             print("  → Schlage Task-Änderung vor...")
+    else:
+        write_hint("Orchestrator konnte keine Neuplanung durchführen. Bitte manuell mit 'orchestrate replan' prüfen.",
+                   "FEHLER", root)
 
 
 def stop_watch_daemon():
@@ -702,10 +956,9 @@ def stop_watch_daemon():
 def suggest_next():
     """Suggest next strategic action."""
     events = load_events(30)
-    current_plan = load_file_if_exists(FIX_PLAN_FILE)
+    plan = load_plan(FIX_PLAN_FILE)
 
-    completed = current_plan.count("[x]") + current_plan.count("[X]")
-    pending = current_plan.count("[ ]")
+    completed, pending = plan.completed, plan.pending
 
     # Determine situation
     if pending == 0 and completed > 0:
@@ -731,6 +984,13 @@ def suggest_next():
 def main():
     MEMORY_DIR.mkdir(parents=True, exist_ok=True)
 
+    if "--no-cache" in sys.argv:
+        sys.argv.remove("--no-cache")
+        os.environ["GEMINI_NO_CACHE"] = "1"
+    if "--no-stream" in sys.argv:
+        sys.argv.remove("--no-stream")
+        os.environ["ORCHESTRATOR_STREAM"] = "0"
+
     if len(sys.argv) < 2:
         print(__doc__)
         sys.exit(1)
@@ -752,6 +1012,12 @@ def main():
     elif cmd == "watch":
         if len(sys.argv) >= 3 and sys.argv[2] == "--stop":
             stop_watch_daemon()
+        elif len(sys.argv) >= 3 and sys.argv[2] == "--projects":
+            projects = load_watch_projects(sys.argv[3:])
+            if not projects:
+                print(f"Keine Projekte angegeben (Verzeichnisse oder Liste in {WATCH_PROJECTS_FILE})")
+                sys.exit(1)
+            watch_daemon(projects)
         else:
             watch_daemon()
     elif cmd == "hint":
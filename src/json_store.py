@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Concurrency-safe JSON Files
+
+Shared read-modify-write primitive for knowledge.json, summaries.json and
+provider_status.json. Writers take an fcntl advisory lock on a sidecar
+`<file>.lock`, write to a temp file, fsync and `os.replace` it into place,
+so readers never see half-written JSON and parallel writers never lose
+updates.
+
+The lock file doubles as a small statistics record of how long writers
+waited for the lock (see lock_stats).
+"""
+
+import fcntl
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+
+def lock_path(path: Path) -> Path:
+    return path.with_name(path.name + ".lock")
+
+
+def load_json(path: Path, default: Any = None) -> Any:
+    """Read a JSON file; safe without a lock because writes are atomic renames."""
+    if path.exists():
+        with open(path, 'r') as f:
+            return json.load(f)
+    return default if default is not None else {}
+
+
+def atomic_write_json(path: Path, data: Any) -> None:
+    """Write JSON via temp file + fsync + os.replace."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _record_wait(lock_file, waited_ms: float) -> None:
+    """Accumulate lock-wait statistics inside the (held) lock file."""
+    lock_file.seek(0)
+    try:
+        stats = json.loads(lock_file.read() or "{}")
+    except json.JSONDecodeError:
+        stats = {}
+    stats["acquisitions"] = stats.get("acquisitions", 0) + 1
+    stats["total_wait_ms"] = round(stats.get("total_wait_ms", 0) + waited_ms, 3)
+    stats["max_wait_ms"] = round(max(stats.get("max_wait_ms", 0), waited_ms), 3)
+    stats["last_wait_ms"] = round(waited_ms, 3)
+    lock_file.seek(0)
+    lock_file.truncate()
+    lock_file.write(json.dumps(stats))
+    lock_file.flush()
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Hold the exclusive advisory lock for `path`."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path(path), 'a+') as lock_file:
+        start = time.perf_counter()
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            _record_wait(lock_file, (time.perf_counter() - start) * 1000)
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@contextmanager
+def locked_update(path: Path, default: Any = None) -> Iterator[Any]:
+    """Locked read-modify-write of a JSON file.
+
+        with locked_update(KNOWLEDGE_FILE, {}) as knowledge:
+            knowledge[key] = ...
+
+    The file is only rewritten if the block completes without raising.
+    """
+    with file_lock(path):
+        data = load_json(path, default)
+        yield data
+        atomic_write_json(path, data)
+
+
+def save_json(path: Path, data: Any) -> None:
+    """Replace a JSON file atomically under its lock."""
+    with file_lock(path):
+        atomic_write_json(path, data)
+
+
+def lock_stats(paths: List[Path]) -> Dict[str, Any]:
+    """Lock-wait statistics per file name (empty dict if never locked)."""
+    stats = {}
+    for path in paths:
+        try:
+            stats[path.name] = json.loads(lock_path(path).read_text() or "{}")
+        except (OSError, json.JSONDecodeError):
+            stats[path.name] = {}
+    return stats
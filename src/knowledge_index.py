@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Knowledge Relevance Index
+
+BM25 inverted index over knowledge keys and values, so context builders
+can pick the entries relevant to the current task instead of the first N
+keys in insertion order.
+
+Postings live in knowledge_index.db (stdlib sqlite3, WAL mode), so a query
+only touches the rows of its own terms and stays in the millisecond range
+with tens of thousands of keys, for the JSON and the SQLite backend alike.
+write_knowledge updates the index incrementally; readers compare entry
+signatures (version + updated) with the knowledge store and re-index only
+the keys that drifted, so writes that bypassed the index heal themselves.
+"""
+
+import heapq
+import math
+import re
+import sqlite3
+from collections import Counter, defaultdict
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+MEMORY_DIR = Path.home() / ".claude-memory"
+INDEX_FILE = MEMORY_DIR / "knowledge_index.db"
+
+# BM25 parameters
+K1 = 1.5
+B = 0.75
+KEY_BOOST = 2  # key terms count this many times
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    key       TEXT PRIMARY KEY,
+    signature TEXT NOT NULL,
+    length    INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    key  TEXT NOT NULL,
+    tf   INTEGER NOT NULL,
+    PRIMARY KEY (term, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_postings_key ON postings(key);
+"""
+
+_WORDS = re.compile(r"[^\W_]+", re.UNICODE)
+_CAMEL = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+
+STOPWORDS = frozenset("""
+    a an and are as at be by for from has have in is it of on or that the this to was
+    were will with der die das und ist nicht ein eine mit von zu den im für auf sich
+    dem des oder als auch es wird bei
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word terms; camelCase and snake_case are split."""
+    return [
+        word for word in _WORDS.findall(_CAMEL.sub(" ", text).lower())
+        if len(word) > 1 and word not in STOPWORDS
+    ]
+
+
+def entry_terms(key: str, value: Any) -> Dict[str, int]:
+    terms = Counter(tokenize(str(value)))
+    for term in tokenize(key):
+        terms[term] += KEY_BOOST
+    return dict(terms)
+
+
+def signature(entry: Dict[str, Any]) -> str:
+    """Changes whenever a knowledge entry is rewritten."""
+    return f"{entry.get('version', 0)}:{entry.get('updated', '')}"
+
+
+class KnowledgeIndex:
+    """BM25 index backed by knowledge_index.db."""
+
+    def __init__(self, db_file: Path = INDEX_FILE):
+        db_file.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(db_file), timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def _put(self, key: str, entry: Dict[str, Any]) -> None:
+        terms = entry_terms(key, entry.get("value", ""))
+        self.conn.execute("DELETE FROM postings WHERE key = ?", (key,))
+        self.conn.executemany(
+            "INSERT INTO postings (term, key, tf) VALUES (?, ?, ?)",
+            ((term, key, tf) for term, tf in terms.items())
+        )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO docs (key, signature, length) VALUES (?, ?, ?)",
+            (key, signature(entry), sum(terms.values()))
+        )
+
+    def _remove(self, key: str) -> None:
+        self.conn.execute("DELETE FROM postings WHERE key = ?", (key,))
+        self.conn.execute("DELETE FROM docs WHERE key = ?", (key,))
+
+    def put(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """(Re-)index knowledge entries in one transaction."""
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            for key, entry in entries.items():
+                self._put(key, entry)
+
+    def sync(self, knowledge: Dict[str, Dict[str, Any]]) -> int:
+        """Re-index entries whose signature changed; returns the number of changes."""
+        indexed = dict(self.conn.execute("SELECT key, signature FROM docs"))
+        stale = [key for key in indexed if key not in knowledge]
+        changed = {
+            key: entry for key, entry in knowledge.items()
+            if indexed.get(key) != signature(entry)
+        }
+        if stale or changed:
+            with self.conn:
+                self.conn.execute("BEGIN IMMEDIATE")
+                for key in stale:
+                    self._remove(key)
+                for key, entry in changed.items():
+                    self._put(key, entry)
+        return len(stale) + len(changed)
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """Top-k (key, score) for a free-text query, best first."""
+        terms = sorted(set(tokenize(query)))
+        n, total_length = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs"
+        ).fetchone()
+        if not terms or not n:
+            return []
+        avg_length = total_length / n or 1.0
+
+        placeholders = ",".join("?" * len(terms))
+        df = dict(self.conn.execute(
+            f"SELECT term, COUNT(*) FROM postings WHERE term IN ({placeholders}) GROUP BY term",
+            terms
+        ))
+        idf = {term: math.log(1 + (n - count + 0.5) / (count + 0.5)) for term, count in df.items()}
+
+        scores: Dict[str, float] = defaultdict(float)
+        rows = self.conn.execute(
+            f"""SELECT p.term, p.key, p.tf, d.length FROM postings p JOIN docs d ON d.key = p.key
+                WHERE p.term IN ({placeholders})""",
+            terms
+        )
+        for term, key, tf, length in rows:
+            norm = K1 * (1 - B + B * length / avg_length)
+            scores[key] += idf[term] * tf * (K1 + 1) / (tf + norm)
+        return heapq.nlargest(k, scores.items(), key=itemgetter(1))
+
+
+_index: Optional[KnowledgeIndex] = None
+
+
+def get_index() -> KnowledgeIndex:
+    """Process-wide index connection."""
+    global _index
+    if _index is None:
+        _index = KnowledgeIndex()
+    return _index
+
+
+def rank(knowledge: Dict[str, Dict[str, Any]], query: Optional[str], k: int,
+         synced: bool = False) -> List[Tuple[str, Dict[str, Any]]]:
+    """Top-k knowledge items for `query`.
+
+    Slots not filled by matches (or all of them, without a query) go to the
+    most recently updated entries. Unless `synced`, the index is first
+    brought up to date with `knowledge`.
+    """
+    keys: List[str] = []
+    if query:
+        index = get_index()
+        if not synced:
+            index.sync(knowledge)
+        keys = [key for key, _ in index.search(query, k) if key in knowledge]
+    if len(keys) < k:
+        chosen = set(keys)
+        keys.extend(heapq.nlargest(
+            k - len(keys),
+            (key for key in knowledge if key not in chosen),
+            key=lambda key: knowledge[key].get("updated", "")
+        ))
+    return [(key, knowledge[key]) for key in keys]
+
+
+def open_items(lines: Iterable[str]) -> str:
+    """Query text from the open `- [ ]` items of a fix plan."""
+    return " ".join(
+        line.strip()[5:] for line in lines if line.strip().startswith("- [ ]")
+    )
@@ -6,24 +6,57 @@ Usage:
     python3 memory_interface.py write <key> <value>
     python3 memory_interface.py read <key>
     python3 memory_interface.py event <json_event>
-    python3 memory_interface.py context [max_tokens]
+    python3 memory_interface.py events [ndjson_file|-]   # Bulk ingest (default: stdin)
+    python3 memory_interface.py context [max_tokens] [query]   # Default query: open @fix_plan.md items
     python3 memory_interface.py consolidate
     python3 memory_interface.py status
+    python3 memory_interface.py rebuild-index
+    python3 memory_interface.py migrate-sqlite
+    python3 memory_interface.py serve            # Persistent server on memory.sock
+
+Set MEMORY_BACKEND=sqlite to use the SQLite store (memory.db) instead of
+knowledge.json / events.jsonl / summaries.json.
+
+read/write/event/context/status are answered by the memory server when
+memory.sock is live (MEMORY_NO_SERVER=1 forces direct file access).
 """
 
 import json
 import os
+import re
+import socket
 import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Optional
 
+import json_store
+import sqlite_store
+import summary_tree
+from context_builder import Section, build_context, get_estimator
+from event_log import (
+    append_events, event_count as count_events, iter_lines, load_manifest, mark_consolidated,
+    rebuild_index, tail_events
+)
+from knowledge_index import get_index, open_items, rank
+
 MEMORY_DIR = Path.home() / ".claude-memory"
 KNOWLEDGE_FILE = MEMORY_DIR / "knowledge.json"
 EVENTS_FILE = MEMORY_DIR / "events.jsonl"
 SUMMARIES_FILE = MEMORY_DIR / "summaries.json"
 AGENT_STATES_FILE = MEMORY_DIR / "agent_states.json"
 CONSOLIDATION_FLAG = MEMORY_DIR / ".needs_consolidation"
+PROVIDER_STATUS_FILE = MEMORY_DIR / "provider_status.json"
+SOCKET_FILE = MEMORY_DIR / "memory.sock"
+FIX_PLAN_FILE = Path("@fix_plan.md")
+
+# Commands the memory server can answer
+SERVER_COMMANDS = {"write", "read", "event", "context", "status"}
+
+# Candidates for context; the token budget decides how many fit
+CONTEXT_KNOWLEDGE = 20
+CONTEXT_EVENTS = 20
+SUMMARY_SHARE = 0.3
 
 
 def ensure_dir():
@@ -31,96 +64,198 @@ def ensure_dir():
 
 
 def load_json(path: Path, default: Any = None) -> Any:
-    if path.exists():
-        with open(path, 'r') as f:
-            return json.load(f)
-    return default if default is not None else {}
-
-
-def save_json(path: Path, data: Any) -> None:
-    ensure_dir()
-    with open(path, 'w') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    return json_store.load_json(path, default)
 
 
 def write_knowledge(key: str, value: Any) -> None:
     """Write key-value to knowledge store."""
-    knowledge = load_json(KNOWLEDGE_FILE, {})
-    knowledge[key] = {
-        "value": value,
-        "updated": datetime.now().isoformat(),
-        "version": knowledge.get(key, {}).get("version", 0) + 1
-    }
-    save_json(KNOWLEDGE_FILE, knowledge)
+    if sqlite_store.enabled():
+        sqlite_store.write_knowledge(key, value)
+        entry = sqlite_store.read_knowledge(key)
+    else:
+        with json_store.locked_update(KNOWLEDGE_FILE, {}) as knowledge:
+            entry = knowledge[key] = {
+                "value": value,
+                "updated": datetime.now().isoformat(),
+                "version": knowledge.get(key, {}).get("version", 0) + 1
+            }
+    get_index().put({key: entry})
     print(json.dumps({"success": True, "key": key}))
 
 
+def load_knowledge() -> dict:
+    """All knowledge entries from the active backend."""
+    if sqlite_store.enabled():
+        return dict(sqlite_store.knowledge_items())
+    return load_json(KNOWLEDGE_FILE, {})
+
+
+def fix_plan_query() -> str:
+    """Open @fix_plan.md items in the current project, used as default context query."""
+    try:
+        return open_items(FIX_PLAN_FILE.read_text().splitlines())
+    except OSError:
+        return ""
+
+
 def read_knowledge(key: str) -> Optional[Any]:
     """Read value from knowledge store."""
-    knowledge = load_json(KNOWLEDGE_FILE, {})
-    if key in knowledge:
-        print(json.dumps({"success": True, "value": knowledge[key]["value"]}))
-        return knowledge[key]["value"]
+    if sqlite_store.enabled():
+        entry = sqlite_store.read_knowledge(key)
+    else:
+        entry = load_json(KNOWLEDGE_FILE, {}).get(key)
+    if entry is not None:
+        print(json.dumps({"success": True, "value": entry["value"]}))
+        return entry["value"]
     print(json.dumps({"success": False, "error": f"Key '{key}' not found"}))
     return None
 
 
-def append_event(event_json: str) -> None:
-    """Append event to chronological log."""
-    ensure_dir()
+def parse_event(event_json: str) -> dict:
+    """Parse a CLI event argument; events without a timestamp get the current time.
+
+    Anything that is not a JSON object is stored as {"message": <text>}.
+    Replayed events keep their timestamp (session gaps in the summary
+    tree depend on it).
+    """
     try:
         event = json.loads(event_json)
     except json.JSONDecodeError:
+        event = None
+    if not isinstance(event, dict):
         event = {"message": event_json}
 
-    event["timestamp"] = datetime.now().isoformat()
+    event.setdefault("timestamp", datetime.now().isoformat())
+    return event
+
+
+def parse_events(lines) -> list:
+    """Parse NDJSON lines into stamped events, skipping blank lines."""
+    return [parse_event(line) for line in lines if line.strip()]
+
 
-    with open(EVENTS_FILE, 'a') as f:
-        f.write(json.dumps(event, ensure_ascii=False) + '\n')
+def store_events(events: list, fsync: bool = False) -> int:
+    """Write events to the active backend in one batch; returns the event count.
+
+    The consolidation threshold is evaluated once per batch.
+    """
+    if sqlite_store.enabled():
+        event_count = sqlite_store.append_events(events)
+        meta = {"consolidated": sqlite_store.get_summary("last_event_count", 0)}
+    else:
+        meta = append_events(EVENTS_FILE, events, fsync=fsync)
+        event_count = meta["count"]
 
     # Check if consolidation needed (>10 events since last)
-    event_count = sum(1 for _ in open(EVENTS_FILE)) if EVENTS_FILE.exists() else 0
-    summaries = load_json(SUMMARIES_FILE, {"last_event_count": 0})
+    if not CONSOLIDATION_FLAG.exists():
+        consolidated = meta.get("consolidated")
+        if consolidated is None:
+            # Seed the sidecar once from summaries.json
+            consolidated = load_json(SUMMARIES_FILE, {}).get("last_event_count", 0)
+            mark_consolidated(EVENTS_FILE, consolidated)
+        if event_count - consolidated >= 10:
+            CONSOLIDATION_FLAG.touch()
 
-    if event_count - summaries.get("last_event_count", 0) >= 10:
-        CONSOLIDATION_FLAG.touch()
+    return event_count
 
+
+def append_event(event_json: str) -> None:
+    """Append event to chronological log."""
+    ensure_dir()
+    event_count = store_events([parse_event(event_json)])
     print(json.dumps({"success": True, "event_count": event_count}))
 
 
-def get_context(max_tokens: int = 4000) -> str:
-    """Get consolidated context for agents."""
-    context_parts = []
+def ingest_events(source: str = "-") -> None:
+    """Bulk-append NDJSON events from a file or stdin with one write + fsync."""
+    ensure_dir()
+    if source == "-":
+        payload = sys.stdin.read()
+    else:
+        with open(source, 'r') as f:
+            payload = f.read()
+
+    # The server gets the payload itself; it has no access to our stdin
+    response = call_server("events", [payload])
+    if response and response.get("ok"):
+        print(response["output"])
+        return
+
+    events = parse_events(payload.splitlines())
+
+    if not events:
+        print(json.dumps({"success": True, "ingested": 0}))
+        return
+
+    event_count = store_events(events, fsync=True)
+    print(json.dumps({"success": True, "ingested": len(events), "event_count": event_count}))
 
-    # 1. Latest summary (if exists)
-    summaries = load_json(SUMMARIES_FILE, {})
-    if "latest_summary" in summaries:
-        context_parts.append(f"## Session Summary\n{summaries['latest_summary']}")
-
-    # 2. Key knowledge points
-    knowledge = load_json(KNOWLEDGE_FILE, {})
-    if knowledge:
-        context_parts.append("## Current Knowledge")
-        for key, data in list(knowledge.items())[:20]:  # Limit to 20 keys
-            context_parts.append(f"- {key}: {data['value']}")
-
-    # 3. Recent events (last 20)
-    if EVENTS_FILE.exists():
-        with open(EVENTS_FILE, 'r') as f:
-            events = [json.loads(line) for line in f.readlines()[-20:]]
-        if events:
-            context_parts.append("## Recent Events")
-            for e in events[-10:]:
-                ts = e.get("timestamp", "")[:16]
-                msg = e.get("message", e.get("action", str(e)))
-                context_parts.append(f"- [{ts}] {msg}")
-
-    context = "\n\n".join(context_parts)
-
-    # Rough token estimate (4 chars = 1 token)
-    if len(context) > max_tokens * 4:
-        context = context[:max_tokens * 4] + "\n...[truncated]"
 
+def summary_items(summaries: dict, budget: int) -> list:
+    """Summary section items: the finest summary tree level that fits `budget` tokens.
+
+    Falls back to the paragraphs of latest_summary before the first
+    hierarchical consolidation.
+    """
+    tree = summaries.get("summary_tree")
+    if tree:
+        return [summary_tree.render(node)
+                for node in summary_tree.select(tree, budget, get_estimator().count)]
+    latest_summary = summaries.get("latest_summary")
+    if latest_summary is None:
+        return []
+    return [p.strip() for p in re.split(r"\n\s*\n", str(latest_summary)) if p.strip()]
+
+
+def format_context(summaries: dict, knowledge_items: list, events: list,
+                   max_tokens: int) -> str:
+    """Render the agent context from summaries, knowledge entries and recent events.
+
+    Items are dropped whole to fit max_tokens (see context_builder): the
+    oldest summaries, later knowledge entries and the oldest events go first.
+    """
+    sections = []
+
+    items = summary_items(summaries, int(max_tokens * SUMMARY_SHARE))
+    if items:
+        sections.append(Section("## Session Summary", items, share=SUMMARY_SHARE,
+                                newest_first=bool(summaries.get("summary_tree"))))
+
+    sections.append(Section(
+        "## Current Knowledge",
+        [f"- {key}: {data['value']}" for key, data in knowledge_items],
+        share=0.3
+    ))
+
+    lines = []
+    for e in events:
+        ts = e.get("timestamp", "")[:16]
+        msg = e.get("message", e.get("action", str(e)))
+        lines.append(f"- [{ts}] {msg}")
+    sections.append(Section("## Recent Events", lines, share=0.4, newest_first=True))
+
+    return build_context(sections, max_tokens)
+
+
+def get_context(max_tokens: int = 4000, query: Optional[str] = None) -> str:
+    """Get consolidated context for agents.
+
+    Knowledge entries are ranked by relevance to `query` (BM25), falling
+    back to the most recently updated ones.
+    """
+    use_sqlite = sqlite_store.enabled()
+
+    # 1. Summaries (the summary tree level is picked by budget)
+    summaries = sqlite_store.load_summaries() if use_sqlite else load_json(SUMMARIES_FILE, {})
+
+    # 2. Knowledge points relevant to the query
+    knowledge_items = rank(load_knowledge(), query, CONTEXT_KNOWLEDGE)
+
+    # 3. Recent events (newest are kept first when the budget is tight)
+    events = (sqlite_store.tail_events(CONTEXT_EVENTS) if use_sqlite
+              else tail_events(EVENTS_FILE, CONTEXT_EVENTS))
+
+    context = format_context(summaries, knowledge_items, events, max_tokens)
     print(context)
     return context
 
@@ -136,26 +271,89 @@ def request_consolidation() -> None:
     }))
 
 
-def show_status() -> None:
-    """Show memory status."""
+def collect_status() -> dict:
+    """Gather memory status from the active backend."""
     ensure_dir()
 
-    event_count = sum(1 for _ in open(EVENTS_FILE)) if EVENTS_FILE.exists() else 0
-    knowledge = load_json(KNOWLEDGE_FILE, {})
-    summaries = load_json(SUMMARIES_FILE, {})
+    if sqlite_store.enabled():
+        event_count = sqlite_store.event_count()
+        knowledge_keys = sqlite_store.knowledge_count()
+        knowledge_preview = [key for key, _ in sqlite_store.knowledge_items(10)]
+        summaries = {
+            key: sqlite_store.get_summary(key)
+            for key in ("last_consolidated", "last_event_count")
+        }
+        closed_segments = None
+    else:
+        event_count = count_events(EVENTS_FILE)
+        knowledge = load_json(KNOWLEDGE_FILE, {})
+        knowledge_keys = len(knowledge)
+        knowledge_preview = list(knowledge.keys())[:10]
+        summaries = load_json(SUMMARIES_FILE, {})
+        closed_segments = len(load_manifest(EVENTS_FILE)["segments"])
     needs_consolidation = CONSOLIDATION_FLAG.exists()
 
     status = {
         "memory_dir": str(MEMORY_DIR),
+        "backend": "sqlite" if sqlite_store.enabled() else "json",
         "event_count": event_count,
-        "knowledge_keys": len(knowledge),
+        "closed_segments": closed_segments,
+        "knowledge_keys": knowledge_keys,
         "last_consolidation": summaries.get("last_consolidated"),
-        "events_since_consolidation": event_count - summaries.get("last_event_count", 0),
+        "events_since_consolidation": event_count - (summaries.get("last_event_count") or 0),
         "needs_consolidation": needs_consolidation,
-        "knowledge_preview": list(knowledge.keys())[:10]
+        "knowledge_preview": knowledge_preview,
+        "lock_wait_ms": json_store.lock_stats([KNOWLEDGE_FILE, SUMMARIES_FILE, PROVIDER_STATUS_FILE])
     }
+    return status
+
+
+def show_status() -> None:
+    """Show memory status."""
+    print(json.dumps(collect_status(), indent=2, ensure_ascii=False))
+
+
+def rebuild_event_index() -> None:
+    """Rebuild events.meta and the segment manifest by rescanning (recovery)."""
+    summaries = load_json(SUMMARIES_FILE, {})
+    meta = rebuild_index(EVENTS_FILE, summaries.get("last_event_count", 0))
+    print(json.dumps({"success": True, **meta}))
+
 
-    print(json.dumps(status, indent=2, ensure_ascii=False))
+def migrate_to_sqlite() -> None:
+    """One-shot import of the JSON stores into memory.db."""
+    ensure_dir()
+    result = sqlite_store.migrate(
+        load_json(KNOWLEDGE_FILE, {}),
+        iter_lines(EVENTS_FILE),
+        load_json(SUMMARIES_FILE, {})
+    )
+    print(json.dumps({
+        "success": True,
+        "db": str(sqlite_store.DB_FILE),
+        "migrated": result,
+        "hint": "export MEMORY_BACKEND=sqlite"
+    }))
+
+
+def call_server(cmd: str, args: list) -> Optional[dict]:
+    """Send one request to the memory server; None if it is not reachable."""
+    if os.getenv("MEMORY_NO_SERVER") or not SOCKET_FILE.exists():
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(10)
+            sock.connect(str(SOCKET_FILE))
+            sock.sendall(json.dumps({"cmd": cmd, "args": args}).encode('utf-8') + b"\n")
+            response = b""
+            while not response.endswith(b"\n"):
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                response += chunk
+        return json.loads(response)
+    except (OSError, ValueError):
+        return None
 
 
 def main():
@@ -165,19 +363,40 @@ def main():
 
     cmd = sys.argv[1]
 
+    args = sys.argv[2:]
+    if cmd == "context":
+        max_tokens = int(args[0]) if args else 4000
+        query = " ".join(args[1:]) or fix_plan_query()
+        args = [str(max_tokens), query]
+
+    # Thin client: let a running memory server answer if possible
+    if cmd in SERVER_COMMANDS:
+        response = call_server(cmd, args)
+        if response and response.get("ok"):
+            print(response["output"])
+            return
+
     if cmd == "write" and len(sys.argv) >= 4:
         write_knowledge(sys.argv[2], sys.argv[3])
     elif cmd == "read" and len(sys.argv) >= 3:
         read_knowledge(sys.argv[2])
     elif cmd == "event" and len(sys.argv) >= 3:
         append_event(sys.argv[2])
+    elif cmd == "events":
+        ingest_events(sys.argv[2] if len(sys.argv) >= 3 else "-")
     elif cmd == "context":
-        max_tokens = int(sys.argv[2]) if len(sys.argv) >= 3 else 4000
-        get_context(max_tokens)
+        get_context(max_tokens, query)
     elif cmd == "consolidate":
         request_consolidation()
     elif cmd == "status":
         show_status()
+    elif cmd == "rebuild-index":
+        rebuild_event_index()
+    elif cmd == "migrate-sqlite":
+        migrate_to_sqlite()
+    elif cmd == "serve":
+        from memory_server import serve
+        serve()
     else:
         print(__doc__)
         sys.exit(1)
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Persistent Memory Server
+
+Long-lived process that keeps knowledge, the recent event ring and the
+summaries in memory and answers memory_interface commands over a Unix
+domain socket. Writes are buffered and flushed to disk in batches
+(every MEMORY_FLUSH_INTERVAL seconds or MEMORY_FLUSH_BATCH writes).
+
+Start:
+    python3 memory_interface.py serve
+
+Protocol (one JSON object per line, one response line per request):
+    -> {"cmd": "read", "args": ["key"]}
+    <- {"ok": true, "output": "{\"success\": true, \"value\": \"...\"}"}
+
+The memory_interface CLI detects the socket automatically and falls back
+to direct file access when no server is running (or MEMORY_NO_SERVER=1).
+"""
+
+import json
+import os
+import signal
+import socketserver
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import memory_interface as mi
+import sqlite_store
+from event_log import append_events, read_meta, tail_events
+from json_store import locked_update
+from knowledge_index import get_index, rank
+
+FLUSH_INTERVAL = float(os.getenv("MEMORY_FLUSH_INTERVAL", "1.0"))
+FLUSH_BATCH = int(os.getenv("MEMORY_FLUSH_BATCH", "100"))
+EVENT_RING_SIZE = 200
+
+
+class MemoryState:
+    """In-memory view of the store plus not-yet-flushed writes."""
+
+    def __init__(self):
+        self.use_sqlite = sqlite_store.enabled()
+        self.dirty: Dict[str, Dict[str, Any]] = {}
+        self.pending: List[Dict[str, Any]] = []
+        self.last_flush = time.monotonic()
+        self.stats = {"started": datetime.now().isoformat(), "requests": 0, "flushes": 0}
+        self._summaries: Dict[str, Any] = {}
+        self._summaries_version = None
+        self.index = get_index()
+        self._load_knowledge()
+        self._load_events()
+
+    def _knowledge_version(self) -> Any:
+        if self.use_sqlite:
+            return sqlite_store.data_version()
+        try:
+            return mi.KNOWLEDGE_FILE.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load_knowledge(self) -> None:
+        self.knowledge_version = self._knowledge_version()
+        if self.use_sqlite:
+            knowledge = dict(sqlite_store.knowledge_items())
+        else:
+            knowledge = mi.load_json(mi.KNOWLEDGE_FILE, {})
+        knowledge.update(self.dirty)  # unflushed local writes win
+        self.knowledge = knowledge
+        self.index.sync(knowledge)
+
+    def _refresh(self) -> None:
+        """Pick up knowledge written by other processes."""
+        if self._knowledge_version() != self.knowledge_version:
+            self._load_knowledge()
+
+    def _load_events(self) -> None:
+        if self.use_sqlite:
+            self.event_total = sqlite_store.event_count()
+            self.consolidated = sqlite_store.get_summary("last_event_count", 0)
+            recent = sqlite_store.tail_events(EVENT_RING_SIZE)
+        else:
+            meta = read_meta(mi.EVENTS_FILE)
+            self.event_total = meta["count"]
+            self.consolidated = meta.get("consolidated")
+            if self.consolidated is None:
+                self.consolidated = mi.load_json(mi.SUMMARIES_FILE, {}).get("last_event_count", 0)
+            recent = tail_events(mi.EVENTS_FILE, EVENT_RING_SIZE)
+        self.recent = deque(recent + self.pending, maxlen=EVENT_RING_SIZE)
+        self.event_total += len(self.pending)
+
+    def summaries(self) -> Dict[str, Any]:
+        """Summaries, reloaded only when the consolidator changed them."""
+        if self.use_sqlite:
+            version = sqlite_store.data_version()
+        else:
+            try:
+                version = mi.SUMMARIES_FILE.stat().st_mtime_ns
+            except FileNotFoundError:
+                version = None
+        if version != self._summaries_version:
+            if self.use_sqlite:
+                self._summaries = sqlite_store.load_summaries()
+            else:
+                self._summaries = mi.load_json(mi.SUMMARIES_FILE, {})
+            self._summaries_version = version
+        return self._summaries
+
+    def op_write(self, key: str, value: Any) -> str:
+        self._refresh()
+        entry = {
+            "value": value,
+            "updated": datetime.now().isoformat(),
+            "version": self.knowledge.get(key, {}).get("version", 0) + 1
+        }
+        self.knowledge[key] = entry
+        self.dirty[key] = entry
+        self.index.put({key: entry})
+        return json.dumps({"success": True, "key": key})
+
+    def op_read(self, key: str) -> str:
+        self._refresh()
+        if key in self.knowledge:
+            return json.dumps({"success": True, "value": self.knowledge[key]["value"]})
+        return json.dumps({"success": False, "error": f"Key '{key}' not found"})
+
+    def op_event(self, event_json: str) -> str:
+        event = mi.parse_event(event_json)
+        self.pending.append(event)
+        self.recent.append(event)
+        self.event_total += 1
+        if self.event_total - self.consolidated >= 10 and not mi.CONSOLIDATION_FLAG.exists():
+            mi.CONSOLIDATION_FLAG.touch()
+        return json.dumps({"success": True, "event_count": self.event_total})
+
+    def op_events(self, ndjson: str) -> str:
+        events = mi.parse_events(ndjson.splitlines())
+        if not events:
+            return json.dumps({"success": True, "ingested": 0})
+        self.pending.extend(events)
+        self.recent.extend(events)
+        self.event_total += len(events)
+        if self.event_total - self.consolidated >= 10 and not mi.CONSOLIDATION_FLAG.exists():
+            mi.CONSOLIDATION_FLAG.touch()
+        # Bulk callers expect the batch on disk when we answer
+        self.flush(fsync=True)
+        return json.dumps({"success": True, "ingested": len(events), "event_count": self.event_total})
+
+    def op_context(self, max_tokens: str = "4000", query: str = "") -> str:
+        self._refresh()
+        return mi.format_context(
+            self.summaries(),
+            rank(self.knowledge, query, mi.CONTEXT_KNOWLEDGE, synced=True),
+            list(self.recent)[-mi.CONTEXT_EVENTS:],
+            int(max_tokens)
+        )
+
+    def op_status(self) -> str:
+        self.flush()
+        status = mi.collect_status()
+        status["server"] = dict(self.stats, pid=os.getpid(), socket=str(mi.SOCKET_FILE))
+        return json.dumps(status, indent=2, ensure_ascii=False)
+
+    def op_ping(self) -> str:
+        return "pong"
+
+    COMMANDS = {
+        "write": (op_write, 2, 2),
+        "read": (op_read, 1, 1),
+        "event": (op_event, 1, 1),
+        "events": (op_events, 1, 1),
+        "context": (op_context, 0, 2),
+        "status": (op_status, 0, 0),
+        "ping": (op_ping, 0, 0),
+    }
+
+    def dispatch(self, line: bytes) -> Dict[str, Any]:
+        """Handle one protocol line; never raises."""
+        try:
+            request = json.loads(line)
+            handler, min_args, max_args = self.COMMANDS[request["cmd"]]
+            args = request.get("args", [])[:max_args]
+            if len(args) < min_args:
+                return {"ok": False, "error": f"{request['cmd']}: missing arguments"}
+            output = handler(self, *args)
+        except Exception as e:
+            return {"ok": False, "error": str(e)[:200]}
+        self.stats["requests"] += 1
+        self.maybe_flush()
+        return {"ok": True, "output": output}
+
+    def flush(self, fsync: bool = False) -> None:
+        """Write buffered knowledge and events to the backend."""
+        if self.dirty:
+            if self.use_sqlite:
+                sqlite_store.put_knowledge(self.dirty)
+            else:
+                with locked_update(mi.KNOWLEDGE_FILE, {}) as knowledge:
+                    knowledge.update(self.dirty)
+                    self.knowledge = dict(knowledge)
+                self.index.sync(self.knowledge)
+            self.dirty = {}
+            self.knowledge_version = self._knowledge_version()
+
+        if self.pending:
+            expected = self.event_total
+            if self.use_sqlite:
+                total = sqlite_store.append_events(self.pending)
+                self.consolidated = sqlite_store.get_summary("last_event_count", 0)
+            else:
+                meta = append_events(mi.EVENTS_FILE, self.pending, fsync=fsync)
+                total = meta["count"]
+                self.consolidated = meta.get("consolidated", self.consolidated)
+            self.pending = []
+            if total != expected:
+                # Other processes appended directly; resync the ring
+                self._load_events()
+
+        self.last_flush = time.monotonic()
+        self.stats["flushes"] += 1
+
+    def maybe_flush(self) -> None:
+        backlog = len(self.pending) + len(self.dirty)
+        if backlog and (backlog >= FLUSH_BATCH or time.monotonic() - self.last_flush >= FLUSH_INTERVAL):
+            self.flush()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = self.server.state.dispatch(line)
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b"\n")
+            self.wfile.flush()
+
+
+class MemoryServer(socketserver.UnixStreamServer):
+    """Single-threaded server; requests are handled one at a time."""
+
+    def __init__(self, socket_path: Path, state: MemoryState):
+        self.state = state
+        super().__init__(str(socket_path), _RequestHandler)
+
+    def service_actions(self):
+        self.state.maybe_flush()
+
+
+def serve(socket_path: Optional[Path] = None) -> None:
+    """Run the memory server until SIGINT/SIGTERM."""
+    socket_path = socket_path or mi.SOCKET_FILE
+    mi.ensure_dir()
+
+    if socket_path.exists():
+        if mi.call_server("ping", []) is not None:
+            print(json.dumps({"success": False, "error": f"Server already running on {socket_path}"}))
+            sys.exit(1)
+        socket_path.unlink()  # stale socket from a crashed server
+
+    state = MemoryState()
+    server = MemoryServer(socket_path, state)
+    os.chmod(socket_path, 0o600)
+    signal.signal(signal.SIGTERM, lambda sig, frame: sys.exit(0))
+
+    print(f"Memory server listening on {socket_path} (PID {os.getpid()})")
+    print(f"Flush: every {FLUSH_INTERVAL}s or {FLUSH_BATCH} writes")
+    sys.stdout.flush()
+
+    try:
+        server.serve_forever(poll_interval=min(FLUSH_INTERVAL, 0.5))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        state.flush()
+        server.server_close()
+        socket_path.unlink(missing_ok=True)
+        print("Memory server stopped.")
@@ -7,25 +7,53 @@ Maximizes free tier usage across all providers.
 
 Usage:
     python3 multi_provider_consolidator.py run       # Run once
-    python3 multi_provider_consolidator.py daemon    # Run as daemon
+    python3 multi_provider_consolidator.py daemon    # Run as daemon (event-triggered)
     python3 multi_provider_consolidator.py force     # Force with any available provider
     python3 multi_provider_consolidator.py status    # Show provider status
+
+Option --hedge (or CONSOLIDATE_HEDGE=1) for run/force/daemon: if a provider has
+not answered within its p90 latency, the next provider is started in parallel
+and the first successful answer wins; the other calls are killed.
+
+Option --parallel (or CONSOLIDATE_PARALLEL=1) for run/force/daemon: map-reduce
+for large backlogs. The whole backlog is split into chunks sized to the
+providers' context windows, summarized concurrently across all available
+providers and reduced into one summary. In both modes finished chunks are
+checkpointed in consolidation_checkpoint.json, so a failed or crashed run
+resumes where it stopped.
+
+The daemon sleeps until .needs_consolidation appears or the event log grows
+(inotify, polling fallback, see file_watcher.py), lets bursts settle for
+CONSOLIDATE_DEBOUNCE seconds and never consolidates more often than every
+MIN_INTERVAL_SECONDS. While providers are in cooldown it waits until the
+first circuit breaker closes, otherwise it backs off exponentially.
 """
 
+import asyncio
 import json
 import os
-import subprocess
 import sys
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Tuple
+from typing import Optional, Dict, List, Tuple
+
+import provider_stats
+import rate_limiter
+import sqlite_store
+import summary_tree
+from context_builder import get_estimator
+from event_log import event_count, mark_consolidated, read_since
+from file_watcher import get_watcher
+from json_store import atomic_write_json, load_json, locked_update
+from provider_runner import ProviderRunner, run_sync
 
 MEMORY_DIR = Path.home() / ".claude-memory"
 EVENTS_FILE = MEMORY_DIR / "events.jsonl"
 SUMMARIES_FILE = MEMORY_DIR / "summaries.json"
 CONSOLIDATION_FLAG = MEMORY_DIR / ".needs_consolidation"
 PROVIDER_STATUS_FILE = MEMORY_DIR / "provider_status.json"
+CHECKPOINT_FILE = MEMORY_DIR / "consolidation_checkpoint.json"
 
 # CLI Paths
 CLI_DIR = Path.home() / ".claude/commands"
@@ -43,7 +71,10 @@ PROVIDERS = {
         "model": "gemini-2.0-flash" if GEMINI_TIER == "pro" else "gemini-3.0-flash",
         "context": 2_000_000 if GEMINI_TIER == "pro" else 1_000_000,
         "daily_limit": 10000 if GEMINI_TIER == "pro" else 60,  # Pro: 2000 RPM = ~10k safe/day
+        "rate_per_minute": 60 if GEMINI_TIER == "pro" else 2,
+        "rate_per_hour": 1000 if GEMINI_TIER == "pro" else 20,
         "cooldown_hours": 0.1 if GEMINI_TIER == "pro" else 1,  # Pro: 6 min cooldown
+        "max_concurrent": 4 if GEMINI_TIER == "pro" else 1,
         "priority": 1
     },
     "qwen": {
@@ -51,7 +82,10 @@ PROVIDERS = {
         "model": "qwen3-turbo",  # Fast, generous limits
         "context": 32_000,
         "daily_limit": 500,     # Very generous
+        "rate_per_minute": 10,
+        "rate_per_hour": 120,
         "cooldown_hours": 0.25, # 15 min
+        "max_concurrent": 2,
         "priority": 2
     },
     "kimi": {
@@ -59,70 +93,169 @@ PROVIDERS = {
         "model": "kimi-k2-0711",
         "context": 256_000,
         "daily_limit": 100,
+        "rate_per_minute": 3,
+        "rate_per_hour": 30,
         "cooldown_hours": 0.5,
+        "max_concurrent": 1,
         "priority": 3
     }
 }
 
+RUNNER = ProviderRunner({name: config["max_concurrent"] for name, config in PROVIDERS.items()})
+
 # Shorter interval for Pro users (more API headroom)
 MIN_INTERVAL_SECONDS = 300 if GEMINI_TIER == "pro" else 900  # Pro: 5 min, Free: 15 min
 
-
-def load_json(path: Path, default=None) -> dict:
-    if path.exists():
-        with open(path, 'r') as f:
-            return json.load(f)
-    return default if default is not None else {}
-
-
-def save_json(path: Path, data: dict) -> None:
-    MEMORY_DIR.mkdir(parents=True, exist_ok=True)
-    with open(path, 'w') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+# Daemon: quiet period before consolidating a burst (at most DEBOUNCE_MAX_SECONDS),
+# backoff after failed runs, safety-net wakeup if a change notification is missed
+DEBOUNCE_SECONDS = float(os.getenv("CONSOLIDATE_DEBOUNCE", "10"))
+DEBOUNCE_MAX_SECONDS = 120
+BACKOFF_BASE_SECONDS = 60
+BACKOFF_MAX_SECONDS = 3600
+DAEMON_IDLE_CHECK = 1800
+
+# Hedged requests: start the next provider once the running one exceeds
+# this percentile of its recorded latencies (or HEDGE_DEFAULT_DELAY until
+# HEDGE_MIN_SAMPLES latencies are known)
+HEDGE_ENABLED = os.getenv("CONSOLIDATE_HEDGE", "0") == "1"
+HEDGE_PERCENTILE = float(os.getenv("CONSOLIDATE_HEDGE_PERCENTILE", "90"))
+HEDGE_DEFAULT_DELAY = float(os.getenv("CONSOLIDATE_HEDGE_DELAY", "60"))
+HEDGE_MIN_SAMPLES = 5
+
+# Longest wait for a rate-limit slot before a call gives up (shared token
+# buckets in rate_limits.json, see rate_limiter.py)
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "300"))
+
+# Map-reduce consolidation: a chunk fills at most this share of the smallest
+# available context window (the rest is prompt and answer); the backlog is
+# split into at least one chunk per concurrent provider slot
+PARALLEL_ENABLED = os.getenv("CONSOLIDATE_PARALLEL", "0") == "1"
+PARALLEL_CONTEXT_SHARE = 0.5
+PARALLEL_MIN_CHUNK_TOKENS = 2000
+PARALLEL_MAX_EVENTS = int(os.getenv("CONSOLIDATE_PARALLEL_MAX_EVENTS", "100000"))
+REDUCE_FANIN = 8  # summaries merged per reduce call
+
+
+def load_summaries() -> dict:
+    """Load summaries from the active memory backend."""
+    if sqlite_store.enabled():
+        return sqlite_store.load_summaries() or {"last_event_count": 0}
+    return load_json(SUMMARIES_FILE, {"last_event_count": 0})
+
+
+def save_summaries(updates: dict, record: Optional[dict] = None) -> None:
+    """Merge consolidation results into the summaries of the active backend.
+
+    The update is a locked read-modify-write, so keys written meanwhile by
+    other processes (e.g. the orchestrator's session_summaries) survive.
+    """
+    def apply(summaries: dict) -> None:
+        summaries.update(updates)
+        if record:
+            summaries["consolidations"] = (summaries.get("consolidations", []) + [record])[-100:]
+
+    if sqlite_store.enabled():
+        sqlite_store.update_summaries(apply)
+        return
+    with locked_update(SUMMARIES_FILE, {}) as summaries:
+        apply(summaries)
+    mark_consolidated(EVENTS_FILE, updates["last_event_count"])
+
+
+def read_new_events(summaries: dict, limit: int) -> Tuple[list, int, dict, int]:
+    """Return (oldest `limit` unconsumed events, their count, cursor past them, events left)."""
+    if sqlite_store.enabled():
+        new_events, new_count, cursor = sqlite_store.events_since(
+            summaries.get("event_cursor"), limit, summaries.get("last_event_count", 0), limit=limit
+        )
+        return new_events, new_count, cursor, sqlite_store.event_count() - cursor["count"]
+
+    # Seek straight to the unconsumed part; at most `limit` lines are parsed
+    lines, new_count, cursor = read_since(
+        EVENTS_FILE,
+        summaries.get("event_cursor"),
+        keep=limit,
+        fallback_count=summaries.get("last_event_count", 0),
+        limit=limit
+    )
+    new_events = []
+    for line in lines:
+        try:
+            new_events.append(json.loads(line))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+    return new_events, new_count, cursor, max(0, event_count(EVENTS_FILE) - cursor["count"])
 
 
-def get_provider_status() -> Dict:
-    """Get or initialize provider status."""
-    status = load_json(PROVIDER_STATUS_FILE, {
-        "providers": {
-            name: {
-                "calls_today": 0,
-                "last_call": None,
-                "last_error": None,
-                "consecutive_errors": 0,
-                "date": datetime.now().strftime("%Y-%m-%d")
-            }
-            for name in PROVIDERS
-        }
-    })
+def init_provider_status(status: Dict) -> Dict:
+    """Fill in missing providers and reset daily counters (in place)."""
+    today = datetime.now().strftime("%Y-%m-%d")
+    providers = status.setdefault("providers", {})
+    for name in PROVIDERS:
+        providers.setdefault(name, {
+            "calls_today": 0,
+            "last_call": None,
+            "last_error": None,
+            "consecutive_errors": 0,
+            "date": today
+        })
 
     # Reset daily counters if new day
-    today = datetime.now().strftime("%Y-%m-%d")
-    for name, pstatus in status["providers"].items():
+    for name, pstatus in providers.items():
         if pstatus.get("date") != today:
             pstatus["calls_today"] = 0
             pstatus["date"] = today
             pstatus["consecutive_errors"] = 0
+            pstatus["breaker_until"] = None
 
     return status
 
 
-def update_provider_status(name: str, success: bool, error: str = None) -> None:
-    """Update provider status after a call."""
-    status = get_provider_status()
-    pstatus = status["providers"][name]
+def get_provider_status() -> Dict:
+    """Get or initialize provider status."""
+    return init_provider_status(load_json(PROVIDER_STATUS_FILE, {}))
+
+
+def update_provider_status(name: str, success: bool, error: str = None,
+                           duration: Optional[float] = None, cancelled: bool = False,
+                           output: Optional[str] = None) -> None:
+    """Update provider status and statistics after a call (locked read-modify-write).
+
+    A cancelled call (a hedging loser) counts against the daily limit but
+    is neither an error nor a latency sample.
+    """
+    with locked_update(PROVIDER_STATUS_FILE, {}) as status:
+        pstatus = init_provider_status(status)["providers"][name]
+
+        pstatus["calls_today"] += 1
+        pstatus["last_call"] = datetime.now().isoformat()
+
+        if cancelled:
+            return
+        provider_stats.record_call(
+            pstatus, success, duration,
+            output_tokens=get_estimator().count(output) if output else 0,
+            error=error,
+            base_cooldown=PROVIDERS[name]["cooldown_hours"] * 3600
+        )
 
-    pstatus["calls_today"] += 1
-    pstatus["last_call"] = datetime.now().isoformat()
 
-    if success:
-        pstatus["consecutive_errors"] = 0
-        pstatus["last_error"] = None
-    else:
-        pstatus["consecutive_errors"] += 1
-        pstatus["last_error"] = error
+def provider_limits(name: str) -> Dict[str, int]:
+    """Token bucket windows of a provider for the shared rate limiter."""
+    config = PROVIDERS[name]
+    return {
+        "minute": config.get("rate_per_minute"),
+        "hour": config.get("rate_per_hour"),
+        "day": config["daily_limit"]
+    }
 
-    save_json(PROVIDER_STATUS_FILE, status)
+
+def latency_percentile(name: str, percentile: float = HEDGE_PERCENTILE) -> Optional[float]:
+    """Latency percentile of successful calls (None without enough samples)."""
+    pstatus = get_provider_status()["providers"][name]
+    if provider_stats.latency_samples(pstatus) < HEDGE_MIN_SAMPLES:
+        return None
+    return provider_stats.percentile(pstatus, percentile)
 
 
 def can_use_provider(name: str) -> Tuple[bool, str]:
@@ -139,23 +272,27 @@ def can_use_provider(name: str) -> Tuple[bool, str]:
     if pstatus["calls_today"] >= config["daily_limit"]:
         return False, f"Daily limit reached ({config['daily_limit']})"
 
-    # Check cooldown after error
-    if pstatus["consecutive_errors"] >= 3:
-        if pstatus["last_call"]:
-            last_call = datetime.fromisoformat(pstatus["last_call"])
-            cooldown = timedelta(hours=config["cooldown_hours"] * pstatus["consecutive_errors"])
-            if datetime.now() < last_call + cooldown:
-                return False, f"In cooldown (consecutive errors: {pstatus['consecutive_errors']})"
+    # Circuit breaker (exponential backoff after repeated errors)
+    if provider_stats.breaker_open(pstatus):
+        until = datetime.fromtimestamp(pstatus["breaker_until"]).strftime("%H:%M:%S")
+        return False, f"Circuit open until {until} (consecutive errors: {pstatus['consecutive_errors']})"
 
     return True, "OK"
 
 
+def ranked_providers() -> list:
+    """Provider names ordered by expected time-to-success and remaining budget."""
+    providers = get_provider_status()["providers"]
+    return sorted(
+        PROVIDERS,
+        key=lambda name: (provider_stats.expected_cost(PROVIDERS[name], providers[name]),
+                          PROVIDERS[name]["priority"])
+    )
+
+
 def select_provider() -> Tuple[Optional[str], str]:
     """Select best available provider."""
-    # Sort by priority
-    sorted_providers = sorted(PROVIDERS.items(), key=lambda x: x[1]["priority"])
-
-    for name, config in sorted_providers:
+    for name in ranked_providers():
         can_use, reason = can_use_provider(name)
         if can_use:
             return name, f"Selected {name}: {reason}"
@@ -163,16 +300,13 @@ def select_provider() -> Tuple[Optional[str], str]:
     return None, "No providers available"
 
 
-def call_provider(name: str, prompt: str) -> Optional[str]:
-    """Call a specific provider."""
-    config = PROVIDERS[name]
-
+def build_payload(name: str, prompt: str) -> Dict:
+    """CLI payload with provider-specific options."""
     payload = {
         "prompt": prompt,
-        "model": config["model"]
+        "model": PROVIDERS[name]["model"]
     }
 
-    # Add provider-specific options
     if name == "qwen":
         payload["approval_mode"] = "yolo"
     elif name == "gemini":
@@ -180,80 +314,175 @@ def call_provider(name: str, prompt: str) -> Optional[str]:
     elif name == "kimi":
         payload["approval_mode"] = "yolo"
 
-    try:
-        result = subprocess.run(
-            ["node", str(config["cli"])],
-            input=json.dumps(payload),
-            capture_output=True,
-            text=True,
-            timeout=180  # 3 min timeout
-        )
+    return payload
 
-        if result.returncode == 0:
-            response = json.loads(result.stdout)
-            if response.get("success"):
-                update_provider_status(name, True)
-                return response.get("output")
 
-        # Error
-        error_msg = result.stderr or result.stdout
-        update_provider_status(name, False, error_msg[:200])
+async def call_provider_async(name: str, prompt: str) -> Optional[str]:
+    """Call a specific provider without blocking the event loop."""
+    if not await rate_limiter.acquire_async(name, provider_limits(name), RATE_LIMIT_MAX_WAIT):
+        print(f"{name}: rate limit, no slot within {RATE_LIMIT_MAX_WAIT:.0f}s")
         return None
+    result = await RUNNER.call(name, PROVIDERS[name]["cli"], build_payload(name, prompt))
+    update_provider_status(name, result.ok, result.error, result.duration, output=result.output)
+    return result.output
 
-    except subprocess.TimeoutExpired:
-        update_provider_status(name, False, "Timeout")
-        return None
-    except Exception as e:
-        update_provider_status(name, False, str(e)[:200])
+
+def call_provider(name: str, prompt: str) -> Optional[str]:
+    """Call a specific provider (blocking)."""
+    return run_sync(call_provider_async(name, prompt))
+
+
+def available_providers() -> List[str]:
+    """Usable providers, best expected cost first."""
+    return [name for name in ranked_providers() if can_use_provider(name)[0]]
+
+
+async def call_with_fallback(prompt: str, hedge: bool = False,
+                             prefer: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+    """Call providers in scheduling order until one succeeds; returns (output, provider).
+
+    Without hedging the next provider starts only after the previous one
+    failed. With hedging it also starts when the running provider exceeds
+    its p90 latency; the first success wins and the other calls are killed.
+    Providers are only charged for calls that were actually started.
+
+    Providers without a free rate-limit slot are skipped; if nothing else
+    is left, the call waits exactly until the earliest slot frees up.
+    `prefer` moves a provider to the front (used to spread parallel calls).
+    """
+    queue = available_providers()
+    if prefer in queue:
+        queue.remove(prefer)
+        queue.insert(0, prefer)
+    running: Dict[asyncio.Task, str] = {}
+    throttled: Dict[str, float] = {}  # provider -> monotonic time its next slot is free
+
+    def launch() -> Optional[str]:
+        while queue:
+            name = queue.pop(0)
+            if not can_use_provider(name)[0]:  # quota may have changed meanwhile
+                continue
+            wait = rate_limiter.try_acquire(name, provider_limits(name))
+            if wait:
+                print(f"{name}: rate limit, next slot in {wait:.1f}s")
+                throttled[name] = time.monotonic() + wait
+                continue
+            print(f"Using provider: {name}" if not running else f"Hedging with: {name}")
+            task = asyncio.ensure_future(
+                RUNNER.call(name, PROVIDERS[name]["cli"], build_payload(name, prompt))
+            )
+            running[task] = name
+            return name
         return None
 
+    latest = launch()
+    try:
+        while running or throttled:
+            if not running:
+                # Every candidate is rate limited: sleep until the earliest slot frees up
+                name = min(throttled, key=throttled.get)
+                wait = max(0.0, throttled.pop(name) - time.monotonic())
+                if wait > RATE_LIMIT_MAX_WAIT:
+                    break
+                await asyncio.sleep(wait)
+                queue.append(name)
+                latest = launch() or latest
+                continue
+
+            delay = None
+            if hedge and queue:
+                delay = latency_percentile(latest)
+                delay = HEDGE_DEFAULT_DELAY if delay is None else delay
+            done, _ = await asyncio.wait(running, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                latest = launch() or latest
+                continue
+
+            # Record every finished call before returning a winner, so calls
+            # that completed together are not counted as cancelled
+            winner = None
+            for task in done:
+                name = running.pop(task)
+                result = task.result()
+                update_provider_status(name, result.ok, result.error, result.duration,
+                                       output=result.output)
+                if result.ok:
+                    winner = winner or (result.output, name)
+                else:
+                    print(f"{name} failed: {(result.error or '').strip()[:80]}")
+            if winner:
+                return winner
+            if not running:
+                latest = launch() or latest
+        return None, None
+    finally:
+        # Kill the losers; they were started, so they count against the daily limit
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+        for name in running.values():
+            update_provider_status(name, False, cancelled=True)
+
+
+ROLLUP_NAMES = {"hour": "Stunden", "session": "Session", "project": "Projekt",
+                "run": "Gesamt"}
+
+
+def event_line(event: dict) -> str:
+    return f"[{event.get('timestamp', '')}] {json.dumps(event, ensure_ascii=False)}"
+
+
+def chunk_prompt(previous_summary: str, events: List[dict], first_seq: int, last_seq: int) -> str:
+    """Prompt summarizing one chunk of events."""
+    events_text = "\n".join(event_line(e) for e in events)
+
+    return f"""Du bist ein Memory-Konsolidator für ein Multi-Agent-System.
 
-def consolidate_with_fallback() -> Tuple[bool, str]:
-    """Consolidate using best available provider with fallback."""
-    MEMORY_DIR.mkdir(parents=True, exist_ok=True)
+VORHERIGE ZUSAMMENFASSUNG:
+{previous_summary}
 
-    # Check if consolidation needed
-    if not CONSOLIDATION_FLAG.exists():
-        return False, "No consolidation needed"
+NEUE EVENTS ({len(events)} Stück, Events {first_seq}-{last_seq}):
+{events_text}
 
-    # Get events
-    summaries = load_json(SUMMARIES_FILE, {"last_event_count": 0})
-    if not EVENTS_FILE.exists():
-        return False, "No events file"
+AUFGABE:
+1. Fasse die neuen Events kurz zusammen (max 150 Wörter)
+2. Identifiziere wichtige Erkenntnisse/Entscheidungen
+3. Notiere offene Aufgaben
 
-    with open(EVENTS_FILE, 'r') as f:
-        all_events = [json.loads(line) for line in f.readlines()]
+FORMAT:
+## Session Update
+[Kurze Zusammenfassung]
 
-    last_count = summaries.get("last_event_count", 0)
-    new_events = all_events[last_count:]
+## Erkenntnisse
+- [Punkt 1]
 
-    if not new_events:
-        CONSOLIDATION_FLAG.unlink(missing_ok=True)
-        return False, "No new events"
+## Offene Aufgaben
+- [ ] [Aufgabe 1]
+"""
 
-    # Prepare prompt
-    events_text = "\n".join([
-        f"[{e.get('timestamp', '')}] {json.dumps(e, ensure_ascii=False)}"
-        for e in new_events[-50:]
-    ])
 
-    previous_summary = summaries.get("latest_summary", "Keine vorherige Zusammenfassung.")
+def rollup_prompt(level: str, children: List[dict], previous: Optional[dict] = None) -> str:
+    """Prompt merging finished child summaries into one `level` summary."""
+    parts = [summary_tree.render(node) for node in children]
+    if previous:
+        parts.insert(0, "BISHERIGE PROJEKT-ZUSAMMENFASSUNG:\n" + summary_tree.render(previous))
+    body = "\n\n".join(parts)
 
-    prompt = f"""Du bist ein Memory-Konsolidator für ein Multi-Agent-System.
+    return f"""Du bist ein Memory-Konsolidator für ein Multi-Agent-System.
 
-VORHERIGE ZUSAMMENFASSUNG:
-{previous_summary}
+Fasse die folgenden Zusammenfassungen zu EINER {ROLLUP_NAMES[level]}-Zusammenfassung zusammen.
+Jede Zusammenfassung nennt den Event-Bereich, den sie abdeckt.
 
-NEUE EVENTS ({len(new_events)} Stück):
-{events_text}
+{body}
 
 AUFGABE:
-1. Fasse die neuen Events kurz zusammen (max 150 Wörter)
-2. Identifiziere wichtige Erkenntnisse/Entscheidungen
-3. Notiere offene Aufgaben
+1. Fasse den gesamten Zeitraum zusammen (max {300 if level == "project" else 200} Wörter)
+2. Behalte wichtige Erkenntnisse/Entscheidungen
+3. Übernimm nur Aufgaben, die noch offen sind
 
 FORMAT:
-## Session Update
+## Zusammenfassung
 [Kurze Zusammenfassung]
 
 ## Erkenntnisse
@@ -263,57 +492,240 @@ FORMAT:
 - [ ] [Aufgabe 1]
 """
 
-    # Try providers in order
+
+def parallel_slots() -> List[str]:
+    """One entry per concurrent call the available providers allow, best first."""
+    return [name for name in available_providers() for _ in range(PROVIDERS[name]["max_concurrent"])]
+
+
+def chunk_token_budget(slots: List[str], total_tokens: int) -> int:
+    """Event tokens per map chunk.
+
+    Capped by the smallest context window among the providers (any chunk
+    may fall back to any of them), and small enough that every slot gets
+    a chunk.
+    """
+    context = min(PROVIDERS[name]["context"] for name in slots)
+    per_slot = -(-total_tokens // len(slots))
+    return max(PARALLEL_MIN_CHUNK_TOKENS, min(int(context * PARALLEL_CONTEXT_SHARE), per_slot))
+
+
+def open_batches(events: List[dict], first_seq: int, done: List[dict],
+                 budget: int) -> List[Tuple[int, int, List[dict]]]:
+    """Chunks of the events not covered by the finished chunks in `done`."""
+    count = get_estimator().count
+    batches = []
+    seq = first_seq
+    end = first_seq + len(events)
+    for node in sorted(done, key=lambda n: n["first_seq"]) + [{"first_seq": end, "last_seq": end - 1}]:
+        gap = events[seq - first_seq:node["first_seq"] - first_seq]
+        batches.extend(summary_tree.chunks(gap, seq, size=len(events), max_tokens=budget,
+                                           cost=lambda e: count(event_line(e))))
+        seq = max(seq, node["last_seq"] + 1)
+    return batches
+
+
+def load_checkpoint(base: int, first_seq: int) -> List[dict]:
+    """Chunks finished by an interrupted run over the same events.
+
+    CHECKPOINT_FILE is keyed by `base`, the event count before the run;
+    a checkpoint of other events is discarded.
+    """
+    checkpoint = load_json(CHECKPOINT_FILE, {})
+    done = [n for n in checkpoint.get("nodes", []) if n["first_seq"] >= first_seq] \
+        if checkpoint.get("base") == base else []
+    if done:
+        print(f"Resuming from checkpoint: {len(done)} chunks already summarized")
+    atomic_write_json(CHECKPOINT_FILE, {"base": base, "nodes": done})
+    return done
+
+
+def checkpoint_chunk(base: int, node: dict) -> None:
+    with locked_update(CHECKPOINT_FILE, {}) as state:
+        if state.get("base") == base:
+            state.setdefault("nodes", []).append(node)
+
+
+async def map_chunks(events: List[dict], first_seq: int, base: int, previous_summary: str,
+                     hedge: bool) -> Optional[List[dict]]:
+    """Summarize all events in concurrent chunks; None if a chunk failed.
+
+    Each finished chunk is checkpointed, and a rerun only summarizes the
+    chunks that are still missing.
+    """
+    done = load_checkpoint(base, first_seq)
+
+    slots = parallel_slots()
+    if not slots:
+        return None
+    total = sum(get_estimator().count(event_line(e)) for e in events)
+    budget = chunk_token_budget(slots, total)
+    batches = open_batches(events, first_seq, done, budget)
+    print(f"Map: {len(batches)} chunks (<= {budget:,} tokens) on {len(slots)} slots")
+
+    semaphore = asyncio.Semaphore(len(slots))
+
+    async def summarize(index: int, first: int, last: int, batch: List[dict]) -> bool:
+        async with semaphore:
+            text, provider = await call_with_fallback(
+                chunk_prompt(previous_summary, batch, first, last), hedge, prefer=slots[index % len(slots)]
+            )
+        if not text:
+            return False
+        node = summary_tree.chunk_node(first, last, batch, text, provider)
+        done.append(node)
+        checkpoint_chunk(base, node)
+        print(f"  Chunk {first}-{last} done ({provider}, {len(done)} total)")
+        return True
+
+    results = await asyncio.gather(*(
+        summarize(index, first, last, batch) for index, (first, last, batch) in enumerate(batches)
+    ))
+    if not all(results):
+        return None
+    return sorted(done, key=lambda n: n["first_seq"])
+
+
+async def reduce_summaries(nodes: List[dict], hedge: bool) -> Optional[str]:
+    """Merge summaries REDUCE_FANIN at a time (concurrently per level) into one."""
+    while len(nodes) > 1:
+        groups = [nodes[i:i + REDUCE_FANIN] for i in range(0, len(nodes), REDUCE_FANIN)]
+        print(f"Reduce: {len(nodes)} summaries -> {len(groups)}")
+        results = await asyncio.gather(*(
+            call_with_fallback(rollup_prompt("run", group), hedge) for group in groups
+        ))
+        if not all(text for text, _ in results):
+            return None
+        nodes = [
+            summary_tree.make_node(
+                "run", group[0]["first_seq"], group[-1]["last_seq"],
+                group[0]["start"], group[-1]["end"], text, provider
+            )
+            for group, (text, provider) in zip(groups, results)
+        ]
+    return nodes[0]["text"] if nodes else None
+
+
+async def consolidate_async(hedge: Optional[bool] = None,
+                            parallel: Optional[bool] = None) -> Tuple[bool, str]:
+    """Consolidate using best available provider with fallback (hedged if enabled).
+
+    Every new event is summarized in chunks of summary_tree.CHUNK_SIZE
+    (or map-reduced with `parallel`); finished hours, sessions and the
+    project summary are rolled up afterwards (see summary_tree.py).
+    """
+    MEMORY_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Check if consolidation needed
+    if not CONSOLIDATION_FLAG.exists():
+        return False, "No consolidation needed"
+
+    # Get events
+    summaries = load_summaries()
+    if not sqlite_store.enabled() and not EVENTS_FILE.exists():
+        return False, "No events file"
+
+    parallel = PARALLEL_ENABLED if parallel is None else parallel
+    new_events, new_count, cursor, remaining = read_new_events(
+        summaries, limit=PARALLEL_MAX_EVENTS if parallel else summary_tree.MAX_EVENTS_PER_RUN
+    )
+
+    if not new_count:
+        CONSOLIDATION_FLAG.unlink(missing_ok=True)
+        return False, "No new events"
+
     provider_name, selection_msg = select_provider()
     if not provider_name:
         return False, f"No provider available: {selection_msg}"
 
-    print(f"Using provider: {provider_name}")
-    summary = call_provider(provider_name, prompt)
-
-    if summary:
-        # Update summaries
-        total_events = len(all_events)
-        summaries["latest_summary"] = summary
-        summaries["last_consolidated"] = datetime.now().isoformat()
-        summaries["last_event_count"] = total_events
-        summaries["last_provider"] = provider_name
-
-        if "consolidations" not in summaries:
-            summaries["consolidations"] = []
-
-        summaries["consolidations"].append({
-            "timestamp": datetime.now().isoformat(),
-            "events_processed": len(new_events),
-            "total_events": total_events,
-            "provider": provider_name
-        })
-        summaries["consolidations"] = summaries["consolidations"][-100:]
+    hedge = HEDGE_ENABLED if hedge is None else hedge
+    if remaining > 0:
+        print(f"{remaining} more events exceed the per-run limit, they follow in the next run")
 
-        save_json(SUMMARIES_FILE, summaries)
+    # 1. Chunk summaries; the cursor only advances if all of them succeed,
+    # finished chunks are checkpointed for the next attempt
+    tree = summaries.get("summary_tree", [])
+    previous_summary = summaries.get("latest_summary", "Keine vorherige Zusammenfassung.")
+    first_seq = cursor["count"] - len(new_events) + 1
+    base = cursor["count"] - new_count
+    if parallel:
+        nodes = await map_chunks(new_events, first_seq, base, previous_summary, hedge)
+        if nodes is None:
+            return False, "All providers failed (finished chunks are checkpointed)"
+        tree.extend(nodes)
+        previous_summary = await reduce_summaries(nodes, hedge) or nodes[-1]["text"]
+        chunk_provider = ",".join(sorted({n["provider"] for n in nodes if n["provider"]}))
+        chunk_count = len(nodes)
+    else:
+        # Each chunk builds on the previous summary: resume after the
+        # contiguous checkpointed prefix
+        seq = first_seq
+        chunk_count = 0
+        for node in sorted(load_checkpoint(base, first_seq), key=lambda n: n["first_seq"]):
+            if node["first_seq"] != seq:
+                break
+            tree.append(node)
+            previous_summary = node["text"]
+            seq = node["last_seq"] + 1
+            chunk_count += 1
+        batches = summary_tree.chunks(new_events[seq - first_seq:], seq)
+        for first, last, events in batches:
+            summary, provider_name = await call_with_fallback(
+                chunk_prompt(previous_summary, events, first, last), hedge
+            )
+            if not summary:
+                return False, "All providers failed (finished chunks are checkpointed)"
+            checkpoint_chunk(base, summary_tree.add_chunk(tree, first, last, events, summary, provider_name))
+            previous_summary = summary
+        chunk_provider = provider_name
+        chunk_count += len(batches)
+
+    # 2. Roll up finished groups; a failed roll-up is retried next run
+    rollups = 0
+    group = summary_tree.next_rollup(tree)
+    while group:
+        level, children = group
+        project = next(iter(summary_tree.level_nodes(tree, "project")), None)
+        text, provider_name = await call_with_fallback(
+            rollup_prompt(level, children, project if level == "project" else None), hedge
+        )
+        if not text:
+            print(f"Roll-up to {level} failed, retrying next run")
+            break
+        summary_tree.add_rollup(tree, level, children, text, provider_name)
+        rollups += 1
+        group = summary_tree.next_rollup(tree)
+
+    # Update summaries
+    total_events = cursor["count"]
+    save_summaries({
+        "latest_summary": previous_summary,
+        "summary_tree": tree,
+        "last_consolidated": datetime.now().isoformat(),
+        "last_event_count": total_events,
+        "event_cursor": cursor,
+        "last_provider": chunk_provider
+    }, record={
+        "timestamp": datetime.now().isoformat(),
+        "events_processed": new_count,
+        "events_remaining": remaining,
+        "chunks": chunk_count,
+        "parallel": parallel,
+        "rollups": rollups,
+        "total_events": total_events,
+        "provider": chunk_provider
+    })
+    if not remaining:
         CONSOLIDATION_FLAG.unlink(missing_ok=True)
+    CHECKPOINT_FILE.unlink(missing_ok=True)
 
-        return True, f"Consolidated with {provider_name}"
+    return True, f"Consolidated with {chunk_provider}"
 
-    # Try fallback
-    for fallback_name in ["qwen", "kimi", "gemini"]:
-        if fallback_name == provider_name:
-            continue
-        can_use, _ = can_use_provider(fallback_name)
-        if can_use:
-            print(f"Trying fallback: {fallback_name}")
-            summary = call_provider(fallback_name, prompt)
-            if summary:
-                # Save (same as above)
-                summaries["latest_summary"] = summary
-                summaries["last_consolidated"] = datetime.now().isoformat()
-                summaries["last_event_count"] = len(all_events)
-                summaries["last_provider"] = fallback_name
-                save_json(SUMMARIES_FILE, summaries)
-                CONSOLIDATION_FLAG.unlink(missing_ok=True)
-                return True, f"Consolidated with fallback {fallback_name}"
 
-    return False, "All providers failed"
+def consolidate_with_fallback(hedge: Optional[bool] = None,
+                              parallel: Optional[bool] = None) -> Tuple[bool, str]:
+    """Blocking wrapper around consolidate_async."""
+    return run_sync(consolidate_async(hedge, parallel))
 
 
 def show_status() -> None:
@@ -323,43 +735,129 @@ def show_status() -> None:
     print("Multi-Provider Consolidator Status")
     print("=" * 50)
 
-    for name, config in PROVIDERS.items():
+    for rank, name in enumerate(ranked_providers(), 1):
+        config = PROVIDERS[name]
         pstatus = status["providers"][name]
         can_use, reason = can_use_provider(name)
 
-        print(f"\n{name.upper()} (priority: {config['priority']})")
+        print(f"\n{name.upper()} (route #{rank}, priority: {config['priority']})")
         print(f"  CLI: {'OK' if config['cli'].exists() else 'MISSING'}")
         print(f"  Model: {config['model']}")
         print(f"  Context: {config['context']:,} tokens")
         print(f"  Calls today: {pstatus['calls_today']}/{config['daily_limit']}")
         print(f"  Last call: {pstatus.get('last_call', 'Never')}")
         print(f"  Errors: {pstatus['consecutive_errors']}")
+        latencies = [provider_stats.percentile(pstatus, p) for p in (50, 95)]
+        if latencies[0] is not None:
+            print(f"  Latency: p50 {latencies[0]:.1f}s, p95 {latencies[1]:.1f}s "
+                  f"({provider_stats.latency_samples(pstatus)} samples)")
+        else:
+            print("  Latency: n/a")
+        rate = provider_stats.success_rate(pstatus)
+        print(f"  Success rate: {f'{rate:.0%}' if rate is not None else 'n/a'}")
+        if pstatus.get("tokens_per_sec"):
+            print(f"  Throughput: {pstatus['tokens_per_sec']:.0f} tokens/s")
+        print(f"  Expected cost: {provider_stats.expected_cost(config, pstatus):.1f}s")
         print(f"  Available: {'YES' if can_use else f'NO - {reason}'}")
 
     print("\n" + "=" * 50)
-    summaries = load_json(SUMMARIES_FILE, {})
+    summaries = load_summaries()
     print(f"Last consolidation: {summaries.get('last_consolidated', 'Never')}")
     print(f"Last provider used: {summaries.get('last_provider', 'None')}")
     print(f"Events processed: {summaries.get('last_event_count', 0)}")
+    tree = summary_tree.stats(summaries.get("summary_tree", []))
+    print("Summary tree: " + ", ".join(f"{count} {level}" for level, count in tree.items()))
 
 
-def daemon_mode():
-    """Run as daemon."""
-    print("Starting Multi-Provider Consolidator Daemon...")
-    print(f"Check interval: 30 minutes")
+def cooldown_remaining() -> Optional[float]:
+    """Seconds until the first provider leaves its circuit breaker.
 
-    while True:
-        try:
-            if CONSOLIDATION_FLAG.exists():
-                print(f"\n[{datetime.now().isoformat()}] Consolidation triggered")
-                success, msg = consolidate_with_fallback()
-                print(f"Result: {msg}")
-            else:
-                print(".", end="", flush=True)
-        except Exception as e:
-            print(f"\nError: {e}", file=sys.stderr)
+    None if a provider is usable now or none of them is in a breaker
+    (e.g. all daily limits reached).
+    """
+    providers = get_provider_status()["providers"]
+    waits = []
+    for name in PROVIDERS:
+        if can_use_provider(name)[0]:
+            return None
+        until = providers[name].get("breaker_until")
+        if until:
+            waits.append(until - time.time())
+    return max(0.0, min(waits)) if waits else None
+
+
+def seconds_since_consolidation() -> float:
+    last = load_summaries().get("last_consolidated")
+    try:
+        return time.time() - datetime.fromisoformat(last).timestamp()
+    except (TypeError, ValueError):
+        return float("inf")
 
-        time.sleep(1800)  # 30 minutes
+
+async def daemon_async(hedge: Optional[bool] = None, parallel: Optional[bool] = None) -> None:
+    MEMORY_DIR.mkdir(parents=True, exist_ok=True)
+    if sqlite_store.enabled():
+        # WAL mode: appends go to memory.db-wal, memory.db only changes at checkpoints
+        log_files = [sqlite_store.DB_FILE, sqlite_store.DB_FILE.with_name(sqlite_store.DB_FILE.name + "-wal")]
+    else:
+        log_files = [EVENTS_FILE]
+    watcher = get_watcher([CONSOLIDATION_FLAG] + log_files)
+    print(f"Watching {CONSOLIDATION_FLAG.name} and {', '.join(f.name for f in log_files)} ({watcher.name})")
+    print(f"Debounce: {DEBOUNCE_SECONDS:g}s, min interval: {MIN_INTERVAL_SECONDS}s")
+
+    last_run = time.monotonic() - seconds_since_consolidation()
+    not_before = 0.0
+    backoff = 0.0
+    try:
+        while True:
+            if not CONSOLIDATION_FLAG.exists():
+                await watcher.wait(DAEMON_IDLE_CHECK)
+                continue
+
+            # Let a burst settle: wait for a quiet period (bounded)
+            deadline = time.monotonic() + DEBOUNCE_MAX_SECONDS
+            while time.monotonic() < deadline:
+                if not await watcher.wait(min(DEBOUNCE_SECONDS, deadline - time.monotonic())):
+                    break
+
+            # Rate floor, backoff and provider cooldowns
+            cooldown = cooldown_remaining()
+            wait = max(last_run + MIN_INTERVAL_SECONDS, not_before) - time.monotonic()
+            wait = max(wait, cooldown or 0.0)
+            if wait > 0:
+                reason = "providers in cooldown" if cooldown and cooldown >= wait else "rate floor/backoff"
+                print(f"Next consolidation in {wait:.0f}s ({reason})")
+                await asyncio.sleep(wait)
+                continue
+
+            print(f"\n[{datetime.now().isoformat()}] Consolidation triggered")
+            last_run = time.monotonic()
+            try:
+                success, msg = await consolidate_async(hedge, parallel)
+            except Exception as e:
+                success, msg = False, f"Error: {e}"
+            print(f"Result: {msg}")
+
+            if success or not CONSOLIDATION_FLAG.exists():
+                backoff = 0.0
+                continue
+            # Failed: retry once a breaker closes, otherwise back off exponentially
+            backoff = min(BACKOFF_MAX_SECONDS, max(BACKOFF_BASE_SECONDS, backoff * 2))
+            cooldown = cooldown_remaining()
+            delay = cooldown if cooldown is not None else backoff
+            not_before = time.monotonic() + delay
+            print(f"Retrying in {delay:.0f}s")
+    finally:
+        watcher.close()
+
+
+def daemon_mode(hedge: Optional[bool] = None, parallel: Optional[bool] = None):
+    """Run as daemon."""
+    print("Starting Multi-Provider Consolidator Daemon...")
+    try:
+        run_sync(daemon_async(hedge, parallel))
+    except KeyboardInterrupt:
+        print("\nDaemon stopped")
 
 
 def main():
@@ -368,16 +866,18 @@ def main():
         sys.exit(1)
 
     cmd = sys.argv[1]
+    hedge = True if "--hedge" in sys.argv[2:] else None
+    parallel = True if "--parallel" in sys.argv[2:] else None
 
     if cmd == "run":
-        success, msg = consolidate_with_fallback()
+        success, msg = consolidate_with_fallback(hedge, parallel)
         print(msg)
     elif cmd == "force":
         CONSOLIDATION_FLAG.touch()
-        success, msg = consolidate_with_fallback()
+        success, msg = consolidate_with_fallback(hedge, parallel)
         print(msg)
     elif cmd == "daemon":
-        daemon_mode()
+        daemon_mode(hedge, parallel)
     elif cmd == "status":
         show_status()
     else:
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Prompt Builder
+
+Assembles orchestrator prompts from blocks in a fixed order:
+
+    1. ROLE      shared instructions, identical for every command
+    2. SNAPSHOT  task model and event tail at the session baseline
+    3. DELTA     task changes and new events since the baseline
+    4. TASK      the command's question and output format
+
+Blocks 1-2 stay byte-identical for every call of a session, so
+provider-side prefix caching applies and only the delta and the task are
+new input. The baseline is kept per project in .orchestrator_session.json.
+It is taken again (the call then sends the full material once) when the
+session is older than ORCHESTRATOR_SESSION_TTL seconds (default 3600), or
+when the delta outgrows REBASE_SHARE of the snapshot.
+
+    prompt, stats = build(task, plan, events, root)
+    stats  # {"tokens", "new_tokens", "session_call", "rebased"}
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from context_builder import get_estimator
+from fix_plan import FixPlan, PlanDiff, diff as diff_plans, format_diff, format_plan
+from json_store import atomic_write_json, load_json
+
+SESSION_FILE = Path(".orchestrator_session.json")
+SESSION_TTL = float(os.getenv("ORCHESTRATOR_SESSION_TTL", "3600"))
+SESSION_VERSION = 1
+REBASE_SHARE = 0.5      # new snapshot once the delta reaches half its size
+SNAPSHOT_EVENTS = 20    # event tail frozen into the snapshot
+DELTA_EVENTS = 30       # new events shown in the delta
+
+ROLE = """Du bist der strategische Orchestrator eines autonomen Entwicklungssystems.
+Ralph (Claude) arbeitet in einer Schleife die Tasks in @fix_plan.md ab; du behältst
+den Überblick, erkennst Blocker und gibst konkrete Empfehlungen.
+
+Aufbau dieser Nachricht:
+1. SNAPSHOT: Tasks und letzte Events zu Beginn der Orchestrator-Session
+2. ÄNDERUNGEN SEIT DEM SNAPSHOT: was sich seitdem getan hat
+3. AUFGABE: was du diesmal tun sollst
+
+Task-IDs (#...) dienen nur der Zuordnung."""
+
+
+def format_event(event: dict) -> str:
+    text = event.get("action") or json.dumps(event, ensure_ascii=False)
+    return f"[{event.get('timestamp', '')[:16]}] {text[:100]}"
+
+
+def last_timestamp(events: List[dict]) -> str:
+    return max((e.get("timestamp", "") for e in events), default="")
+
+
+def render_snapshot(plan: FixPlan, events: List[dict], history: Optional[PlanDiff] = None) -> str:
+    parts = [
+        f"=== SNAPSHOT ({datetime.now().strftime('%Y-%m-%d %H:%M')}) ===",
+        f"TASKS ({plan.completed} erledigt, {plan.pending} offen, "
+        f"aktuelle Phase: {plan.current_phase() or '-'}):\n{format_plan(plan)}",
+    ]
+    if history is not None and not history.empty:
+        parts.append(f"TASK-ÄNDERUNGEN VOR DIESER SESSION:\n{format_diff(history)}")
+    tail = events[-SNAPSHOT_EVENTS:]
+    parts.append("LETZTE EVENTS:\n" + ("\n".join(format_event(e) for e in tail) or "Keine Events"))
+    return "\n\n".join(parts)
+
+
+def render_delta(baseline: FixPlan, plan: FixPlan, new_events: List[dict]) -> str:
+    changes = diff_plans(baseline, plan)
+    if changes.empty and not new_events:
+        return "=== ÄNDERUNGEN SEIT DEM SNAPSHOT ===\nKeine."
+    parts = [
+        "=== ÄNDERUNGEN SEIT DEM SNAPSHOT ===",
+        f"Stand: {plan.completed} erledigt, {plan.pending} offen, "
+        f"aktuelle Phase: {plan.current_phase() or '-'}",
+        f"TASKS ({changes.summary()}):\n{format_diff(changes)}",
+    ]
+    if new_events:
+        shown = new_events[-DELTA_EVENTS:]
+        omitted = len(new_events) - len(shown)
+        lines = [format_event(e) for e in shown]
+        if omitted:
+            lines.insert(0, f"... {omitted} ältere neue Events ausgelassen")
+        parts.append(f"NEUE EVENTS ({len(new_events)}):\n" + "\n".join(lines))
+    return "\n\n".join(parts)
+
+
+def _fresh(session: Dict) -> bool:
+    return (session.get("version") != SESSION_VERSION
+            or time.time() - session.get("started", 0) > SESSION_TTL)
+
+
+def build(task: str, plan: FixPlan, events: List[dict], root: Path = Path("."),
+          history: Optional[PlanDiff] = None) -> Tuple[str, Dict]:
+    """Prompt for `task` with a session-stable prefix; returns (prompt, token stats).
+
+    `events` is the recent event tail (oldest first); `history` are task
+    changes from before the session, shown once in a new snapshot.
+    """
+    count = get_estimator().count
+    path = root / SESSION_FILE
+    try:
+        session = load_json(path, {})
+    except (OSError, ValueError):
+        session = {}
+
+    rebased = _fresh(session)
+    if not rebased:
+        mark = session.get("event_mark", "")
+        delta = render_delta(FixPlan.from_dict(session["plan"]), plan,
+                             [e for e in events if e.get("timestamp", "") > mark])
+        rebased = count(delta) > REBASE_SHARE * count(session["snapshot"])
+    if rebased:
+        session = {
+            "version": SESSION_VERSION,
+            "started": time.time(),
+            "snapshot": render_snapshot(plan, events, history),
+            "plan": plan.to_dict(),
+            "event_mark": last_timestamp(events),
+            "calls": 0
+        }
+        delta = render_delta(plan, plan, [])
+
+    prefix = f"{ROLE}\n\n{session['snapshot']}"
+    prompt = f"{prefix}\n\n{delta}\n\n=== AUFGABE ===\n{task}"
+    session["calls"] += 1
+    session["last_call"] = time.time()
+    try:
+        atomic_write_json(path, session)
+    except OSError:
+        pass
+
+    tokens = count(prompt)
+    return prompt, {
+        "tokens": tokens,
+        "new_tokens": tokens if rebased else tokens - count(prefix),
+        "session_call": session["calls"],
+        "rebased": rebased
+    }
+
+
+def reset(root: Path = Path(".")) -> None:
+    """Forget the session baseline (the next call sends everything)."""
+    (root / SESSION_FILE).unlink(missing_ok=True)
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Async Provider Runner
+
+Runs provider CLIs (`node <cli>` with a JSON payload on stdin) through
+asyncio subprocesses, so several LLM calls can be in flight at once
+instead of serializing multi-minute waits.
+
+    runner = ProviderRunner({"gemini": 4, "kimi": 1})
+    result = await runner.call("gemini", GEMINI_CLI, payload)      # awaitable
+    result = run_sync(runner.call("gemini", GEMINI_CLI, payload))  # blocking
+
+Each provider has its own concurrency limit (PROVIDER_CONCURRENCY, default
+2, if not configured). Cancelling a call or hitting its timeout kills the
+CLI process.
+
+Streaming: with `on_chunk`, the payload gets "stream": true and the CLI
+may print {"chunk": "..."} lines before its final JSON response; each
+chunk is passed to `on_chunk` as it arrives. CLIs that do not stream
+deliver their whole output as one chunk at the end.
+
+Warm workers (PROVIDER_WORKERS=1): instead of one `node` process per call,
+long-lived `node <cli> --worker` processes are reused within an event loop
+(e.g. the watch daemon). They speak newline-delimited JSON:
+
+    -> {"id": 1, "ping": true}               <- {"id": 1, "pong": true}
+    -> {"id": 2, "payload": {...}}           <- {"id": 2, "chunk": "..."}  (optional, repeated)
+                                             <- {"id": 2, "success": true, "output": "..."}
+
+Workers are health-checked before reuse after HEALTH_INTERVAL, replaced
+when they crash and stopped after PROVIDER_WORKER_IDLE seconds unused.
+CLIs that do not answer the startup ping fall back to one process per call.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import time
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, TypeVar
+
+DEFAULT_TIMEOUT = 180  # 3 min, as before with subprocess.run
+DEFAULT_CONCURRENCY = int(os.getenv("PROVIDER_CONCURRENCY", "2"))
+
+WORKERS_ENABLED = os.getenv("PROVIDER_WORKERS", "0") == "1"
+WORKER_IDLE_TIMEOUT = float(os.getenv("PROVIDER_WORKER_IDLE", "300"))
+WORKER_STARTUP_TIMEOUT = 5.0
+HEALTH_INTERVAL = 30.0
+HEALTH_TIMEOUT = 2.0
+MAX_LINE_BYTES = 16 * 1024 * 1024
+
+T = TypeVar("T")
+
+
+@dataclass
+class CallResult:
+    provider: str
+    output: Optional[str] = None
+    error: Optional[str] = None
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.output is not None
+
+
+class WorkerUnavailable(Exception):
+    """The CLI did not start in worker mode."""
+
+
+class WorkerCrashed(Exception):
+    """The worker process exited while a request was pending."""
+
+
+class Worker:
+    """One long-lived `node <cli> --worker` process; one request at a time."""
+
+    def __init__(self, cli: Path):
+        self.cli = cli
+        self.proc: Optional[asyncio.subprocess.Process] = None
+        self.last_used = time.monotonic()
+        self._ids = itertools.count(1)
+
+    @property
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.returncode is None
+
+    async def start(self) -> None:
+        try:
+            self.proc = await asyncio.create_subprocess_exec(
+                "node", str(self.cli), "--worker",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                limit=MAX_LINE_BYTES
+            )
+        except OSError as e:
+            raise WorkerUnavailable(str(e))
+        if not await self.ping(WORKER_STARTUP_TIMEOUT):
+            await self.kill()
+            raise WorkerUnavailable(f"{self.cli} does not support --worker")
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        self.proc.stdin.write(json.dumps(message).encode('utf-8') + b"\n")
+        await self.proc.stdin.drain()
+
+    async def _receive(self, request_id: int) -> Dict[str, Any]:
+        while True:
+            line = await self.proc.stdout.readline()
+            if not line:
+                raise WorkerCrashed(f"{self.cli.name} worker exited")
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue  # stray output
+            if message.get("id") == request_id:
+                return message
+
+    async def ping(self, timeout: float) -> bool:
+        """Health check: True if the worker answers within `timeout`."""
+        if not self.alive:
+            return False
+        request_id = next(self._ids)
+        try:
+            await self._send({"id": request_id, "ping": True})
+            return bool((await asyncio.wait_for(self._receive(request_id), timeout)).get("pong"))
+        except (asyncio.TimeoutError, OSError, WorkerCrashed):
+            return False
+
+    async def request(self, payload: Dict[str, Any], timeout: float,
+                      on_chunk: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """Send one payload; streamed chunks go to `on_chunk`."""
+        request_id = next(self._ids)
+
+        async def exchange() -> Dict[str, Any]:
+            await self._send({"id": request_id, "payload": payload})
+            chunks: List[str] = []
+            while True:
+                message = await self._receive(request_id)
+                if "chunk" in message:
+                    chunks.append(message["chunk"])
+                    if on_chunk:
+                        on_chunk(message["chunk"])
+                    continue
+                if message.get("output") is None and chunks:
+                    message["output"] = "".join(chunks)
+                return message
+
+        try:
+            return await asyncio.wait_for(exchange(), timeout)
+        except (OSError, ConnectionError) as e:
+            raise WorkerCrashed(str(e))
+
+    async def stop(self) -> None:
+        """Close stdin so the worker can exit; kill it if it does not."""
+        if not self.alive:
+            return
+        try:
+            self.proc.stdin.close()
+            await asyncio.wait_for(self.proc.wait(), 2)
+        except (asyncio.TimeoutError, OSError):
+            await self.kill()
+
+    async def kill(self) -> None:
+        if self.proc is not None:
+            await _kill(self.proc)
+
+
+class WorkerPool:
+    """Warm workers for one CLI; the runner's semaphore bounds its size."""
+
+    def __init__(self, cli: Path):
+        self.cli = cli
+        self.idle: List[Worker] = []
+        self._reaper: Optional[asyncio.Task] = None
+
+    async def acquire(self) -> Worker:
+        while self.idle:
+            worker = self.idle.pop()
+            if not worker.alive:
+                continue  # crashed while idle; replaced below
+            if time.monotonic() - worker.last_used > HEALTH_INTERVAL and not await worker.ping(HEALTH_TIMEOUT):
+                await worker.kill()
+                continue
+            return worker
+
+        worker = Worker(self.cli)
+        await worker.start()
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.ensure_future(self._reap())
+        return worker
+
+    def release(self, worker: Worker) -> None:
+        worker.last_used = time.monotonic()
+        if worker.alive:
+            self.idle.append(worker)
+
+    async def _reap(self) -> None:
+        """Stop workers that stayed idle longer than WORKER_IDLE_TIMEOUT."""
+        while True:
+            await asyncio.sleep(max(1.0, WORKER_IDLE_TIMEOUT / 4))
+            now = time.monotonic()
+            expired = [w for w in self.idle if now - w.last_used > WORKER_IDLE_TIMEOUT]
+            self.idle = [w for w in self.idle if w not in expired]
+            for worker in expired:
+                await worker.stop()
+
+    async def shutdown(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+        idle, self.idle = self.idle, []
+        for worker in idle:
+            await worker.stop()
+
+
+# Runners with worker pools, shut down by run_sync before its loop closes
+_runners: "weakref.WeakSet[ProviderRunner]" = weakref.WeakSet()
+
+
+class ProviderRunner:
+    """Concurrency-limited async execution of provider CLIs."""
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, workers: Optional[bool] = None):
+        self.limits = limits or {}
+        self.workers = WORKERS_ENABLED if workers is None else workers
+        # asyncio primitives and subprocesses belong to one event loop;
+        # run_sync creates a new loop per call
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = \
+            weakref.WeakKeyDictionary()
+        self._pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, WorkerPool]]" = \
+            weakref.WeakKeyDictionary()
+        self._no_worker_support: Set[str] = set()
+        _runners.add(self)
+
+    def _semaphore(self, name: str) -> asyncio.Semaphore:
+        per_loop = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+        if name not in per_loop:
+            per_loop[name] = asyncio.Semaphore(self.limits.get(name, DEFAULT_CONCURRENCY))
+        return per_loop[name]
+
+    def _pool(self, cli: Path) -> WorkerPool:
+        per_loop = self._pools.setdefault(asyncio.get_running_loop(), {})
+        if str(cli) not in per_loop:
+            per_loop[str(cli)] = WorkerPool(cli)
+        return per_loop[str(cli)]
+
+    async def call(self, name: str, cli: Path, payload: Dict[str, Any],
+                   timeout: float = DEFAULT_TIMEOUT,
+                   on_chunk: Optional[Callable[[str], None]] = None) -> CallResult:
+        """Run one CLI call; never raises except on cancellation."""
+        streamed = False
+
+        def forward(chunk: str) -> None:
+            nonlocal streamed
+            streamed = True
+            on_chunk(chunk)
+
+        relay = forward if on_chunk else None
+        async with self._semaphore(name):
+            result = None
+            if self.workers and str(cli) not in self._no_worker_support:
+                result = await self._call_worker(name, cli, payload, timeout, relay)
+            if result is None:
+                result = await self._call_process(name, cli, payload, timeout, relay)
+
+        if on_chunk and result.ok and result.output and not streamed:
+            on_chunk(result.output)
+        return result
+
+    async def _call_worker(self, name: str, cli: Path, payload: Dict[str, Any], timeout: float,
+                           on_chunk: Optional[Callable[[str], None]]) -> Optional[CallResult]:
+        """Call through a warm worker; None if the CLI has no worker mode."""
+        pool = self._pool(cli)
+        try:
+            worker = await pool.acquire()
+        except WorkerUnavailable:
+            self._no_worker_support.add(str(cli))
+            return None
+
+        start = time.monotonic()
+        try:
+            response = await worker.request(payload, timeout, on_chunk)
+        except asyncio.TimeoutError:
+            await worker.kill()  # still busy with the abandoned request
+            return CallResult(name, error="Timeout", duration=time.monotonic() - start)
+        except asyncio.CancelledError:
+            await worker.kill()
+            raise
+        except WorkerCrashed as e:
+            await worker.kill()
+            return CallResult(name, error=str(e)[:200], duration=time.monotonic() - start)
+        finally:
+            pool.release(worker)
+
+        duration = time.monotonic() - start
+        if response.get("success"):
+            return CallResult(name, output=response.get("output"), duration=duration)
+        return CallResult(name, error=str(response.get("error", "Worker request failed"))[:200], duration=duration)
+
+    async def _call_process(self, name: str, cli: Path, payload: Dict[str, Any], timeout: float,
+                            on_chunk: Optional[Callable[[str], None]] = None) -> CallResult:
+        """One `node <cli>` process per call."""
+        start = time.monotonic()
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "node", str(cli),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=MAX_LINE_BYTES
+            )
+        except OSError as e:
+            return CallResult(name, error=str(e)[:200])
+
+        chunks: List[str] = []
+        try:
+            if on_chunk is None:
+                communicate = proc.communicate(json.dumps(payload).encode('utf-8'))
+            else:
+                communicate = _communicate_streaming(proc, dict(payload, stream=True), chunks, on_chunk)
+            stdout, stderr = await asyncio.wait_for(communicate, timeout)
+        except asyncio.TimeoutError:
+            await _kill(proc)
+            return CallResult(name, error="Timeout", duration=time.monotonic() - start)
+        except asyncio.CancelledError:
+            await _kill(proc)
+            raise
+
+        duration = time.monotonic() - start
+        if proc.returncode == 0:
+            try:
+                response = json.loads(stdout)
+            except ValueError as e:
+                return CallResult(name, error=f"Invalid response: {e}"[:200], duration=duration)
+            if response.get("success"):
+                output = response.get("output")
+                if output is None and chunks:
+                    output = "".join(chunks)
+                return CallResult(name, output=output, duration=duration)
+
+        error = (stderr or stdout).decode('utf-8', errors='replace')
+        return CallResult(name, error=error[:200], duration=duration)
+
+    async def shutdown(self) -> None:
+        """Stop the warm workers of the running event loop."""
+        pools = self._pools.pop(asyncio.get_running_loop(), {})
+        for pool in pools.values():
+            await pool.shutdown()
+
+
+async def _communicate_streaming(proc: asyncio.subprocess.Process, payload: Dict[str, Any],
+                                 chunks: List[str], on_chunk: Callable[[str], None]) -> Tuple[bytes, bytes]:
+    """Like proc.communicate, but hands {"chunk": ...} lines to `on_chunk` as they arrive.
+
+    Returns the remaining stdout (the final response) and stderr.
+    """
+    try:
+        proc.stdin.write(json.dumps(payload).encode('utf-8'))
+        await proc.stdin.drain()
+        proc.stdin.close()
+    except (BrokenPipeError, ConnectionResetError):
+        pass  # exited early; the exit status and stderr tell why
+    stderr = asyncio.ensure_future(proc.stderr.read())  # keep the pipe drained
+
+    rest: List[bytes] = []
+    try:
+        async for line in proc.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                message = None
+            if isinstance(message, dict) and "chunk" in message:
+                chunks.append(message["chunk"])
+                on_chunk(message["chunk"])
+            else:
+                rest.append(line)
+        await proc.wait()
+        return b"".join(rest), await stderr
+    finally:
+        stderr.cancel()
+
+
+async def _kill(proc: asyncio.subprocess.Process) -> None:
+    if proc.returncode is None:
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
+        await proc.wait()
+
+
+def run_sync(awaitable: Awaitable[T]) -> T:
+    """Blocking wrapper for callers outside an event loop."""
+    async def _run() -> T:
+        try:
+            return await awaitable
+        finally:
+            for runner in list(_runners):
+                await runner.shutdown()
+    return asyncio.run(_run())
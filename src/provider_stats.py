@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Provider Statistics and Scheduling
+
+Per-provider call statistics kept inside provider_status.json and the
+routing decisions derived from them:
+
+- latency histogram (log-spaced buckets) for p50/p95/p90 estimates
+- EWMA latency, EWMA success rate and output token throughput
+- circuit breaker with exponential backoff after repeated errors
+- expected cost of a call = EWMA latency / success probability,
+  inflated as the remaining daily budget runs out
+
+All functions operate on the plain status dict of one provider, so the
+callers keep doing locked read-modify-writes of provider_status.json.
+"""
+
+import math
+import time
+from typing import Any, Dict, Optional
+
+# Upper bounds (seconds) of the latency histogram buckets; the last is open-ended
+LATENCY_BUCKETS = [0.5, 1, 2, 3, 5, 8, 13, 20, 30, 45, 60, 90, 120, 180, math.inf]
+
+LATENCY_ALPHA = 0.2    # EWMA weight of the newest latency sample
+SUCCESS_ALPHA = 0.1    # EWMA weight of the newest success/failure
+PRIOR_LATENCY = 10.0   # seconds per priority rank before any sample exists
+MIN_SUCCESS_PROB = 0.05
+
+BREAKER_THRESHOLD = 3            # consecutive errors that open the breaker
+BREAKER_MAX_SECONDS = 6 * 3600   # cap of the exponential backoff
+BUDGET_RESERVE = 0.1             # start penalizing below 10% remaining budget
+
+
+def record_call(pstatus: Dict[str, Any], success: bool, duration: Optional[float] = None,
+                output_tokens: int = 0, error: Optional[str] = None,
+                base_cooldown: float = 360.0, now: Optional[float] = None) -> None:
+    """Fold one finished call into the provider statistics (in place)."""
+    now = time.time() if now is None else now
+    pstatus["total_calls"] = pstatus.get("total_calls", 0) + 1
+
+    # Start from an optimistic prior so a single early failure does not dominate
+    success_ewma = pstatus.get("success_ewma", 1.0)
+    sample = 1.0 if success else 0.0
+    pstatus["success_ewma"] = round(success_ewma + SUCCESS_ALPHA * (sample - success_ewma), 4)
+
+    if success:
+        pstatus["total_successes"] = pstatus.get("total_successes", 0) + 1
+        pstatus["consecutive_errors"] = 0
+        pstatus["last_error"] = None
+        pstatus["breaker_until"] = None
+        if duration is not None:
+            _record_latency(pstatus, duration)
+            if duration > 0 and output_tokens:
+                rate = output_tokens / duration
+                previous = pstatus.get("tokens_per_sec")
+                pstatus["tokens_per_sec"] = round(
+                    rate if previous is None else previous + LATENCY_ALPHA * (rate - previous), 2
+                )
+        return
+
+    pstatus["consecutive_errors"] = pstatus.get("consecutive_errors", 0) + 1
+    pstatus["last_error"] = error
+    excess = pstatus["consecutive_errors"] - BREAKER_THRESHOLD
+    if excess >= 0:
+        open_for = min(BREAKER_MAX_SECONDS, base_cooldown * 2 ** excess)
+        pstatus["breaker_until"] = now + open_for
+
+
+def _record_latency(pstatus: Dict[str, Any], duration: float) -> None:
+    counts = pstatus.get("latency_histogram")
+    if not counts or len(counts) != len(LATENCY_BUCKETS):
+        counts = [0] * len(LATENCY_BUCKETS)
+    counts[next(i for i, bound in enumerate(LATENCY_BUCKETS) if duration <= bound)] += 1
+    pstatus["latency_histogram"] = counts
+
+    ewma = pstatus.get("latency_ewma")
+    pstatus["latency_ewma"] = round(
+        duration if ewma is None else ewma + LATENCY_ALPHA * (duration - ewma), 3
+    )
+
+
+def latency_samples(pstatus: Dict[str, Any]) -> int:
+    return sum(pstatus.get("latency_histogram") or [])
+
+
+def percentile(pstatus: Dict[str, Any], p: float) -> Optional[float]:
+    """Latency percentile estimated from the histogram (linear within a bucket)."""
+    counts = pstatus.get("latency_histogram") or []
+    total = sum(counts)
+    if not total:
+        return None
+    rank = p / 100 * total
+    seen = 0
+    for i, count in enumerate(counts):
+        if count and seen + count >= rank:
+            lower = LATENCY_BUCKETS[i - 1] if i else 0.0
+            upper = LATENCY_BUCKETS[i]
+            if math.isinf(upper):
+                return lower
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+    return LATENCY_BUCKETS[-2]
+
+
+def breaker_open(pstatus: Dict[str, Any], now: Optional[float] = None) -> bool:
+    """True while the circuit breaker rejects calls; afterwards one probe is let through."""
+    until = pstatus.get("breaker_until")
+    return bool(until) and (time.time() if now is None else now) < until
+
+
+def success_rate(pstatus: Dict[str, Any]) -> Optional[float]:
+    return pstatus.get("success_ewma")
+
+
+def expected_cost(config: Dict[str, Any], pstatus: Dict[str, Any]) -> float:
+    """Expected seconds until a successful answer, weighted by remaining budget.
+
+    Providers without samples are estimated from their static priority, so
+    a fresh installation routes exactly as before.
+    """
+    latency = pstatus.get("latency_ewma")
+    if latency is None:
+        latency = PRIOR_LATENCY * config.get("priority", 1)
+    success_prob = max(MIN_SUCCESS_PROB, pstatus.get("success_ewma", 1.0))
+    cost = latency / success_prob
+
+    limit = config.get("daily_limit") or 0
+    if limit:
+        remaining = max(0, limit - pstatus.get("calls_today", 0)) / limit
+        if remaining < BUDGET_RESERVE:
+            cost *= BUDGET_RESERVE / max(remaining, 0.01)
+    return cost
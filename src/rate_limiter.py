@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Shared Rate Limiter
+
+Cross-process token buckets for provider calls, shared by the orchestrator,
+the consolidator and ralph_loop.sh. Each bucket (e.g. "gemini", "claude")
+has per-minute, per-hour and per-day windows; state lives in
+rate_limits.json under a file lock, so several processes together use the
+full quota without overrunning it.
+
+Callers get the exact wait time instead of failing or polling:
+
+    wait = reserve("gemini", {"minute": 60, "day": 10000})  # slot is booked
+    time.sleep(wait)
+
+Usage:
+    python3 rate_limiter.py reserve <bucket> [--minute N] [--hour N] [--day N] [--max-wait S]
+    python3 rate_limiter.py status
+
+`reserve` books a slot and prints the seconds to wait before using it
+(exit 2 if the wait would exceed --max-wait; nothing is booked then).
+"""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from json_store import load_json, locked_update
+
+MEMORY_DIR = Path.home() / ".claude-memory"
+RATE_LIMITS_FILE = MEMORY_DIR / "rate_limits.json"
+
+WINDOWS = {"minute": 60, "hour": 3600, "day": 86400}
+
+
+def _refill(window: Dict, capacity: int, seconds: int, now: float) -> None:
+    """Refill a window's bucket continuously (capacity per `seconds`)."""
+    if window.get("capacity") != capacity:
+        # New bucket or changed limit: keep the used share, rescale to the new capacity
+        used = window.get("capacity", capacity) - window.get("tokens", capacity)
+        window["tokens"] = capacity - max(0.0, used)
+        window["capacity"] = capacity
+    elapsed = max(0.0, now - window.get("updated", now))
+    window["tokens"] = min(capacity, window["tokens"] + elapsed * capacity / seconds)
+    window["updated"] = now
+
+
+def _wait_time(windows: Dict, limits: Dict[str, int], cost: float) -> float:
+    """Seconds until every window holds `cost` tokens."""
+    wait = 0.0
+    for name, capacity in limits.items():
+        deficit = cost - windows[name]["tokens"]
+        if deficit > 0:
+            wait = max(wait, deficit * WINDOWS[name] / capacity)
+    return wait
+
+
+def _update(bucket: str, limits: Dict[str, int], cost: float,
+            book: bool, max_wait: Optional[float]) -> float:
+    limits = {name: int(n) for name, n in limits.items() if n and name in WINDOWS}
+    now = time.time()
+    with locked_update(RATE_LIMITS_FILE, {}) as state:
+        windows = state.setdefault(bucket, {})
+        for name, capacity in limits.items():
+            _refill(windows.setdefault(name, {}), capacity, WINDOWS[name], now)
+
+        wait = _wait_time(windows, limits, cost)
+        if (wait == 0 or book) and (max_wait is None or wait <= max_wait):
+            # Booking may drive tokens negative: the debt is the queue of reservations
+            for name in limits:
+                windows[name]["tokens"] -= cost
+        return wait
+
+
+def try_acquire(bucket: str, limits: Dict[str, int], cost: float = 1) -> float:
+    """Take a slot if one is free now (returns 0); otherwise return the wait, nothing taken."""
+    return _update(bucket, limits, cost, book=False, max_wait=None)
+
+
+def reserve(bucket: str, limits: Dict[str, int], cost: float = 1,
+            max_wait: Optional[float] = None) -> float:
+    """Book a slot and return the seconds until it may be used.
+
+    If the wait would exceed `max_wait`, nothing is booked and the wait is
+    returned anyway, so the caller can report it.
+    """
+    return _update(bucket, limits, cost, book=True, max_wait=max_wait)
+
+
+def acquire(bucket: str, limits: Dict[str, int], max_wait: Optional[float] = None) -> bool:
+    """Blocking: book a slot and sleep until it is valid; False if it exceeds max_wait."""
+    wait = reserve(bucket, limits, max_wait=max_wait)
+    if max_wait is not None and wait > max_wait:
+        return False
+    time.sleep(wait)
+    return True
+
+
+async def acquire_async(bucket: str, limits: Dict[str, int], max_wait: Optional[float] = None) -> bool:
+    """Awaitable variant of acquire."""
+    wait = reserve(bucket, limits, max_wait=max_wait)
+    if max_wait is not None and wait > max_wait:
+        return False
+    await asyncio.sleep(wait)
+    return True
+
+
+def status() -> Dict:
+    """Current bucket state (tokens as of the last update)."""
+    return load_json(RATE_LIMITS_FILE, {})
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    cmd = sys.argv[1]
+
+    if cmd == "reserve" and len(sys.argv) >= 3:
+        bucket, args = sys.argv[2], sys.argv[3:]
+        options = dict(zip(args[::2], args[1::2]))
+        limits = {name: int(options[f"--{name}"]) for name in WINDOWS if f"--{name}" in options}
+        max_wait = float(options["--max-wait"]) if "--max-wait" in options else None
+        wait = reserve(bucket, limits, max_wait=max_wait)
+        print(f"{wait:.1f}")
+        if max_wait is not None and wait > max_wait:
+            sys.exit(2)
+    elif cmd == "status":
+        print(json.dumps(status(), indent=2))
+    else:
+        print(__doc__)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
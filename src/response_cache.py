@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+LLM Response Cache
+
+Content-addressed on-disk cache for provider responses, keyed by
+(model, normalized prompt). Re-running `analyze` or `next` against an
+unchanged @fix_plan.md, or a watch daemon re-firing the same prompt,
+is answered from disk instead of another 5-60 s provider round-trip.
+
+Entries expire after GEMINI_CACHE_TTL seconds (default 3600); the cache
+directory is kept below GEMINI_CACHE_MAX_MB (default 50) by evicting the
+least recently used entries. Set GEMINI_NO_CACHE=1 or pass --no-cache
+to bypass it.
+"""
+
+import hashlib
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from json_store import atomic_write_json, load_json, locked_update
+
+MEMORY_DIR = Path.home() / ".claude-memory"
+CACHE_DIR = MEMORY_DIR / "response_cache"
+STATS_FILE = CACHE_DIR / "stats.json"
+
+CACHE_TTL = int(os.getenv("GEMINI_CACHE_TTL", "3600"))
+CACHE_MAX_BYTES = int(float(os.getenv("GEMINI_CACHE_MAX_MB", "50")) * 1024 * 1024)
+
+_TRAILING_SPACE = re.compile(r"[ \t]+$", re.MULTILINE)
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def enabled() -> bool:
+    return not os.getenv("GEMINI_NO_CACHE")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Ignore differences that do not change the meaning of a prompt."""
+    text = prompt.replace("\r\n", "\n")
+    text = _TRAILING_SPACE.sub("", text)
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+def cache_key(model: str, prompt: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(model.encode('utf-8') + b"\0")
+    digest.update(normalize_prompt(prompt).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _entry_path(key: str) -> Path:
+    return CACHE_DIR / f"{key}.json"
+
+
+def get(model: str, prompt: str) -> Optional[str]:
+    """Cached response or None (missing or older than CACHE_TTL)."""
+    path = _entry_path(cache_key(model, prompt))
+    try:
+        entry = load_json(path, {})
+    except (OSError, ValueError):
+        return None
+    if not entry or time.time() - entry.get("created", 0) > CACHE_TTL:
+        return None
+    try:
+        os.utime(path)  # mtime tracks last use for LRU eviction
+    except OSError:
+        pass
+    return entry.get("response")
+
+
+def put(model: str, prompt: str, response: str) -> None:
+    """Store a response and evict entries beyond TTL / size bound."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    atomic_write_json(_entry_path(cache_key(model, prompt)), {
+        "model": model,
+        "created": time.time(),
+        "prompt_chars": len(prompt),
+        "response": response
+    })
+    evict()
+
+
+def evict() -> int:
+    """Delete expired entries, then least recently used ones above the size bound."""
+    now = time.time()
+    entries = []
+    for path in CACHE_DIR.glob("*.json"):
+        if path == STATS_FILE:
+            continue
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+
+    removed = 0
+    total = sum(size for _, size, _ in entries)
+    for mtime, size, path in sorted(entries):
+        # mtime >= created, so an entry unused for CACHE_TTL is always expired
+        if total <= CACHE_MAX_BYTES and now - mtime <= CACHE_TTL:
+            continue
+        path.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+    return removed
+
+
+def record(hit: bool) -> Dict[str, Any]:
+    """Count a lookup; returns the cumulative {"hits", "misses"}."""
+    field = "hits" if hit else "misses"
+    with locked_update(STATS_FILE, {"hits": 0, "misses": 0}) as stats:
+        stats[field] = stats.get(field, 0) + 1
+        return dict(stats)
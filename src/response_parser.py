@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Response Parser
+
+Validating parser for Gemini answers in the marker format
+
+    ---PROMPT_MD_START---
+    ...
+    ---PROMPT_MD_END---
+
+and for plain task lists (replan). One pass over the lines collects all
+sections; markers are matched tolerantly (extra dashes, bold/backticks,
+lower case, code fences around the content).
+
+Recovery instead of throwing the answer away:
+- a section without END marker (truncated answer) ends at the next START
+  marker or the end of the answer and is kept with a warning;
+- a section that fails validation (missing, empty, no tasks, template
+  placeholders) can be repaired by a small follow-up call that only
+  re-sends that section, see parse_validated().
+
+    sections = parse_validated(response, ["PROMPT_MD", "FIX_PLAN"], repair_call=call_gemini)
+    if sections["FIX_PLAN"].ok: ...
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import fix_plan
+
+MARKER_RE = re.compile(
+    r"^\s*[*_`>]*\s*-{3,}\s*([A-Za-z][A-Za-z0-9_]*?)_(START|END)\s*-{3,}\s*[*_`]*\s*$"
+)
+FENCE_RE = re.compile(r"^\s*(```|~~~)")
+TASK_ID_RE = re.compile(r"\s+#[0-9a-f]{8}(?:-\d+)?\s*$")
+PLACEHOLDER_RE = re.compile(r"\[(?:Name|Projektname|Anforderung \d+|Vorgabe \d+|Hinweis \d+|"
+                            r"Klare Beschreibung des Ziels|Weitere Kriterien)\]")
+TITLE_RE = re.compile(r"^#\s+\S")
+LIST_RE = re.compile(r"^\s*(?:[-*+]|\d+\.)\s")
+
+# Format reminders for repair calls
+FORMATS = {
+    "PROMPT_MD": """# Projektname
+
+## Ziel
+...
+
+## Aktuelle Anforderungen
+1. ...
+
+## Technische Vorgaben
+- ...
+
+## Exit-Kriterien
+- ...""",
+    "FIX_PLAN": """# Task-Liste
+
+## Phase 1: Grundlagen
+- [ ] Konkreter Task (Priorität: HOCH)
+
+## Phase 2: Ausbau
+- [ ] Konkreter Task (Priorität: MITTEL)""",
+}
+
+Call = Callable[[str], Optional[str]]
+
+
+@dataclass
+class Section:
+    name: str
+    text: str = ""
+    complete: bool = True   # END marker seen
+    found: bool = True      # START marker seen (or text taken as a whole)
+    errors: List[str] = field(default_factory=list)
+    repaired: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.found and not self.errors
+
+    @property
+    def warnings(self) -> List[str]:
+        return [] if self.complete or not self.found else ["Ende-Marker fehlt (Antwort abgeschnitten?)"]
+
+
+def _strip_fences(lines: List[str]) -> List[str]:
+    """Drop blank edges and a code fence wrapped around the whole content."""
+    while lines and not lines[0].strip():
+        lines = lines[1:]
+    while lines and not lines[-1].strip():
+        lines = lines[:-1]
+    if lines and FENCE_RE.match(lines[0]):
+        lines = lines[1:]
+        if lines and FENCE_RE.match(lines[-1]):
+            lines = lines[:-1]
+    return lines
+
+
+def parse_sections(text: str) -> Dict[str, Section]:
+    """All marker sections in one pass; a later complete section wins over earlier ones."""
+    sections: Dict[str, Section] = {}
+    name: Optional[str] = None
+    body: List[str] = []
+
+    def close(complete: bool):
+        section = Section(name, "\n".join(_strip_fences(body)), complete)
+        previous = sections.get(name)
+        if previous is None or complete or not previous.complete:
+            sections[name] = section
+
+    for line in text.splitlines():
+        marker = MARKER_RE.match(line) if "---" in line else None
+        if marker is None:
+            if name is not None:
+                body.append(line)
+            continue
+        marker_name, kind = marker.group(1).upper(), marker.group(2).upper()
+        if kind == "START":
+            if name is not None:
+                close(complete=False)
+            name, body = marker_name, []
+        elif name == marker_name:
+            close(complete=True)
+            name = None
+    if name is not None:
+        close(complete=False)
+    return sections
+
+
+def clean_task_list(text: str) -> str:
+    """Task list without surrounding chatter, code fences and task IDs (#1a2b3c4d).
+
+    Leading text before the first heading or task is dropped, and so is a
+    closing paragraph directly after the last task ("Viel Erfolg!");
+    prose under its own heading is kept.
+    """
+    lines = _strip_fences(text.splitlines())
+    start = next((i for i, line in enumerate(lines)
+                  if line.startswith("#") or fix_plan.TASK_RE.match(line)), 0)
+    lines = _strip_fences(lines[start:])
+    structure = [i for i, line in enumerate(lines)
+                 if line.startswith("#") or LIST_RE.match(line)]
+    if structure and fix_plan.TASK_RE.match(lines[structure[-1]]):
+        tail = lines[structure[-1] + 1:]
+        if tail and not tail[0].strip():
+            lines = lines[:structure[-1] + 1]
+    return "\n".join(TASK_ID_RE.sub("", line) if "#" in line else line for line in lines)
+
+
+def validate_prompt_md(text: str) -> List[str]:
+    errors = []
+    if not text.strip():
+        return ["leer"]
+    if not any(TITLE_RE.match(line) for line in text.splitlines()):
+        errors.append("Titel (# ...) fehlt")
+    if sum(1 for line in text.splitlines() if line.startswith("## ")) < 2:
+        errors.append("weniger als zwei Abschnitte (## ...)")
+    if PLACEHOLDER_RE.search(text):
+        errors.append("Platzhalter aus der Vorlage nicht ersetzt")
+    return errors
+
+
+def validate_fix_plan(text: str) -> List[str]:
+    if not text.strip():
+        return ["leer"]
+    plan = fix_plan.parse(text)
+    errors = []
+    if not plan.tasks:
+        errors.append("keine Tasks im Format '- [ ] ...'")
+    if PLACEHOLDER_RE.search(text) or any(re.fullmatch(r"Task \d+", t.text) for t in plan.tasks):
+        errors.append("Platzhalter aus der Vorlage nicht ersetzt")
+    return errors
+
+
+VALIDATORS = {"PROMPT_MD": validate_prompt_md, "FIX_PLAN": validate_fix_plan}
+CLEANERS = {"FIX_PLAN": clean_task_list}
+
+
+def check(section: Section) -> Section:
+    """Clean and validate a section in place."""
+    if not section.found:
+        section.errors = ["Abschnitt fehlt"]
+        return section
+    cleaner = CLEANERS.get(section.name)
+    if cleaner:
+        section.text = cleaner(section.text)
+    validator = VALIDATORS.get(section.name)
+    section.errors = validator(section.text) if validator else []
+    return section
+
+
+def repair_prompt(section: Section, context: str = "") -> str:
+    """Small prompt that only regenerates / fixes one section."""
+    name = section.name
+    if section.found and section.text.strip():
+        material = f"FEHLERHAFTER ABSCHNITT:\n{section.text}"
+        job = "Korrigiere diesen Abschnitt, behalte alle inhaltlichen Angaben bei."
+    else:
+        material = f"AUFGABE, FÜR DIE DER ABSCHNITT GEBRAUCHT WIRD:\n{context}" if context else ""
+        job = "Erstelle diesen Abschnitt neu."
+
+    return f"""Ein Abschnitt einer früheren Antwort ist ungültig ({'; '.join(section.errors)}).
+{job}
+
+{material}
+
+FORMAT:
+{FORMATS.get(name, '')}
+
+Gib NUR diesen Abschnitt aus, exakt zwischen den Markern:
+---{name}_START---
+...
+---{name}_END---
+"""
+
+
+def repair(section: Section, call: Call, context: str = "") -> Section:
+    """One repair call for a failed section; returns the better of both."""
+    response = call(repair_prompt(section, context))
+    if not response:
+        return section
+    candidate = parse_sections(response).get(section.name) or Section(section.name, response)
+    check(candidate)
+    if not candidate.ok:
+        return section
+    candidate.repaired = True
+    return candidate
+
+
+def parse_validated(response: str, names: List[str], repair_call: Optional[Call] = None,
+                    context: str = "") -> Dict[str, Section]:
+    """Required sections of a marker answer, each validated and repaired if needed."""
+    sections = parse_sections(response)
+    result = {}
+    for name in names:
+        section = check(sections.get(name) or Section(name, found=False, complete=False))
+        if section.errors and repair_call:
+            section = repair(section, repair_call, context)
+        result[name] = section
+    return result
+
+
+def parse_task_list(response: str, repair_call: Optional[Call] = None) -> Section:
+    """A complete @fix_plan.md from a free-form answer (FIX_PLAN markers optional)."""
+    section = parse_sections(response).get("FIX_PLAN") or Section("FIX_PLAN", response)
+    check(section)
+    if section.errors and repair_call:
+        section = repair(section, repair_call)
+    return section
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+SQLite Memory Backend
+
+Optional drop-in replacement for knowledge.json / events.jsonl / summaries.json.
+Enable with:
+    export MEMORY_BACKEND=sqlite
+
+Uses stdlib sqlite3 in WAL mode with indexed tables, so point reads and
+writes stay fast with hundreds of thousands of entries. The existing
+JSON files can be imported once with `memory_interface.py migrate-sqlite`.
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+MEMORY_DIR = Path.home() / ".claude-memory"
+DB_FILE = MEMORY_DIR / "memory.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS knowledge (
+    key     TEXT PRIMARY KEY,
+    value   TEXT NOT NULL,
+    updated TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS events (
+    seq       INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT,
+    action    TEXT,
+    agent     TEXT,
+    data      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events(timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_action ON events(action);
+CREATE INDEX IF NOT EXISTS idx_events_agent ON events(agent);
+CREATE TABLE IF NOT EXISTS summaries (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_connection: Optional[sqlite3.Connection] = None
+
+
+def enabled() -> bool:
+    """True if the SQLite backend is selected via MEMORY_BACKEND."""
+    return os.getenv("MEMORY_BACKEND", "json").lower() == "sqlite"
+
+
+def connect(db_file: Path = DB_FILE) -> sqlite3.Connection:
+    """Open (once per process) the memory database in WAL mode."""
+    global _connection
+    if _connection is None:
+        db_file.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(db_file), timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        _connection = conn
+    return _connection
+
+
+def write_knowledge(key: str, value: Any) -> int:
+    """Upsert a knowledge entry; returns the new version."""
+    conn = connect()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            """INSERT INTO knowledge (key, value, updated, version) VALUES (?, ?, ?, 1)
+               ON CONFLICT(key) DO UPDATE SET
+                   value = excluded.value, updated = excluded.updated, version = version + 1""",
+            (key, json.dumps(value, ensure_ascii=False), datetime.now().isoformat())
+        )
+        return conn.execute("SELECT version FROM knowledge WHERE key = ?", (key,)).fetchone()[0]
+
+
+def put_knowledge(entries: Dict[str, Dict[str, Any]]) -> None:
+    """Upsert full entries ({"value", "updated", "version"}) in one transaction."""
+    conn = connect()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            """INSERT INTO knowledge (key, value, updated, version) VALUES (?, ?, ?, ?)
+               ON CONFLICT(key) DO UPDATE SET
+                   value = excluded.value, updated = excluded.updated, version = excluded.version""",
+            (
+                (k, json.dumps(v["value"], ensure_ascii=False), v["updated"], v["version"])
+                for k, v in entries.items()
+            )
+        )
+
+
+def data_version() -> int:
+    """Changes whenever another connection commits (PRAGMA data_version)."""
+    return connect().execute("PRAGMA data_version").fetchone()[0]
+
+
+def read_knowledge(key: str) -> Optional[Dict[str, Any]]:
+    """Return {"value", "updated", "version"} or None."""
+    row = connect().execute(
+        "SELECT value, updated, version FROM knowledge WHERE key = ?", (key,)
+    ).fetchone()
+    if row is None:
+        return None
+    return {"value": json.loads(row[0]), "updated": row[1], "version": row[2]}
+
+
+def knowledge_items(limit: Optional[int] = None) -> List[Tuple[str, Dict[str, Any]]]:
+    """Knowledge entries in insertion order, like iterating knowledge.json."""
+    sql = "SELECT key, value, updated, version FROM knowledge ORDER BY rowid"
+    params: Tuple = ()
+    if limit is not None:
+        sql += " LIMIT ?"
+        params = (limit,)
+    return [
+        (key, {"value": json.loads(value), "updated": updated, "version": version})
+        for key, value, updated, version in connect().execute(sql, params)
+    ]
+
+
+def knowledge_count() -> int:
+    return connect().execute("SELECT COUNT(*) FROM knowledge").fetchone()[0]
+
+
+def _event_row(event: Dict[str, Any]) -> Tuple:
+    return (
+        event.get("timestamp"),
+        event.get("action"),
+        event.get("agent"),
+        json.dumps(event, ensure_ascii=False)
+    )
+
+
+def append_events(events: Iterable[Dict[str, Any]]) -> int:
+    """Insert events in one transaction; returns the total event count."""
+    conn = connect()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            "INSERT INTO events (timestamp, action, agent, data) VALUES (?, ?, ?, ?)",
+            (_event_row(e) for e in events)
+        )
+    return event_count()
+
+
+def event_count() -> int:
+    # seq is AUTOINCREMENT and events are never deleted, so MAX(seq) == COUNT(*)
+    return connect().execute("SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()[0]
+
+
+def tail_events(limit: int) -> List[Dict[str, Any]]:
+    """Last `limit` events, oldest first."""
+    rows = connect().execute(
+        "SELECT data FROM events ORDER BY seq DESC LIMIT ?", (limit,)
+    ).fetchall()
+    return [json.loads(row[0]) for row in reversed(rows)]
+
+
+def events_since(cursor: Optional[Dict[str, Any]], keep: int,
+                 fallback_count: int = 0,
+                 limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int, Dict[str, Any]]:
+    """Events after a consolidation cursor ({"count": last consumed seq}).
+
+    Returns (last `keep` new events, number of new events, new cursor),
+    mirroring event_log.read_since (including its oldest-first `limit`).
+    """
+    conn = connect()
+    after = cursor.get("count", fallback_count) if cursor else fallback_count
+    last_seq = event_count()
+    if after > last_seq:
+        after = 0
+    if limit is not None:
+        rows = conn.execute(
+            "SELECT seq, data FROM events WHERE seq > ? ORDER BY seq LIMIT ?", (after, limit)
+        ).fetchall()
+        events = [json.loads(row[1]) for row in rows]
+        return events, len(rows), {"count": rows[-1][0] if rows else after}
+    rows = conn.execute(
+        "SELECT data FROM events WHERE seq > ? ORDER BY seq DESC LIMIT ?", (after, keep)
+    ).fetchall()
+    events = [json.loads(row[0]) for row in reversed(rows)]
+    return events, last_seq - after, {"count": last_seq}
+
+
+def get_summary(key: str, default: Any = None) -> Any:
+    row = connect().execute("SELECT value FROM summaries WHERE key = ?", (key,)).fetchone()
+    return json.loads(row[0]) if row else default
+
+
+def load_summaries() -> Dict[str, Any]:
+    return {
+        key: json.loads(value)
+        for key, value in connect().execute("SELECT key, value FROM summaries")
+    }
+
+
+def update_summaries(apply: Callable[[Dict[str, Any]], None]) -> None:
+    """Read-modify-write the summaries in one IMMEDIATE transaction.
+
+    `apply` mutates the loaded dict in place; only its keys are upserted,
+    so concurrent writers of other keys are not clobbered.
+    """
+    conn = connect()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        summaries = load_summaries()
+        apply(summaries)
+        conn.executemany(
+            "INSERT INTO summaries (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            ((k, json.dumps(v, ensure_ascii=False)) for k, v in summaries.items())
+        )
+
+
+def migrate(knowledge: Dict[str, Any], event_lines: Iterable[bytes],
+            summaries: Dict[str, Any]) -> Dict[str, int]:
+    """One-shot import of the JSON stores. Tables that already hold data are skipped."""
+    conn = connect()
+    result = {"knowledge": 0, "events": 0, "summaries": 0}
+
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        if knowledge and not conn.execute("SELECT 1 FROM knowledge LIMIT 1").fetchone():
+            conn.executemany(
+                "INSERT INTO knowledge (key, value, updated, version) VALUES (?, ?, ?, ?)",
+                (
+                    (k, json.dumps(v.get("value"), ensure_ascii=False),
+                     v.get("updated", datetime.now().isoformat()), v.get("version", 1))
+                    for k, v in knowledge.items()
+                )
+            )
+            result["knowledge"] = len(knowledge)
+
+        if not conn.execute("SELECT 1 FROM events LIMIT 1").fetchone():
+            for line in event_lines:
+                try:
+                    event = json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+                conn.execute(
+                    "INSERT INTO events (timestamp, action, agent, data) VALUES (?, ?, ?, ?)",
+                    _event_row(event)
+                )
+                result["events"] += 1
+
+        if summaries and not conn.execute("SELECT 1 FROM summaries LIMIT 1").fetchone():
+            summaries = dict(summaries)
+            # The JSON-era byte cursor is meaningless for the events table
+            summaries.pop("event_cursor", None)
+            conn.executemany(
+                "INSERT INTO summaries (key, value) VALUES (?, ?)",
+                ((k, json.dumps(v, ensure_ascii=False)) for k, v in summaries.items())
+            )
+            result["summaries"] = len(summaries)
+
+    return result
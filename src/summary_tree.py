@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Hierarchical Summary Tree
+
+Consolidation summarizes every new event instead of only the last batch:
+
+    chunk    one summary per CHUNK_SIZE events
+    hour     chunks whose last event falls into the same hour
+    session  consecutive hours without a gap longer than SESSION_GAP
+             (at most MAX_SESSION_HOURS)
+    project  one rolling summary folding in every finished session
+
+Each node records the event range it covers (first_seq..last_seq, the
+global sequence numbers of the event log) and its time span. A parent
+covers exactly its children. Groups are only rolled up once they are
+finished (a newer hour / session exists), and rolled-up nodes are pruned
+per parent group beyond KEEP, so every level stays bounded while the
+coarser levels still cover the pruned history.
+
+The tree is a plain list of node dicts stored under "summary_tree" in
+the summaries (summaries.json or the sqlite summaries table).
+
+    nodes = cover(tree, "hour")                 # full history, hour resolution
+    nodes = select(tree, budget, estimator.count)   # finest level that fits
+"""
+
+import os
+from datetime import datetime
+from itertools import groupby
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+LEVELS = ("chunk", "hour", "session", "project")
+LABELS = {"chunk": "Chunk", "hour": "Hour", "session": "Session", "project": "Project"}
+
+CHUNK_SIZE = int(os.getenv("SUMMARY_CHUNK_SIZE", "50"))
+# Upper bound of events read per consolidation run (oldest first, the rest follows next run)
+MAX_EVENTS_PER_RUN = int(os.getenv("SUMMARY_MAX_EVENTS", "2000"))
+SESSION_GAP = float(os.getenv("SUMMARY_SESSION_GAP", "1800"))  # seconds
+MAX_SESSION_HOURS = 24  # a session without gaps is closed after this many hour nodes
+
+# Rolled-up nodes kept per level; open (not yet rolled-up) nodes are always kept
+KEEP = {"chunk": 48, "hour": 48, "session": 30}
+
+Node = Dict[str, Any]
+
+
+def make_node(level: str, first_seq: int, last_seq: int, start: str, end: str,
+              text: str, provider: Optional[str] = None) -> Node:
+    return {
+        "level": level,
+        "first_seq": first_seq,
+        "last_seq": last_seq,
+        "start": start,
+        "end": end,
+        "text": text,
+        "provider": provider,
+        "created": datetime.now().isoformat()
+    }
+
+
+def node_id(node: Node) -> str:
+    return f"{node['level']}:{node['first_seq']}-{node['last_seq']}"
+
+
+def level_nodes(tree: List[Node], level: str) -> List[Node]:
+    return sorted((n for n in tree if n["level"] == level), key=lambda n: n["first_seq"])
+
+
+def chunks(events: List[dict], first_seq: int, size: int = CHUNK_SIZE,
+           max_tokens: Optional[int] = None,
+           cost: Optional[Callable[[dict], int]] = None) -> List[Tuple[int, int, List[dict]]]:
+    """Split consecutive events into (first_seq, last_seq, events) chunks.
+
+    A chunk holds at most `size` events (and at most `max_tokens` by
+    `cost`) and never spans a gap longer than SESSION_GAP, so session
+    boundaries fall between chunks.
+    """
+    result = []
+    current: List[dict] = []
+    tokens = 0
+    seq = first_seq
+    for event in events:
+        weight = cost(event) if max_tokens and cost else 0
+        if current and (len(current) >= size
+                        or (max_tokens and tokens + weight > max_tokens)
+                        or _seconds_between(current[-1].get("timestamp", ""),
+                                            event.get("timestamp", "")) > SESSION_GAP):
+            result.append((seq, seq + len(current) - 1, current))
+            seq += len(current)
+            current = []
+            tokens = 0
+        current.append(event)
+        tokens += weight
+    if current:
+        result.append((seq, seq + len(current) - 1, current))
+    return result
+
+
+def chunk_node(first_seq: int, last_seq: int, events: List[dict], text: str,
+               provider: Optional[str] = None) -> Node:
+    now = datetime.now().isoformat()
+    return make_node(
+        "chunk", first_seq, last_seq,
+        events[0].get("timestamp") or now if events else now,
+        events[-1].get("timestamp") or now if events else now,
+        text, provider
+    )
+
+
+def add_chunk(tree: List[Node], first_seq: int, last_seq: int, events: List[dict],
+              text: str, provider: Optional[str] = None) -> Node:
+    node = chunk_node(first_seq, last_seq, events, text, provider)
+    tree.append(node)
+    return node
+
+
+def _seconds_between(earlier: str, later: str) -> float:
+    try:
+        return (datetime.fromisoformat(later) - datetime.fromisoformat(earlier)).total_seconds()
+    except ValueError:
+        return 0.0
+
+
+def next_rollup(tree: List[Node]) -> Optional[Tuple[str, List[Node]]]:
+    """The next finished group as (parent level, children), finest level first."""
+    open_chunks = [n for n in level_nodes(tree, "chunk") if not n.get("parent")]
+    # Hours: every hour group except the newest one is finished
+    hours = [list(g) for _, g in groupby(open_chunks, key=lambda n: n["end"][:13])]
+    if len(hours) > 1:
+        return "hour", hours[0]
+
+    # Sessions: a gap to the next node (hour or still open chunk) closes a session
+    open_hours = [n for n in level_nodes(tree, "hour") if not n.get("parent")]
+    following = open_hours + open_chunks[:1]
+    group: List[Node] = []
+    for node, later in zip(open_hours, following[1:]):
+        group.append(node)
+        if (_seconds_between(node["end"], later["start"]) > SESSION_GAP
+                or len(group) >= MAX_SESSION_HOURS):
+            return "session", group
+
+    # Project: fold in every finished session
+    open_sessions = [n for n in level_nodes(tree, "session") if not n.get("parent")]
+    if open_sessions:
+        return "project", open_sessions
+    return None
+
+
+def add_rollup(tree: List[Node], level: str, children: List[Node], text: str,
+               provider: Optional[str] = None) -> Node:
+    """Add the parent of `children` (or update the project node) and prune."""
+    first = min(n["first_seq"] for n in children)
+    last = max(n["last_seq"] for n in children)
+    start = min(n["start"] for n in children)
+    end = max(n["end"] for n in children)
+
+    project = next(iter(level_nodes(tree, "project")), None)
+    if level == "project" and project is not None:
+        project.update(
+            first_seq=min(first, project["first_seq"]), last_seq=max(last, project["last_seq"]),
+            start=min(start, project["start"]), end=max(end, project["end"]),
+            text=text, provider=provider, created=datetime.now().isoformat()
+        )
+        parent = project
+    else:
+        parent = make_node(level, first, last, start, end, text, provider)
+        tree.append(parent)
+
+    for child in children:
+        child["parent"] = "project" if level == "project" else node_id(parent)
+    prune(tree)
+    return parent
+
+
+def prune(tree: List[Node]) -> None:
+    """Drop the oldest rolled-up nodes beyond KEEP, whole parent groups at a time."""
+    for level, keep in KEEP.items():
+        rolled = [n for n in level_nodes(tree, level) if n.get("parent")]
+        excess = len(rolled) - keep
+        if excess <= 0:
+            continue
+        # Sessions share the project node as parent; they go one by one
+        groups = [list(g) for _, g in groupby(
+            rolled, key=lambda n: node_id(n) if n["parent"] == "project" else n["parent"]
+        )]
+        drop = set()
+        for group in groups:
+            if excess <= 0:
+                break
+            drop.update(id(n) for n in group)
+            excess -= len(group)
+        tree[:] = [n for n in tree if id(n) not in drop]
+
+
+def cover(tree: List[Node], level: str) -> List[Node]:
+    """Nodes covering the whole summarized history at `level` resolution, oldest first.
+
+    History older than the nodes kept at `level` is covered by the next
+    coarser level (recursively), newer events that are not rolled up yet
+    by the finer levels. A coarser node that starts before the finer ones
+    is kept even if it overlaps them, so no range is lost.
+    """
+    index = LEVELS.index(level)
+    nodes = level_nodes(tree, level)
+    if index + 1 < len(LEVELS):
+        boundary = nodes[0]["first_seq"] if nodes else float("inf")
+        nodes = [n for n in cover(tree, LEVELS[index + 1]) if n["first_seq"] < boundary] + nodes
+    for finer in reversed(LEVELS[:index]):
+        covered = max((n["last_seq"] for n in nodes), default=0)
+        nodes += [n for n in level_nodes(tree, finer) if n["first_seq"] > covered]
+    return nodes
+
+
+def render(node: Node) -> str:
+    return (f"[{LABELS.get(node['level'], node['level'].title())} {node['start'][:16]} - {node['end'][:16]}, "
+            f"events {node['first_seq']}-{node['last_seq']}]\n{node['text'].strip()}")
+
+
+def select(tree: List[Node], budget: int, count: Callable[[str], int]) -> List[Node]:
+    """Finest cover whose rendered nodes fit `budget` tokens (cheapest otherwise)."""
+    cheapest: Tuple[float, List[Node]] = (float("inf"), [])
+    for level in LEVELS:
+        nodes = cover(tree, level)
+        if not nodes:
+            continue
+        cost = sum(count(render(n)) + 1 for n in nodes)
+        if cost <= budget:
+            return nodes
+        cheapest = min(cheapest, (cost, nodes), key=lambda c: c[0])
+    return cheapest[1]
+
+
+def stats(tree: List[Node]) -> Dict[str, int]:
+    """Node count per level."""
+    return {level: len(level_nodes(tree, level)) for level in LEVELS}
@@ -0,0 +1,55 @@
+#!/usr/bin/env node
+// Fake provider CLI for tests: answers without calling any LLM.
+//
+//   node fake_provider_cli.js            one call: JSON payload on stdin
+//   node fake_provider_cli.js --worker   newline-delimited JSON worker protocol
+//
+// Environment:
+//   FAKE_NO_WORKER=1    reject --worker (exit without answering the ping)
+//   FAKE_CRASH=<file>   exit on the next request if <file> exists (it is removed)
+
+const fs = require('fs');
+const readline = require('readline');
+
+function answer(payload) {
+  return `FAKE(${process.pid}): ${String(payload.prompt || '').slice(0, 60)}`;
+}
+
+function send(message) {
+  process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+if (process.argv.includes('--worker')) {
+  if (process.env.FAKE_NO_WORKER) {
+    process.exit(1);
+  }
+  const rl = readline.createInterface({ input: process.stdin });
+  rl.on('line', (line) => {
+    let message;
+    try {
+      message = JSON.parse(line);
+    } catch (e) {
+      return;
+    }
+    if (message.ping) {
+      send({ id: message.id, pong: true });
+      return;
+    }
+    const crash = process.env.FAKE_CRASH;
+    if (crash && fs.existsSync(crash)) {
+      fs.unlinkSync(crash);
+      process.exit(3);
+    }
+    const output = answer(message.payload || {});
+    send({ id: message.id, chunk: output.slice(0, 10) });
+    send({ id: message.id, chunk: output.slice(10) });
+    send({ id: message.id, success: true });
+  });
+  rl.on('close', () => process.exit(0));
+} else {
+  let input = '';
+  process.stdin.on('data', (data) => { input += data; });
+  process.stdin.on('end', () => {
+    send({ success: true, output: answer(JSON.parse(input)) });
+  });
+}
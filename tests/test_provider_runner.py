@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Warm worker tests for provider_runner against a local fake CLI
+(tests/fake_provider_cli.js, needs node):
+
+    python3 -m unittest discover tests
+"""
+
+import asyncio
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import provider_runner  # noqa: E402
+from provider_runner import ProviderRunner, WorkerPool  # noqa: E402
+
+FAKE_CLI = Path(__file__).resolve().parent / "fake_provider_cli.js"
+PAYLOAD = {"prompt": "hallo"}
+
+
+@unittest.skipIf(shutil.which("node") is None, "node not installed")
+class WorkerPoolTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.crash_flag = Path(tempfile.mkdtemp()) / "crash"
+        self.env = mock.patch.dict(os.environ, {"FAKE_CRASH": str(self.crash_flag)})
+        self.env.start()
+        self.runner = ProviderRunner({"fake": 1}, workers=True)
+
+    async def asyncTearDown(self):
+        await self.runner.shutdown()
+        self.env.stop()
+        shutil.rmtree(self.crash_flag.parent, ignore_errors=True)
+
+    def pool(self) -> WorkerPool:
+        return self.runner._pool(FAKE_CLI)
+
+    async def test_worker_is_reused(self):
+        first = await self.runner.call("fake", FAKE_CLI, PAYLOAD)
+        pid = self.pool().idle[0].proc.pid
+        second = await self.runner.call("fake", FAKE_CLI, PAYLOAD)
+        self.assertTrue(first.ok and second.ok)
+        self.assertEqual(self.pool().idle[0].proc.pid, pid)
+        self.assertIn(f"FAKE({pid})", second.output)
+
+    async def test_restart_after_crash(self):
+        await self.runner.call("fake", FAKE_CLI, PAYLOAD)
+        pid = self.pool().idle[0].proc.pid
+        self.crash_flag.touch()
+        crashed = await self.runner.call("fake", FAKE_CLI, PAYLOAD)
+        self.assertFalse(crashed.ok)
+        self.assertIn("worker exited", crashed.error)
+
+        result = await self.runner.call("fake", FAKE_CLI, PAYLOAD)
+        self.assertTrue(result.ok)
+        self.assertNotEqual(self.pool().idle[0].proc.pid, pid)
+
+    async def test_crash_while_idle(self):
+        await self.runner.call("fake", FAKE_CLI, PAYLOAD)
+        worker = self.pool().idle[0]
+        worker.proc.kill()
+        await worker.proc.wait()
+        result = await self.runner.call("fake", FAKE_CLI, PAYLOAD)
+        self.assertTrue(result.ok)
+        self.assertIsNot(self.pool().idle[0], worker)
+
+    async def test_unhealthy_worker_replaced(self):
+        await self.runner.call("fake", FAKE_CLI, PAYLOAD)
+        worker = self.pool().idle[0]
+        os.kill(worker.proc.pid, signal.SIGSTOP)  # alive, but no longer answers
+        worker.last_used -= provider_runner.HEALTH_INTERVAL + 1
+        with mock.patch.object(provider_runner, "HEALTH_TIMEOUT", 0.5):
+            result = await self.runner.call("fake", FAKE_CLI, PAYLOAD)
+        self.assertTrue(result.ok)
+        self.assertFalse(worker.alive)
+        self.assertIsNot(self.pool().idle[0], worker)
+
+    async def test_idle_worker_reaped(self):
+        with mock.patch.object(provider_runner, "WORKER_IDLE_TIMEOUT", 0.5):
+            pool = WorkerPool(FAKE_CLI)
+            worker = await pool.acquire()
+            pool.release(worker)
+            await asyncio.sleep(2.5)  # the reaper sweeps every second at least
+            self.assertEqual(pool.idle, [])
+            self.assertFalse(worker.alive)
+            await pool.shutdown()
+
+    async def test_fallback_without_worker_mode(self):
+        with mock.patch.dict(os.environ, {"FAKE_NO_WORKER": "1"}):
+            result = await self.runner.call("fake", FAKE_CLI, PAYLOAD)
+        self.assertTrue(result.ok)
+        self.assertIn(str(FAKE_CLI), self.runner._no_worker_support)
+        self.assertEqual(self.pool().idle, [])
+
+
+if __name__ == "__main__":
+    unittest.main()